@@ -0,0 +1,271 @@
+"""Load the results ingestion of the controller.
+
+The benchmark starts the gRPC server of the controller (build_grpc_server)
+with an in-process ControllerEngine and registers N synthetic test suites,
+each one with the listeners of a NetworkTestSuite (the results subscriber
+and the deadline validator) and a CRDInstanceManager patching through a
+stubbed kubernetes API, which only waits `--api-latency` per call.
+
+Many clients then report the results of the test suites at a fixed total
+rate (open loop: a late request doesn't delay the next ones), for some
+seconds, and the benchmark reports:
+
+- the throughput sent and processed (the subscribers notified, after the
+  ingest queue when it is enabled),
+- the p50/p99 latency of ReportResults seen by the clients,
+- the RSS of the process after registering the suites and after the load,
+- the counters of the engine (status patches, queue).
+"""
+import argparse
+import contextvars
+import socket
+import statistics
+import threading
+import time
+from typing import List
+
+import grpc
+from kubernetes import client
+
+from kubekarma.controlleroperator.config import config
+from kubekarma.controlleroperator.core.controllerengine import ControllerEngine
+from kubekarma.controlleroperator.core.crdinstancemanager import \
+    CRDInstanceManager
+from kubekarma.controlleroperator.grpcservicers.server import \
+    build_grpc_server
+from kubekarma.controlleroperator.kinds.networktestsuite import \
+    NetworkTestSuite
+from kubekarma.grpcgen.collectors.v1alpha import controller_pb2, \
+    controller_pb2_grpc
+
+
+class StubApiClient(client.ApiClient):
+    """Answer every call of the kubernetes client with an empty object."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def call_api(self, *args, **kwargs):
+        with self.lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return {}
+
+
+def rss_mb() -> float:
+    """Return the resident memory of the process, Linux only."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def register_suites(
+    engine: ControllerEngine,
+    api_client: StubApiClient,
+    suites: int
+) -> List[str]:
+    """Register the listeners of the suites, return their tokens."""
+    kind = NetworkTestSuite(controller_engine=engine)
+    spec = {"schedule": "* * * * *"}
+    tokens = []
+    for i in range(suites):
+        crd = kind.get_crd_for_creation(
+            "benchmark", f"suite-{i}", kind.api_plural
+        )
+        crd_manager = CRDInstanceManager(
+            api_client=api_client,
+            crd_ctx=crd,
+            body={
+                "apiVersion": f"{config.API_GROUP}/{config.API_VERSION}",
+                "kind": kind.kind,
+                "metadata": {
+                    "name": crd.metadata_name,
+                    "namespace": crd.namespace,
+                    "uid": crd.worker_task_id,
+                },
+            },
+            contextvars_copy=contextvars.copy_context(),
+            event_aggregator=engine.event_aggregator
+        )
+        kind.initialize_results_listeners(crd, spec, crd_manager)
+        tokens.append(crd.worker_task_id)
+    return tokens
+
+
+def results_of(token: str, test_cases: int) -> controller_pb2.ExecutionResultRequest:
+    results = controller_pb2.ExecutionResultRequest(name=token, token=token)
+    results.start_time.GetCurrentTime()
+    for i in range(test_cases):
+        result = results.validation_results.add(
+            name=f"test-{i}",
+            status=controller_pb2.ValidationResult.Status.SUCCEEDED
+        )
+        result.duration.FromMilliseconds(i % 100)
+    return results
+
+
+def run_client(
+    address: str,
+    tokens: List[str],
+    rate: float,
+    seconds: float,
+    test_cases: int,
+    latencies: List[float],
+    errors: List[str]
+):
+    """Report results at `rate` per second, round robin over the tokens."""
+    channel = grpc.insecure_channel(address)
+    stub = controller_pb2_grpc.TestSuiteExecutionResultServiceStub(channel)
+    interval = 1 / rate
+    start = time.perf_counter()
+    sent = 0
+    while (next_at := start + sent * interval) < start + seconds:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        results = results_of(tokens[sent % len(tokens)], test_cases)
+        sent += 1
+        request_start = time.perf_counter()
+        try:
+            stub.ReportResults(results, timeout=10)
+        except grpc.RpcError as e:
+            errors.append(e.code().name)
+            continue
+        latencies.append(time.perf_counter() - request_start)
+    channel.close()
+
+
+def wait_processed(engine: ControllerEngine, timeout: float = 60):
+    """Wait for the consumers of the ingest queue, if any."""
+    queue = engine.get_results_ingest_queue()
+    if queue is None:
+        return
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        counters = queue.as_dict()
+        if counters["processed"] >= counters["accepted"]:
+            return
+        time.sleep(0.01)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--suites", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument(
+        "--rate", type=float, default=500,
+        help="results reported per second, by all the clients"
+    )
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--test-cases", type=int, default=10)
+    parser.add_argument(
+        "--api-latency", type=float, default=0.005,
+        help="seconds waited by each call to the stubbed kubernetes API"
+    )
+    parser.add_argument(
+        "--server-threads", type=int, default=config.grpc_max_concurrent_reports
+    )
+    parser.add_argument(
+        "--queue-size", type=int, default=config.results_queue_size,
+        help="size of the ingest queue, 0 to notify in the gRPC threads"
+    )
+    parser.add_argument(
+        "--consumers", type=int, default=config.results_queue_consumers
+    )
+    args = parser.parse_args()
+    config.results_queue_size = args.queue_size
+    config.results_queue_consumers = args.consumers
+
+    rss_start = rss_mb()
+    engine = ControllerEngine()
+    engine.start()
+    api_client = StubApiClient(args.api_latency)
+    start = time.perf_counter()
+    tokens = register_suites(engine, api_client, args.suites)
+    register_time = time.perf_counter() - start
+    rss_registered = rss_mb()
+
+    address = f"127.0.0.1:{free_port()}"
+    server = build_grpc_server(
+        address, engine, max_concurrent_reports=args.server_threads
+    )
+    server.start()
+
+    latencies: List[float] = []
+    errors: List[str] = []
+    clients = [
+        threading.Thread(
+            target=run_client,
+            args=(
+                address,
+                tokens[i::args.clients] or tokens,
+                args.rate / args.clients,
+                args.seconds,
+                args.test_cases,
+                latencies,
+                errors,
+            )
+        )
+        for i in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    sent_time = time.perf_counter() - start
+    wait_processed(engine)
+    processed_time = time.perf_counter() - start
+    rss_end = rss_mb()
+    server.stop(None)
+    engine.stop()
+
+    print(
+        f"suites={args.suites} clients={args.clients} rate={args.rate:g}/s "
+        f"seconds={args.seconds:g} test_cases={args.test_cases} "
+        f"api_latency={args.api_latency * 1000:g}ms "
+        f"queue={args.queue_size}x{args.consumers}"
+    )
+    print(f"register        {register_time:8.2f}s")
+    ok = len(latencies)
+    print(
+        f"throughput      sent={ok / sent_time:8.1f}/s "
+        f"processed={ok / processed_time:8.1f}/s errors={len(errors)}"
+    )
+    if ok >= 2:
+        percentiles = statistics.quantiles(latencies, n=100)
+        print(
+            f"latency         p50={percentiles[49] * 1000:7.2f}ms "
+            f"p99={percentiles[98] * 1000:7.2f}ms "
+            f"max={max(latencies) * 1000:7.2f}ms"
+        )
+    print(
+        f"rss             start={rss_start:7.1f}MB "
+        f"registered={rss_registered:7.1f}MB end={rss_end:7.1f}MB "
+        f"({(rss_registered - rss_start) * 1024 / max(args.suites, 1):.2f}KB/suite)"
+    )
+    print(f"api calls       {api_client.calls}")
+    counters = engine.statistics()
+    print(f"status patches  {counters['status_patches']}")
+    print(f"results queue   {counters['results_queue']}")
+    if errors:
+        print(f"errors          {sorted(set(errors))}")
+
+
+if __name__ == "__main__":
+    main()
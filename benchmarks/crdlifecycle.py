@@ -0,0 +1,438 @@
+"""Run the lifecycle of N NetworkTestSuites against a fake kubernetes API.
+
+The lifecycle handlers (ControllerCRDLifecycleHandler, or its async
+version with --mode async) of an in-process ControllerEngine talk to the
+in-process fake API of benchmarks.fakekubeapi, through the same clients
+as in the cluster: the kubernetes client of the kind (pooled) and the
+asyncio client of kopf, whose event poster is also running.
+
+The CRs are stored in the fake API first, as `kubectl apply` would do,
+and then the handlers are called as kopf would call them, `--workers` at
+the same time, for all the CRs:
+
+- create: handle_create, the CronJob is created and the CR patched.
+- resume: the controller is restarted (a new engine and handlers) and
+  the CRs are resumed with the warm start (listed in pages), or one by
+  one with the resume handler (--resume handler, the bodies come from
+  the watch of kopf, not counted).
+- suspend: handle_suspend with `suspend: true`.
+- delete: handle_delete, the CronJob is deleted in cascade by kubernetes.
+
+For each phase the wall time and the API calls (per CR, by route, bytes
+and 429s) are reported. The events are posted in the background, by the
+aggregator of the engine and the poster of kopf, so they are reported
+once all of them are posted (or dropped).
+
+The fake API runs in the same process (and GIL) as the controller, the
+wall times are an upper bound to compare runs, the API calls per CR are
+the same as against a cluster.
+"""
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+from concurrent import futures
+from typing import Callable, Dict, List
+
+import kopf
+from kopf._cogs.clients import auth
+from kopf._cogs.structs import credentials, references
+from kopf._core.engines import posting
+from kubernetes import client
+
+from benchmarks.fakekubeapi import FakeKubeApi, RouteStatistics, \
+    diff_statistics, total_statistics
+from kubekarma.controlleroperator.config import config
+from kubekarma.controlleroperator.core.controllerengine import ControllerEngine
+from kubekarma.controlleroperator.core.testsuite.lifecyclehandler import \
+    AsyncControllerCRDLifecycleHandler, ControllerCRDLifecycleHandler
+from kubekarma.controlleroperator.kinds.networktestsuite import \
+    NetworkTestSuite
+
+CRONJOB_ANNOTATION = f"{config.API_GROUP}/cronjob"
+EVENTS_RESOURCE = references.Resource(
+    group="", version="v1", plural="events", namespaced=True
+)
+SPEC = {
+    "name": "benchmark",
+    "schedule": "*/5 * * * *",
+    "networkValidations": [
+        {
+            "name": "dns",
+            "testDNSResolution": {
+                "host": "kubernetes.default.svc",
+                "expectSuccess": True,
+            },
+        },
+    ],
+}
+
+
+class OperatorLoop:
+    """The loop of kopf: its API client, settings and event poster.
+
+    The handlers (and the threads of the sync ones) run with a copy of
+    the context of the loop, as kopf runs them.
+    """
+
+    def __init__(self, server: str):
+        self.server = server
+        self.loop = asyncio.new_event_loop()
+        self.context: contextvars.Context = contextvars.copy_context()
+        self._events_queue: asyncio.Queue = asyncio.Queue()
+
+    def start(self):
+        threading.Thread(
+            target=self.loop.run_forever, name="operator-loop", daemon=True
+        ).start()
+        self.context = asyncio.run_coroutine_threadsafe(
+            self._setup(), self.loop
+        ).result()
+
+    async def _setup(self) -> contextvars.Context:
+        self._vault = vault = credentials.Vault()
+        await vault.populate({
+            "fake": credentials.ConnectionInfo(server=self.server)
+        })
+        auth.vault_var.set(vault)
+        settings = kopf.OperatorSettings()
+        posting.settings_var.set(settings)
+        posting.event_queue_var.set(self._events_queue)
+        posting.event_queue_loop_var.set(asyncio.get_running_loop())
+        backbone = references.Backbone()
+        await backbone.fill(resources=[EVENTS_RESOURCE])
+        self._poster = asyncio.create_task(posting.poster(
+            event_queue=self._events_queue,
+            backbone=backbone,
+            settings=settings
+        ))
+        return contextvars.copy_context()
+
+    def pending_events(self) -> int:
+        return self._events_queue.qsize()
+
+    def run(self, coroutine):
+        """Run a coroutine on the loop, with the context of kopf."""
+        return self.context.copy().run(
+            asyncio.run_coroutine_threadsafe, coroutine, self.loop
+        ).result()
+
+    async def _shutdown(self):
+        self._poster.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._poster
+        # the sessions of the API client
+        await self._vault.close()
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def error_name(error: Exception) -> str:
+    status = getattr(error, "status", None)
+    return f"{type(error).__name__}({status})" if status else type(error).__name__
+
+
+def run_handlers(
+    operator: OperatorLoop,
+    handler: Callable,
+    calls: List[dict],
+    workers: int,
+    retries: int = 0
+) -> Dict[str, int]:
+    """Call the handler with each kwargs, return the errors by type.
+
+    The failed calls are retried right away, up to `retries` times (kopf
+    retries them after a backoff), the ones failing every time are
+    counted as "failed".
+    """
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def add_error(error: Exception):
+        name = error_name(error)
+        with lock:
+            errors[name] = errors.get(name, 0) + 1
+
+    def call_all(calls: List[dict]) -> List[dict]:
+        """Return the failed calls."""
+        if asyncio.iscoroutinefunction(handler):
+            async def run_all():
+                semaphore = asyncio.Semaphore(workers)
+
+                async def run_one(kwargs: dict) -> bool:
+                    async with semaphore:
+                        try:
+                            await handler(**kwargs)
+                            return True
+                        except Exception as e:
+                            add_error(e)
+                            return False
+                return await asyncio.gather(*map(run_one, calls))
+            succeeded = operator.run(run_all())
+        else:
+            def run_one(kwargs: dict) -> bool:
+                try:
+                    operator.context.copy().run(handler, **kwargs)
+                    return True
+                except Exception as e:
+                    add_error(e)
+                    return False
+            with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                succeeded = list(executor.map(run_one, calls))
+        return [kwargs for kwargs, ok in zip(calls, succeeded) if not ok]
+
+    for _ in range(retries + 1):
+        calls = call_all(calls)
+        if not calls:
+            break
+    if calls:
+        errors["failed"] = len(calls)
+    return errors
+
+
+def suite_body(name: str) -> dict:
+    return {
+        "apiVersion": f"{config.API_GROUP}/{config.API_VERSION}",
+        "kind": "NetworkTestSuite",
+        "metadata": {
+            "name": name,
+            "namespace": "benchmark",
+            "uid": f"uid-{name}",
+        },
+        "spec": dict(SPEC),
+    }
+
+
+class Benchmark:
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.api = FakeKubeApi(
+            latency=args.api_latency,
+            throttle_rate=args.throttle_rate,
+            retry_after=args.retry_after
+        )
+        self.operator = OperatorLoop(self.api.url)
+        self.plural = NetworkTestSuite.api_plural
+        self.engine = None
+        self.handlers = None
+
+    def start_controller(self):
+        """Start (or restart) the engine and the lifecycle handlers."""
+        if self.engine is not None:
+            self.engine.stop()
+        self.engine = ControllerEngine()
+        self.engine.start()
+        handlers_class = (
+            AsyncControllerCRDLifecycleHandler
+            if self.args.mode == "async" else ControllerCRDLifecycleHandler
+        )
+        self.handlers = handlers_class(
+            NetworkTestSuite(controller_engine=self.engine),
+            event_aggregator=self.engine.event_aggregator
+        )
+
+    def bodies(self) -> List[kopf.Body]:
+        return [
+            kopf.Body(item)
+            for item in self.api.list_objects(config.API_GROUP, self.plural)
+        ]
+
+    def phase(self, name: str, run: Callable[[], Dict[str, int]]):
+        before = self.api.statistics()
+        start = time.perf_counter()
+        errors = run()
+        wall_time = time.perf_counter() - start
+        self.report(name, wall_time, diff_statistics(self.api.statistics(), before))
+        if errors:
+            print(f"{'':10}errors {errors}")
+
+    def report(
+        self, name: str, wall_time: float, routes: Dict[str, RouteStatistics]
+    ):
+        suites = self.args.suites
+        total = total_statistics(routes)
+        print(
+            f"{name:10}wall={wall_time:8.2f}s "
+            f"crs/s={suites / wall_time if wall_time else 0:9.1f} "
+            f"calls={total.requests:7} ({total.requests / suites:.2f}/CR) "
+            f"in={total.bytes_in / 1024:9.1f}KB out={total.bytes_out / 1024:9.1f}KB "
+            f"429s={total.throttled}"
+        )
+        for route, statistics in sorted(routes.items()):
+            print(
+                f"{'':10}{route:28} {statistics.requests:7} "
+                f"({statistics.requests / suites:.2f}/CR) "
+                f"429s={statistics.throttled}"
+            )
+
+    def create(self) -> Dict[str, int]:
+        return run_handlers(
+            self.operator,
+            self.handlers.handle_create,
+            [
+                {"spec": body["spec"], "body": body}
+                for body in self.bodies()
+            ],
+            self.args.workers,
+            self.args.retries
+        )
+
+    def resume(self) -> Dict[str, int]:
+        self.start_controller()
+        if self.args.resume == "warm":
+            resumed = self.operator.context.copy().run(
+                self.handlers.warm_start, page_size=self.args.page_size
+            )
+            return {} if resumed == self.args.suites else {
+                "not resumed": self.args.suites - resumed
+            }
+        return run_handlers(
+            self.operator,
+            self.handlers.handle_resume_controller_restart,
+            [
+                {"spec": body["spec"], "body": body}
+                for body in self.bodies()
+                # kopf calls the create handler again for the other ones
+                if CRONJOB_ANNOTATION in body["metadata"].get("annotations", {})
+            ],
+            self.args.workers,
+            self.args.retries
+        )
+
+    def suspend(self) -> Dict[str, int]:
+        return run_handlers(
+            self.operator,
+            self.handlers.handle_suspend,
+            [
+                {"spec": dict(body["spec"], suspend=True), "body": body}
+                for body in self.bodies()
+                if self.handlers.is_acquired(body)
+            ],
+            self.args.workers,
+            self.args.retries
+        )
+
+    def delete(self) -> Dict[str, int]:
+        return run_handlers(
+            self.operator,
+            self.handlers.handle_delete,
+            [
+                {"spec": body["spec"], "body": body}
+                for body in self.bodies()
+                if self.handlers.is_acquired(body)
+            ],
+            self.args.workers,
+            self.args.retries
+        )
+
+    def wait_events(self):
+        """Wait for the events of the aggregator and the poster."""
+        deadline = time.monotonic() + self.args.events_timeout
+        while time.monotonic() < deadline:
+            if (
+                not self.engine.event_aggregator.as_dict()["pending"]
+                and not self.operator.pending_events()
+            ):
+                break
+            time.sleep(0.1)
+        # the last events being posted
+        time.sleep(0.5)
+
+    def run(self):
+        args = self.args
+        self.api.start()
+        client.Configuration.set_default(client.Configuration(host=self.api.url))
+        self.operator.start()
+        for i in range(args.suites):
+            self.api.add_object(
+                config.API_GROUP, self.plural, suite_body(f"suite-{i}")
+            )
+        self.start_controller()
+
+        print(
+            f"suites={args.suites} mode={args.mode} workers={args.workers} "
+            f"resume={args.resume} api_latency={args.api_latency * 1000:g}ms "
+            f"throttle_rate={args.throttle_rate:g} retries={args.retries} "
+            f"max_connections={config.k8s_api_max_connections}"
+        )
+        start = time.perf_counter()
+        self.phase("create", self.create)
+        self.phase("resume", self.resume)
+        self.phase("suspend", self.suspend)
+        self.phase("delete", self.delete)
+        wall_time = time.perf_counter() - start
+
+        before_events = self.api.statistics()
+        self.wait_events()
+        self.report(
+            "total", wall_time, diff_statistics(self.api.statistics(), {})
+        )
+        events = diff_statistics(self.api.statistics(), before_events).get(
+            "POST events", RouteStatistics()
+        )
+        print(
+            f"{'events':10}posted after the phases={events.requests} "
+            f"aggregator={self.engine.event_aggregator.as_dict()}"
+        )
+        self.engine.stop()
+        self.operator.stop()
+        self.api.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--suites", type=int, default=10000)
+    parser.add_argument(
+        "--mode", choices=("threads", "async"),
+        default=config.lifecycle_handlers_mode
+    )
+    parser.add_argument(
+        "--workers", type=int, default=8,
+        help="handlers running at the same time, kopf runs the sync "
+             "handlers in 8 threads"
+    )
+    parser.add_argument(
+        "--resume", choices=("warm", "handler"), default="warm"
+    )
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument(
+        "--api-latency", type=float, default=0.002,
+        help="seconds waited by each request to the fake API"
+    )
+    parser.add_argument(
+        "--throttle-rate", type=float, default=0,
+        help="fraction of the requests answered with a 429"
+    )
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument(
+        "--retries", type=int, default=3,
+        help="times a failed handler is called again"
+    )
+    parser.add_argument(
+        "--max-connections", type=int, default=config.k8s_api_max_connections
+    )
+    parser.add_argument(
+        "--events-rate", type=float, default=config.events_rate_limit
+    )
+    parser.add_argument(
+        "--events-burst", type=int, default=config.events_burst
+    )
+    parser.add_argument("--events-timeout", type=float, default=30)
+    args = parser.parse_args()
+    config.k8s_api_max_connections = args.max_connections
+    config.events_rate_limit = args.events_rate
+    config.events_burst = args.events_burst
+    # the handlers log every CR
+    logging.basicConfig(level=logging.WARNING)
+
+    Benchmark(args).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Compare the schedulers of the results deadlines.
+
+Each ResultsDeadlineValidator keeps a single event in the scheduler, re-armed
+every time it runs (the next cron time plus the execution estimation) and
+cancelled when its test suite is deleted or suspended.
+
+The benchmark simulates some minutes of a controller with N validators on
+cron schedules of 1 to 60 minutes, advancing a fake clock a second at a
+time, with a share of the test suites deleted and created again every
+minute. It measures the CPU time spent by:
+
+- sched: the sched.scheduler, as used by the original SchedulerThread.
+- heap: the SchedulerThread.
+- wheel: the TimingWheelScheduler.
+"""
+import argparse
+import random
+import sched
+import time
+from typing import Callable, List
+
+from kubekarma.controlleroperator.core.scheduler import SchedulerThread
+from kubekarma.controlleroperator.core.timingwheel import \
+    TimingWheelScheduler
+
+# the periods of the schedules, in minutes
+PERIODS = (1, 1, 1, 5, 10, 15, 30, 60)
+# ResultsDeadlineValidator.time_execution_estimation
+EXECUTION_ESTIMATION = 60
+
+
+class FakeClock:
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SchedBackend:
+    """The sched.scheduler with the API of the SchedulerThread."""
+
+    def __init__(self, clock: Callable[[], float]):
+        self._scheduler = sched.scheduler(clock, lambda delay: None)
+        self.enterabs = self._scheduler.enterabs
+        self.cancel = self._scheduler.cancel
+
+    def run_pending(self):
+        self._scheduler.run(blocking=False)
+
+
+BACKENDS = {
+    "sched": SchedBackend,
+    "heap": lambda clock: SchedulerThread(timefunc=clock),
+    "wheel": lambda clock: TimingWheelScheduler(timefunc=clock),
+}
+
+
+class Validator:
+    """The scheduling done by a ResultsDeadlineValidator."""
+
+    def __init__(self, scheduler, clock: FakeClock, period: int):
+        self.scheduler = scheduler
+        self.clock = clock
+        self.period = period * 60
+        self.event = None
+        self.checks = 0
+
+    def arm(self):
+        next_run = (self.clock.now // self.period + 1) * self.period
+        self.event = self.scheduler.enterabs(
+            next_run + EXECUTION_ESTIMATION, 1, self.check
+        )
+
+    def check(self):
+        self.checks += 1
+        self.arm()
+
+    def delete(self):
+        self.scheduler.cancel(self.event)
+
+
+def run(backend: str, validators: int, minutes: int, churn: float) -> dict:
+    rnd = random.Random(42)
+    clock = FakeClock(1_700_000_000.0)
+    scheduler = BACKENDS[backend](clock)
+    suites: List[Validator] = [
+        Validator(scheduler, clock, rnd.choice(PERIODS))
+        for _ in range(validators)
+    ]
+
+    start = time.process_time()
+    for validator in suites:
+        validator.arm()
+    arm_time = time.process_time() - start
+
+    start = time.process_time()
+    for second in range(minutes * 60):
+        if second % 60 == 0:
+            for i in rnd.sample(range(validators), int(validators * churn)):
+                suites[i].delete()
+                suites[i] = Validator(scheduler, clock, rnd.choice(PERIODS))
+                suites[i].arm()
+        clock.now += 1
+        scheduler.run_pending()
+    run_time = time.process_time() - start
+    return {
+        "arm": arm_time,
+        "run": run_time,
+        "checks": sum(v.checks for v in suites),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--validators", default="1000,10000,50000",
+        help="comma separated number of validators"
+    )
+    parser.add_argument("--minutes", type=int, default=10)
+    parser.add_argument(
+        "--churn", type=float, default=0.01,
+        help="share of the test suites deleted and created every minute"
+    )
+    parser.add_argument(
+        "--backends", default=",".join(BACKENDS),
+        help="comma separated backends"
+    )
+    args = parser.parse_args()
+
+    print(f"simulated minutes={args.minutes} churn={args.churn:.1%}")
+    print(
+        f"{'validators':>10} {'backend':>7} {'arm ms':>9} {'run ms':>9} "
+        f"{'us/check':>9} {'checks':>9}"
+    )
+    for validators in map(int, args.validators.split(",")):
+        for backend in args.backends.split(","):
+            result = run(backend, validators, args.minutes, args.churn)
+            checks = max(result["checks"], 1)
+            print(
+                f"{validators:>10} {backend:>7} "
+                f"{result['arm'] * 1000:>9.1f} {result['run'] * 1000:>9.1f} "
+                f"{result['run'] * 1e6 / checks:>9.2f} {result['checks']:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""An in-process fake of the kubernetes API, for the benchmarks.
+
+It serves, over HTTP on localhost, the endpoints called by the controller
+through the kubernetes client (CRDInstanceManager, TestSuiteKindBase
+.api_client) and the asyncio client of kopf:
+
+- the custom objects: GET, LIST (paginated with limit/continue), PATCH
+  and DELETE of /apis/<group>/<version>/[namespaces/<ns>/]<plural>[/<name>]
+- the CronJobs: POST, GET, PATCH and DELETE of /apis/batch/v1/...
+- the events: POST of /api/v1/namespaces/<ns>/events and of
+  /apis/events.k8s.io/v1/...
+
+The objects are kept in memory. The patches (merge or strategic merge,
+both applied as a JSON merge patch) are merged into the stored object,
+the JSON patches (a list) are rejected with a 415.
+
+Every request is counted by route (method and plural), with the bytes
+of the bodies received and sent. A latency can be added to every request
+and a fraction of them can be answered with a 429 (Too Many Requests)
+and a Retry-After header, as the API server does when it is throttling.
+"""
+import copy
+import dataclasses
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# /apis/<group>/<version>/... or /api/v1/... (the core group)
+RESOURCE_PATH = re.compile(
+    r"^/(?:apis/(?P<group>[^/]+)|api)/(?P<version>[^/]+)"
+    r"(?:/namespaces/(?P<namespace>[^/]+))?"
+    r"/(?P<plural>[^/]+)(?:/(?P<name>[^/]+))?$"
+)
+
+
+def merge_patch(target: dict, patch: dict) -> dict:
+    """Apply a JSON merge patch (RFC 7386) to the target, in place."""
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            merge_patch(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+    return target
+
+
+@dataclasses.dataclass
+class RouteStatistics:
+    """The requests received by a route."""
+    requests: int = 0
+    throttled: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+
+    def add(self, other: "RouteStatistics"):
+        self.requests += other.requests
+        self.throttled += other.throttled
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+
+    def subtract(self, other: "RouteStatistics") -> "RouteStatistics":
+        return RouteStatistics(
+            requests=self.requests - other.requests,
+            throttled=self.throttled - other.throttled,
+            bytes_in=self.bytes_in - other.bytes_in,
+            bytes_out=self.bytes_out - other.bytes_out,
+        )
+
+
+def diff_statistics(
+    after: Dict[str, RouteStatistics],
+    before: Dict[str, RouteStatistics]
+) -> Dict[str, RouteStatistics]:
+    """Return the requests received between two snapshots."""
+    routes = {}
+    for route, statistics in after.items():
+        delta = statistics.subtract(before.get(route, RouteStatistics()))
+        if delta.requests:
+            routes[route] = delta
+    return routes
+
+
+def total_statistics(routes: Dict[str, RouteStatistics]) -> RouteStatistics:
+    total = RouteStatistics()
+    for statistics in routes.values():
+        total.add(statistics)
+    return total
+
+
+class FakeKubeApi(ThreadingHTTPServer):
+    """The fake API server, started in a background thread.
+
+    Args:
+        latency: Seconds waited before answering every request.
+        throttle_rate: Fraction of the requests answered with a 429.
+        retry_after: The Retry-After (seconds) of the 429 answers.
+        seed: The seed choosing the throttled requests.
+    """
+
+    daemon_threads = True
+    # the clients open many connections at the same time
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        latency: float = 0,
+        throttle_rate: float = 0,
+        retry_after: int = 1,
+        seed: int = 0
+    ):
+        super().__init__(("127.0.0.1", 0), FakeKubeApiHandler)
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # (group, plural) -> (namespace, name) -> object
+        self._objects: Dict[Tuple[str, str], Dict[Tuple[str, str], dict]] = {}
+        self._statistics: Dict[str, RouteStatistics] = {}
+        self._names = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "FakeKubeApi":
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="fake-kube-api", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "FakeKubeApi":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def add_object(self, group: str, plural: str, obj: dict):
+        """Store an object, without counting a request (e.g. kubectl)."""
+        metadata = obj["metadata"]
+        with self._lock:
+            self._objects.setdefault((group, plural), {})[
+                (metadata.get("namespace", ""), metadata["name"])
+            ] = copy.deepcopy(obj)
+
+    def get_object(
+        self, group: str, plural: str, namespace: str, name: str
+    ) -> Optional[dict]:
+        with self._lock:
+            obj = self._objects.get((group, plural), {}).get((namespace, name))
+            return copy.deepcopy(obj) if obj is not None else None
+
+    def list_objects(self, group: str, plural: str) -> List[dict]:
+        with self._lock:
+            return copy.deepcopy(
+                list(self._objects.get((group, plural), {}).values())
+            )
+
+    def statistics(self) -> Dict[str, RouteStatistics]:
+        """Return a snapshot of the statistics, by route."""
+        with self._lock:
+            return {
+                route: dataclasses.replace(statistics)
+                for route, statistics in self._statistics.items()
+            }
+
+    def record(
+        self, route: str, bytes_in: int, bytes_out: int, throttled: bool
+    ):
+        with self._lock:
+            statistics = self._statistics.setdefault(route, RouteStatistics())
+            statistics.requests += 1
+            statistics.throttled += throttled
+            statistics.bytes_in += bytes_in
+            statistics.bytes_out += bytes_out
+
+    def should_throttle(self) -> bool:
+        if not self.throttle_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.throttle_rate
+
+    def handle_resource(
+        self,
+        method: str,
+        match: re.Match,
+        query: Dict[str, List[str]],
+        body: Optional[object]
+    ) -> Tuple[int, bytes]:
+        """Serve a request to a resource, return the status and content."""
+        with self._lock:
+            code, answer = self._handle_resource(method, match, query, body)
+            # serialized inside the lock, the objects are patched in place
+            return code, json.dumps(answer).encode()
+
+    def _handle_resource(
+        self,
+        method: str,
+        match: re.Match,
+        query: Dict[str, List[str]],
+        body: Optional[object]
+    ) -> Tuple[int, dict]:
+        group = match["group"] or "core"
+        plural = match["plural"]
+        namespace = match["namespace"] or ""
+        name = match["name"]
+        objects = self._objects.setdefault((group, plural), {})
+        if name is None:
+            if method == "GET":
+                return 200, self._list(objects, namespace, query)
+            if method == "POST":
+                return self._create(objects, namespace, body)
+            return 405, status_body(405, "MethodNotAllowed")
+        obj = objects.get((namespace, name))
+        if obj is None:
+            return 404, status_body(404, "NotFound", f"{plural} {name}")
+        if method == "GET":
+            return 200, obj
+        if method == "PATCH":
+            if not isinstance(body, dict):
+                return 415, status_body(415, "UnsupportedMediaType")
+            merge_patch(obj, body)
+            obj["metadata"]["resourceVersion"] = str(next(self._names))
+            return 200, obj
+        if method == "DELETE":
+            del objects[(namespace, name)]
+            return 200, status_body(200, "Success")
+        return 405, status_body(405, "MethodNotAllowed")
+
+    def _create(
+        self, objects: dict, namespace: str, body: Optional[object]
+    ) -> Tuple[int, dict]:
+        if not isinstance(body, dict):
+            return 400, status_body(400, "BadRequest")
+        obj = copy.deepcopy(body)
+        metadata = obj.setdefault("metadata", {})
+        if not metadata.get("name"):
+            metadata["name"] = (
+                f"{metadata.get('generateName', '')}{next(self._names):x}"
+            )
+        if namespace:
+            metadata["namespace"] = namespace
+        key = (metadata.get("namespace", ""), metadata["name"])
+        if key in objects:
+            return 409, status_body(409, "AlreadyExists", metadata["name"])
+        metadata["uid"] = f"uid-{next(self._names)}"
+        metadata["resourceVersion"] = str(next(self._names))
+        objects[key] = obj
+        return 201, obj
+
+    @staticmethod
+    def _list(
+        objects: dict, namespace: str, query: Dict[str, List[str]]
+    ) -> dict:
+        items = [
+            obj for (obj_namespace, _), obj in objects.items()
+            if not namespace or obj_namespace == namespace
+        ]
+        start = int(query.get("continue", ["0"])[0] or 0)
+        limit = int(query.get("limit", ["0"])[0] or 0) or len(items)
+        page = items[start:start + limit]
+        metadata = {}
+        if start + limit < len(items):
+            metadata["continue"] = str(start + limit)
+        return {"items": page, "metadata": metadata}
+
+
+def status_body(code: int, reason: str, message: str = "") -> dict:
+    return {
+        "kind": "Status",
+        "apiVersion": "v1",
+        "status": "Success" if code < 400 else "Failure",
+        "reason": reason,
+        "message": message or reason,
+        "code": code,
+    }
+
+
+class FakeKubeApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # the headers and the body are written apart, without waiting the ACK
+    disable_nagle_algorithm = True
+    server: FakeKubeApi
+
+    def handle_request(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+        url = urlsplit(self.path)
+        match = RESOURCE_PATH.match(url.path)
+        route = f"{self.command} {match['plural'] if match else url.path}"
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        headers = {}
+        throttled = match is not None and self.server.should_throttle()
+        if match is None:
+            code, body = 404, status_body(404, "NotFound", url.path)
+        elif throttled:
+            retry_after = self.server.retry_after
+            code, body = 429, status_body(429, "TooManyRequests")
+            body["details"] = {"retryAfterSeconds": retry_after}
+            headers["Retry-After"] = str(retry_after)
+        else:
+            try:
+                request_body = json.loads(raw_body) if raw_body else None
+            except ValueError:
+                code, body = 400, status_body(400, "BadRequest")
+            else:
+                code, content = self.server.handle_resource(
+                    self.command, match, parse_qs(url.query), request_body
+                )
+                body = None
+        if body is not None:
+            content = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(content)
+        self.server.record(route, len(raw_body), len(content), throttled)
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = handle_request
+
+    def log_message(self, *args):
+        pass
@@ -0,0 +1,95 @@
+"""Compare sequential connects against the batch ProbeEngine.
+
+The destinations are local ports of three kinds:
+  - listening: the handshake completes.
+  - closed: the connection is refused immediately.
+  - dropped: a listener with a full accept queue, the handshake is never
+    answered and the probe waits until the timeout (like a firewall
+    dropping the packets).
+"""
+import argparse
+import socket
+import time
+from typing import List
+
+from kubekarma.worker.networksuite.exactdestionationassertion import \
+    ExactDestinationAssertion
+from kubekarma.worker.networksuite.probeengine import ProbeEngine, \
+    ProbeTarget
+
+
+def build_targets(count: int, dropped_ratio: float) -> tuple:
+    sockets: List[socket.socket] = []
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(4096)
+    sockets.append(listener)
+
+    full = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    full.bind(("127.0.0.1", 0))
+    full.listen(0)
+    sockets.append(full)
+    # fill the accept queue, so the next handshakes are dropped
+    sockets.append(socket.create_connection(full.getsockname(), timeout=1))
+
+    closed = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    closed.bind(("127.0.0.1", 0))
+    closed_port = closed.getsockname()[1]
+    closed.close()
+
+    dropped = int(count * dropped_ratio)
+    targets = []
+    for index in range(count - dropped):
+        port = listener.getsockname()[1] if index % 2 else closed_port
+        targets.append(ProbeTarget("127.0.0.1", port))
+    targets += [ProbeTarget("127.0.0.1", full.getsockname()[1])] * dropped
+    return targets, sockets
+
+
+def run_sequential(targets: List[ProbeTarget], timeout: float) -> float:
+    ExactDestinationAssertion.CONNECTION_TIMEOUT = timeout
+    start = time.perf_counter()
+    for target in targets:
+        ExactDestinationAssertion._connect(target.ip, target.port, target.protocol)
+    return time.perf_counter() - start
+
+
+def run_batch(targets: List[ProbeTarget], timeout: float) -> float:
+    start = time.perf_counter()
+    ProbeEngine(timeout=timeout).probe(targets)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--targets", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=0.5)
+    parser.add_argument(
+        "--dropped-ratio", type=float, default=0.02,
+        help="ratio of destinations that never answer"
+    )
+    parser.add_argument(
+        "--skip-sequential", action="store_true",
+        help="only run the batch engine"
+    )
+    args = parser.parse_args()
+
+    targets, sockets = build_targets(args.targets, args.dropped_ratio)
+    try:
+        print(
+            f"targets={len(targets)} timeout={args.timeout}s "
+            f"dropped={int(args.targets * args.dropped_ratio)}"
+        )
+        batch = run_batch(targets, args.timeout)
+        print(f"batch ProbeEngine:   {batch:8.3f}s")
+        if not args.skip_sequential:
+            sequential = run_sequential(targets, args.timeout)
+            print(f"sequential connects: {sequential:8.3f}s")
+            print(f"speedup:             {sequential / batch:8.1f}x")
+    finally:
+        for sock in sockets:
+            sock.close()
+
+
+if __name__ == "__main__":
+    main()
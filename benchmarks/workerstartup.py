@@ -0,0 +1,151 @@
+"""Measure the latency from the worker start to its first result.
+
+Each run starts the worker as the CronJob does (a new `python
+kubekarma/worker/main.py` process) against a local gRPC controller, and
+measures the time until the controller receives the first validation
+result and the whole results.
+
+The test suite contains a single testExactDestination to a local
+listening port, so the measure is dominated by the startup of the worker.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent import futures
+from typing import List, Optional
+
+import grpc
+import yaml
+
+from kubekarma.grpcgen.collectors.v1alpha import controller_pb2, \
+    controller_pb2_grpc
+
+WORKER_MAIN = os.path.join("kubekarma", "worker", "main.py")
+
+
+class RecordingController(
+    controller_pb2_grpc.TestSuiteExecutionResultServiceServicer
+):
+    """Record when the first result and the whole results are received."""
+
+    def __init__(self):
+        self.first_result_at: Optional[float] = None
+        self.results_at: Optional[float] = None
+        self.done = threading.Event()
+
+    def reset(self):
+        self.first_result_at = None
+        self.results_at = None
+        self.done.clear()
+
+    def StreamResults(self, request_iterator, context):
+        for chunk in request_iterator:
+            if chunk.validation_results and self.first_result_at is None:
+                self.first_result_at = time.perf_counter()
+        self.results_at = time.perf_counter()
+        self.done.set()
+        return controller_pb2.ExecutionResultResponse(message="ok")
+
+    def ReportResults(self, request, context):
+        self.first_result_at = self.results_at = time.perf_counter()
+        self.done.set()
+        return controller_pb2.ExecutionResultResponse(message="ok")
+
+
+def run_worker(
+    controller: RecordingController,
+    env: dict,
+    show_output: bool
+) -> tuple:
+    controller.reset()
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, WORKER_MAIN],
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True
+    )
+    if process.returncode != 0 or not controller.done.wait(timeout=5):
+        print(process.stdout)
+        raise RuntimeError("The worker failed")
+    if show_output:
+        print(process.stdout)
+    return controller.first_result_at - start, controller.results_at - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--report", action="store_true",
+        help="print the startup timing report of the last run"
+    )
+    args = parser.parse_args()
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(16)
+
+    controller = RecordingController()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
+    controller_pb2_grpc.add_TestSuiteExecutionResultServiceServicer_to_server(
+        controller, server
+    )
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.getcwd(),
+        WORKER_TASK_ID="benchmark",
+        WORKER_TEST_SUITE_KIND="NetworkTestSuite",
+        WORKER_CONTROLLER_OPERATOR_URL=f"127.0.0.1:{port}",
+        WORKER_TASK_EXECUTION_CONFIG=yaml.safe_dump({
+            "name": "benchmark",
+            "networkValidations": [{
+                "name": "local-port",
+                "testExactDestination": {
+                    "destinationIP": "127.0.0.1",
+                    "port": listener.getsockname()[1],
+                    "expectSuccess": True
+                }
+            }]
+        }),
+    )
+    first_results: List[float] = []
+    totals: List[float] = []
+    try:
+        for run in range(args.runs):
+            is_last = run == args.runs - 1
+            if args.report and is_last:
+                env["WORKER_STARTUP_TIMING"] = "1"
+            first_result, total = run_worker(
+                controller, env, show_output=args.report and is_last
+            )
+            first_results.append(first_result)
+            totals.append(total)
+    finally:
+        server.stop(None)
+        listener.close()
+
+    print(f"runs={args.runs}")
+    for label, values in (
+        ("start to first result", first_results),
+        ("start to whole results", totals),
+    ):
+        print(
+            f"{label:<24} "
+            f"median={statistics.median(values) * 1000:7.1f}ms "
+            f"min={min(values) * 1000:7.1f}ms "
+            f"max={max(values) * 1000:7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
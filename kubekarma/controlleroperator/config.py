@@ -1,4 +1,6 @@
 import dataclasses
+from typing import Optional
+
 from kubekarma.controlleroperator import envs as _envs
 
 
@@ -7,6 +9,26 @@ class Config:
     controller_server_host: str
     worker_image: str
     log_level: int
+    grpc_server_mode: str = 'threads'
+    grpc_max_concurrent_reports: int = 10
+    grpc_max_concurrent_rpcs: Optional[int] = None
+    events_aggregation_window: float = 600
+    events_rate_limit: float = 1
+    events_burst: int = 20
+    deadline_scheduler: str = 'heap'
+    results_queue_size: int = 1000
+    results_queue_consumers: int = 4
+    k8s_api_max_connections: int = 16
+    k8s_api_keepalive: int = 60
+    lifecycle_handlers_mode: str = 'threads'
+    sharding_enabled: bool = False
+    shard_identity: str = 'kubekarma'
+    shard_address: str = 'localhost:8080'
+    shard_namespace: str = 'default'
+    shard_lease_duration: float = 15
+    warm_start: bool = True
+    results_history_size: int = 100
+    tracing_exporter: str = 'none'
     API_GROUP = 'kubekarma.io'
     API_VERSION = 'v1'
 
@@ -17,6 +39,26 @@ class Config:
             controller_server_host=envs.get_exposed_controller_grpc_address(),
             worker_image=envs.get_worker_docker_image(),
             log_level=envs.get_log_level(),
+            grpc_server_mode=envs.get_grpc_server_mode(),
+            grpc_max_concurrent_reports=envs.get_grpc_max_concurrent_reports(),
+            grpc_max_concurrent_rpcs=envs.get_grpc_max_concurrent_rpcs(),
+            events_aggregation_window=envs.get_events_aggregation_window(),
+            events_rate_limit=envs.get_events_rate_limit(),
+            events_burst=envs.get_events_burst(),
+            deadline_scheduler=envs.get_deadline_scheduler(),
+            results_queue_size=envs.get_results_queue_size(),
+            results_queue_consumers=envs.get_results_queue_consumers(),
+            k8s_api_max_connections=envs.get_k8s_api_max_connections(),
+            k8s_api_keepalive=envs.get_k8s_api_keepalive(),
+            lifecycle_handlers_mode=envs.get_lifecycle_handlers_mode(),
+            sharding_enabled=envs.get_sharding_enabled(),
+            shard_identity=envs.get_shard_identity(),
+            shard_address=envs.get_shard_address(),
+            shard_namespace=envs.get_shard_namespace(),
+            shard_lease_duration=envs.get_shard_lease_duration(),
+            warm_start=envs.get_warm_start(),
+            results_history_size=envs.get_results_history_size(),
+            tracing_exporter=envs.get_tracing_exporter(),
         )
 
 
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar
+from typing import Generic, Iterable, Tuple, TypeVar
 
 T = TypeVar("T")
 
@@ -16,6 +16,13 @@ class IResultsSubscriber(Generic[T], ABC):
     def update(self, results: T):
         """Receive the results of some the execution task."""
 
+    def update_partial(self, results: T):
+        """Receive the results received so far of a running execution task.
+
+        A hook method called by the __publisher while the results are being
+        streamed, the complete results are then received by .update().
+        """
+
     def __hash__(self):
         return hash(id(self))
 
@@ -41,6 +48,14 @@ class ITestResultsPublisher(ABC):
     ):
         """Add a new listener to the results of the execution task."""
 
+    def add_results_listeners(
+        self,
+        listeners: Iterable[Tuple[str, IResultsSubscriber[T]]]
+    ):
+        """Add many listeners at once, (execution id, subscriber) pairs."""
+        for execution_id, subscriber in listeners:
+            self.add_results_listener(execution_id, subscriber)
+
     @abstractmethod
     def remove_results_listeners(self, execution_id: str):
         """Remove all the listeners for the given execution task."""
@@ -48,3 +63,7 @@ class ITestResultsPublisher(ABC):
     @abstractmethod
     def notify_new_results(self, execution_id, results: T):
         """Receive the results of some the execution task."""
+
+    @abstractmethod
+    def notify_partial_results(self, execution_id, results: T):
+        """Receive the results received so far of a running execution task."""
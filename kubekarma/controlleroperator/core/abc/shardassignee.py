@@ -0,0 +1,23 @@
+import abc
+
+from kopf import Body
+
+
+class IShardAssignee(abc.ABC):
+    """Hold the in-memory state of the test suites owned by the replica.
+
+    The ShardCoordinator tells it which test suites to take and which to
+    give away when the owners change.
+    """
+
+    @abc.abstractmethod
+    def is_acquired(self, body: Body) -> bool:
+        """Return True if the operations for the CRD are running here."""
+
+    @abc.abstractmethod
+    def acquire(self, body: Body):
+        """Start the operations for a CRD now owned by the replica."""
+
+    @abc.abstractmethod
+    def release(self, body: Body):
+        """Stop the operations for a CRD now owned by another replica."""
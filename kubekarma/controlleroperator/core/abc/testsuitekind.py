@@ -1,5 +1,5 @@
 import abc
-from typing import List
+from typing import List, Optional, Tuple
 
 from kubernetes import client
 from kubernetes.client import V1CronJob
@@ -44,9 +44,23 @@ class ITestSuiteKind(abc.ABC):
         self,
         crd: CRD,
         spec: dict,
-        crd_manager: CRDInstanceManager
+        crd_manager: CRDInstanceManager,
+        status: Optional[dict] = None
     ) -> List[IResultsSubscriber]:
-        """Listen for the results of the execution task."""
+        """Listen for the results of the execution task.
+
+        The status of the CRD, if given, is the one the results continue.
+        """
+
+    @abc.abstractmethod
+    def initialize_results_listeners_bulk(
+        self,
+        suites: List[Tuple[CRD, dict, CRDInstanceManager, Optional[dict]]]
+    ):
+        """Listen for the results of many execution tasks at once.
+
+        Each suite is (crd, spec, crd manager, status of the CRD).
+        """
 
     @staticmethod
     @abc.abstractmethod
@@ -63,6 +77,10 @@ class ITestSuiteKind(abc.ABC):
     def remove_all_listeners(self, worker_task_id: str):
         """Remove all the listeners."""
 
+    @abc.abstractmethod
+    def remove_results_history(self, crd: CRD):
+        """Remove the executions history of the CRD instance."""
+
     @abc.abstractmethod
     def suspend_operations(self, crd_manager: CRDInstanceManager):
         """Suspend the operations for the CRD instance."""
@@ -0,0 +1,114 @@
+import socket
+import threading
+import time
+from typing import Optional
+
+from kubernetes import client
+from urllib3.connection import HTTPConnection
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def keepalive_socket_options(idle: int) -> list:
+    """Return the socket options to keep alive the idle connections.
+
+    The TCP keepalive probes start after `idle` seconds without traffic,
+    so the load balancers and NATs don't drop the pooled connections.
+    """
+    options = HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+    # only available on Linux
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options += [
+            (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle),
+            (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(1, idle // 3)),
+            (socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3),
+        ]
+    return options
+
+
+class PoolStatistics:
+    """The usage of the connections of a PooledApiClient."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.waited = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def start_waiting(self):
+        with self._lock:
+            self.waiting += 1
+
+    def acquired(self, wait_seconds: float, had_to_wait: bool):
+        with self._lock:
+            self.waiting -= 1
+            self.in_use += 1
+            self.requests += 1
+            self.waited += had_to_wait
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def released(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "waited": self.waited,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+
+
+class PooledApiClient(client.ApiClient):
+    """An ApiClient with a bounded pool of connections to the API server.
+
+    A single instance is meant to be shared by all the threads: at most
+    `max_connections` requests are sent at the same time, the rest wait for
+    a connection of the pool instead of opening (and discarding) new ones,
+    and the pooled connections are kept alive.
+
+    The wait is only bounded for the responses read by the API methods,
+    the ones returned without preloading the content (e.g. watches) free
+    their connection when they are read.
+    """
+
+    def __init__(
+        self,
+        configuration: Optional[client.Configuration] = None,
+        max_connections: int = 16,
+        keepalive: int = 60
+    ):
+        configuration = configuration or client.Configuration.get_default_copy()
+        configuration.connection_pool_maxsize = max_connections
+        super().__init__(configuration)
+        self.rest_client.pool_manager.connection_pool_kw["socket_options"] = (
+            keepalive_socket_options(keepalive)
+        )
+        self.max_connections = max_connections
+        self._connections = threading.BoundedSemaphore(max_connections)
+        self.pool_statistics = PoolStatistics()
+
+    def request(self, *args, **kwargs):
+        self.pool_statistics.start_waiting()
+        start = time.perf_counter()
+        had_to_wait = not self._connections.acquire(blocking=False)
+        if had_to_wait:
+            self._connections.acquire()
+        self.pool_statistics.acquired(time.perf_counter() - start, had_to_wait)
+        try:
+            return super().request(*args, **kwargs)
+        finally:
+            self._connections.release()
+            self.pool_statistics.released()
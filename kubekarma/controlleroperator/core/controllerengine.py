@@ -1,18 +1,105 @@
 import threading
+from typing import Optional
 
+from kubernetes import client
+
+from kubekarma.controlleroperator.config import config
+from kubekarma.controlleroperator.core import metrics
 from kubekarma.controlleroperator.core.abc.resultspublisher import \
     ITestResultsPublisher
+from kubekarma.controlleroperator.core.apiclientpool import PooledApiClient
+from kubekarma.controlleroperator.core.crdinstancemanager import CRD
+from kubekarma.controlleroperator.core.eventaggregator import \
+    EventAggregator
+from kubekarma.controlleroperator.core.resultsingestqueue import \
+    ResultsIngestQueue
 from kubekarma.controlleroperator.core.resultsreportpublisher import \
     ResultsReportPublisher
 from kubekarma.controlleroperator.core.scheduler import SchedulerThread
+from kubekarma.controlleroperator.core.sharding.coordinator import \
+    ShardCoordinator
+from kubekarma.controlleroperator.core.sharding.membership import \
+    LeaseMembership
+from kubekarma.controlleroperator.core.testsuite.resultshistory import \
+    ExecutionHistory, ResultsHistory
+from kubekarma.controlleroperator.core.testsuite.statustracker import \
+    StatusPatchCounters
+from kubekarma.controlleroperator.core.timingwheel import \
+    TimingWheelScheduler
+from kubekarma.controlleroperator.core.warmstart import WarmStartStatistics
 
 
 class ControllerEngine:
     """The heart of the controller"""
 
     def __init__(self):
-        self.scheduler = SchedulerThread()
+        self.warm_start_statistics = WarmStartStatistics()
+        if config.deadline_scheduler == "wheel":
+            self.scheduler = TimingWheelScheduler()
+        else:
+            self.scheduler = SchedulerThread()
         self.__publisher = ResultsReportPublisher()
+        self.__api_client: Optional[PooledApiClient] = None
+        self.__api_client_lock = threading.Lock()
+        self.__ingest_queue: Optional[ResultsIngestQueue] = None
+        if config.results_queue_size:
+            self.__ingest_queue = ResultsIngestQueue(
+                self.__publisher,
+                max_size=config.results_queue_size,
+                consumers=config.results_queue_consumers
+            )
+        self.status_patch_counters = StatusPatchCounters()
+        self.__results_history: Optional[ResultsHistory] = None
+        if config.results_history_size:
+            self.__results_history = ResultsHistory(
+                capacity=config.results_history_size
+            )
+        self.event_aggregator = EventAggregator(
+            window=config.events_aggregation_window,
+            rate=config.events_rate_limit,
+            burst=config.events_burst
+        )
+        self.__shard_coordinator: Optional[ShardCoordinator] = None
+        self.__shard_membership: Optional[LeaseMembership] = None
+        if config.sharding_enabled:
+            self.__shard_coordinator = ShardCoordinator(
+                identity=config.shard_identity,
+                address=config.shard_address
+            )
+
+    @property
+    def api_client(self) -> PooledApiClient:
+        """Return the api client shared by the whole controller.
+
+        It is built on the first use, once the operator is logged in.
+        """
+        with self.__api_client_lock:
+            if self.__api_client is None:
+                self.__api_client = PooledApiClient(
+                    max_connections=config.k8s_api_max_connections,
+                    keepalive=config.k8s_api_keepalive
+                )
+            return self.__api_client
+
+    def start_shard_membership(self):
+        """Join the ring of the replicas, once the operator is logged in.
+
+        The members are known on return, so the handlers of the CRDs only
+        see the test suites owned by this replica.
+        """
+        if self.__shard_coordinator is None:
+            return
+        if self.__shard_membership is None:
+            self.__shard_membership = LeaseMembership(
+                client.CoordinationV1Api(self.api_client),
+                namespace=config.shard_namespace,
+                identity=config.shard_identity,
+                address=config.shard_address,
+                on_change=self.__shard_coordinator.update_members,
+                lease_duration=config.shard_lease_duration,
+                renew_interval=config.shard_lease_duration / 3
+            )
+        self.__shard_membership.start()
 
     def is_healthy(self) -> bool:
         """Return True if the controller is healthy, False otherwise."""
@@ -21,12 +108,81 @@ class ControllerEngine:
     def stop(self):
         """Stop the controller"""
         self.scheduler.stop()
+        self.event_aggregator.stop()
+        if self.__ingest_queue is not None:
+            self.__ingest_queue.stop()
+        if self.__shard_membership is not None:
+            self.__shard_membership.stop()
+        if self.__shard_coordinator is not None:
+            self.__shard_coordinator.close()
 
     def start(self) -> threading.Thread:
         """Start the controller"""
         self.scheduler.start()
+        self.event_aggregator.start()
+        if self.__ingest_queue is not None:
+            self.__ingest_queue.start()
         return self.scheduler
 
+    def statistics(self) -> dict:
+        """Return the counters of the controller."""
+        return {
+            "status_patches": self.status_patch_counters.as_dict(),
+            "events": self.event_aggregator.as_dict(),
+            "scheduler": self.scheduler.statistics(),
+            "results_queue": (
+                self.__ingest_queue.as_dict() if self.__ingest_queue else {}
+            ),
+            "api_client_pool": (
+                self.__api_client.pool_statistics.as_dict()
+                if self.__api_client else {}
+            ),
+            "warm_start": self.warm_start_statistics.as_dict(),
+            "results_history": (
+                self.__results_history.as_dict()
+                if self.__results_history else {}
+            ),
+            "sharding": (
+                self.__shard_coordinator.as_dict()
+                if self.__shard_coordinator else {}
+            ),
+        }
+
+    def update_metrics(self):
+        """Set the gauges of the metrics, before they are collected."""
+        metrics.SUBSCRIBERS.set(self.__publisher.count_subscribers())
+        metrics.PENDING_DEADLINES.set(self.scheduler.pending())
+
     def get_results_publisher(self) -> ITestResultsPublisher:
         """Get the __publisher of the results of the test suite."""
         return self.__publisher
+
+    def get_results_ingest_queue(self) -> Optional[ResultsIngestQueue]:
+        """Get the queue of the results received, None if disabled."""
+        return self.__ingest_queue
+
+    def get_shard_coordinator(self) -> Optional[ShardCoordinator]:
+        """Get the coordinator of the replicas, None if not sharded."""
+        return self.__shard_coordinator
+
+    def get_results_history(self, crd: CRD) -> Optional[ExecutionHistory]:
+        """Get the executions history of a test suite, None if disabled."""
+        if self.__results_history is None:
+            return None
+        return self.__results_history.get_or_create(
+            crd.namespace, crd.metadata_name
+        )
+
+    def find_results_history(
+        self,
+        namespace: str,
+        name: str
+    ) -> Optional[ExecutionHistory]:
+        """Find the executions history of a test suite, None if unknown."""
+        if self.__results_history is None:
+            return None
+        return self.__results_history.get(namespace, name)
+
+    def remove_results_history(self, crd: CRD):
+        if self.__results_history is not None:
+            self.__results_history.remove(crd.namespace, crd.metadata_name)
@@ -1,15 +1,25 @@
+import contextlib
 import contextvars
+import copy
 import dataclasses
+import threading
+from typing import Iterator, Optional
 
 import kopf
 from kopf import Body
+from kopf._cogs.clients import api
 from kopf._cogs.structs import bodies
+from kopf._core.engines.posting import settings_var
 from kubernetes import client
 from kubernetes.client import ApiClient, V1CronJob
 
 from kubekarma.controlleroperator.config import config
+from kubekarma.controlleroperator.core import metrics
+from kubekarma.controlleroperator.core.eventaggregator import \
+    EventAggregator
 from kubekarma.controlleroperator.core.testsuite.types import \
     TestSuiteStatusType
+from kubekarma.shared.tracing import tracer
 from kubekarma.shared.crd.genericcrd import CRDTestExecutionStatus, \
     CRDTestPhase
 import logging
@@ -17,6 +27,16 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def merge_patches(target: dict, patch: dict) -> dict:
+    """Merge a JSON merge patch into another one, the patch wins."""
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            merge_patches(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+    return target
+
+
 @dataclasses.dataclass
 class CRD:
     """A class to keep a track of some CRD Test Suite created."""
@@ -74,7 +94,8 @@ class CRDInstanceManager:
         api_client: ApiClient,
         crd_ctx: CRD,
         body: bodies.Body,
-        contextvars_copy: contextvars.Context
+        contextvars_copy: contextvars.Context,
+        event_aggregator: Optional[EventAggregator] = None
     ):
         """Initialize the CRDInstanceManager.
 
@@ -90,10 +111,15 @@ class CRDInstanceManager:
                 Manual Context Management.
                 This Context is required due to how kopf works, it relies on
                 the ContextVar to manage independent settings for each handler.
+            event_aggregator (EventAggregator): The aggregator of the events,
+                if not set the events are posted right away.
         """
         self.api_client = api_client
+        self.custom_objects_api = client.CustomObjectsApi(api_client=api_client)
+        self.batch_api = client.BatchV1Api(api_client=api_client)
         self.crd_data = crd_ctx
         self._contextvars_copy = contextvars_copy
+        self._event_aggregator = event_aggregator
         # cache the data required by:
         #   kopf._cogs.structs.bodies.build_object_reference
         self.body_cache = bodies.Body({
@@ -105,40 +131,102 @@ class CRDInstanceManager:
                 "uid": body["metadata"]["uid"],
             }
         })
+        # The patches pending to be sent by the batch of each thread.
+        self._batch = threading.local()
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """Merge the patches of the CRD instance into a single API call.
+
+        The patches (metadata and status) done by the current thread inside
+        the context are merged and sent when the context exits, the last
+        value of each field wins. Nested batches join the outermost one.
+        The pending patch is sent even if the block raises an exception, as
+        the patches would have been sent without the batch.
+
+        The patches of other objects (e.g. the CronJob) and the events are
+        not affected.
+        """
+        if getattr(self._batch, "patch", None) is not None:
+            yield
+            return
+        self._batch.patch = {}
+        try:
+            yield
+        finally:
+            patch, self._batch.patch = self._batch.patch, None
+            if patch:
+                self._send_patch(patch)
 
     def info_event(self, reason: str, message: str):
-        # NOTE: kopf._cogs.clients.events.post_event has a hardcoded
-        # values to post events with "kopf" as the source.
-        self._contextvars_copy.run(
-            kopf.info,
-            self.body_cache,
-            reason=reason,
-            message=message,
-        )
+        self._event("Normal", reason, message)
 
     def error_event(self, reason: str, message: str):
-        # NOTE: kopf._cogs.clients.events.post_event has a hardcoded
-        # values to post events with "kopf" as the source.
-        self._contextvars_copy.run(
-            kopf.event,
-            self.body_cache,
-            reason=reason,
-            message=message,
-            type="Error"
+        self._event("Error", reason, message)
+
+    def _event(self, event_type: str, reason: str, message: str):
+        """Post the event, through the aggregator if there is one."""
+        def post(the_message: str):
+            # NOTE: kopf._cogs.clients.events.post_event has a hardcoded
+            # values to post events with "kopf" as the source.
+            if event_type == "Normal":
+                # kopf.info filters by the posting level
+                self._contextvars_copy.run(
+                    kopf.info,
+                    self.body_cache,
+                    reason=reason,
+                    message=the_message,
+                )
+                return
+            self._contextvars_copy.run(
+                kopf.event,
+                self.body_cache,
+                reason=reason,
+                message=the_message,
+                type=event_type
+            )
+        if self._event_aggregator is None:
+            post(message)
+            return
+        self._event_aggregator.emit(
+            self.body_cache["metadata"]["uid"],
+            event_type,
+            reason,
+            message,
+            post
         )
 
     def _patch_crd(self, patch: dict):
-        """Patch the CRD with the given patch."""
-        client.CustomObjectsApi(
-            api_client=self.api_client
-        ).patch_namespaced_custom_object(
-            group=config.API_GROUP,
-            version=config.API_VERSION,
-            namespace=self.crd_data.namespace,
-            plural=self.crd_data.plural,
-            name=self.crd_data.metadata_name,
-            body=patch
-        )
+        """Patch the CRD with the given patch.
+
+        Inside a .batch() the patch is merged with the pending one.
+        """
+        pending: Optional[dict] = getattr(self._batch, "patch", None)
+        if pending is not None:
+            merge_patches(pending, patch)
+            return
+        self._send_patch(patch)
+
+    def _send_patch(self, patch: dict):
+        """Send the patch to the kubernetes API."""
+        with metrics.STATUS_PATCH_SECONDS.labels(
+            kind=self.crd_data.plural
+        ).time(), tracer.start_span(
+            "CRDInstanceManager.patch_crd",
+            attributes={
+                "namespace": self.crd_data.namespace,
+                "name": self.crd_data.metadata_name,
+                "kind": self.crd_data.plural,
+            }
+        ):
+            self.custom_objects_api.patch_namespaced_custom_object(
+                group=config.API_GROUP,
+                version=config.API_VERSION,
+                namespace=self.crd_data.namespace,
+                plural=self.crd_data.plural,
+                name=self.crd_data.metadata_name,
+                body=patch
+            )
 
     def set_test_suite_result_status(self, status: TestSuiteStatusType):
         """Set the status of the test execution.
@@ -173,8 +261,12 @@ class CRDInstanceManager:
         The CRD phase represents the status of crd itself, not the status
         of the test execution.
         """
+        self._patch_crd(patch=self._get_phase_patch(phase))
+
+    @staticmethod
+    def _get_phase_patch(phase: CRDTestPhase) -> dict:
+        """Return the patch to set the phase of the CRD."""
         assert isinstance(phase, CRDTestPhase)
-        """Set the phase of the CRD."""
         patch = {
             "status": {
                 "phase": phase.value,
@@ -190,43 +282,132 @@ class CRDInstanceManager:
             patch["status"]["testExecutionStatus"] = (
                 CRDTestExecutionStatus.Pending.value
             )
-        self._patch_crd(patch=patch)
+        return patch
 
     def save(self):
         """Save the state of the CRD ctx instance."""
+        self._patch_crd(patch=self._get_save_patch())
+
+    def _get_save_patch(self) -> dict:
+        """Return the patch to save the state of the CRD ctx instance."""
         # validate all properties are defined
         self.crd_data.validate()
-        self._patch_crd(
-            patch={
-                "metadata": {
-                    "annotations": self.crd_data.generate_annotations()
-                }
+        return {
+            "metadata": {
+                "annotations": self.crd_data.generate_annotations()
             }
-        )
+        }
 
     def set_cronjob_suspend(self, suspend: bool):
         """Suspend the cronjob."""
         job_name = self.crd_data.cron_job_name
         logger.info(f"Suspending cronjob {job_name}")
-        client.BatchV1Api(
-            api_client=self.api_client
-        ).patch_namespaced_cron_job(
+        self.batch_api.patch_namespaced_cron_job(
             name=job_name,
             namespace=self.crd_data.namespace,
-            body={
-                "spec": {
-                    "suspend": suspend
-                }
-            }
+            body=self._get_cronjob_suspend_patch(suspend)
         )
 
+    @staticmethod
+    def _get_cronjob_suspend_patch(suspend: bool) -> dict:
+        return {
+            "spec": {
+                "suspend": suspend
+            }
+        }
+
     def create_cron_job(
         self,
         cron_job: V1CronJob
     ) -> V1CronJob:
-        return client.BatchV1Api(
-            api_client=self.api_client
-        ).create_namespaced_cron_job(
+        return self.batch_api.create_namespaced_cron_job(
             namespace=self.crd_data.namespace,
             body=cron_job
         )
+
+
+class AsyncCRDInstanceManager(CRDInstanceManager):
+    """A CRDInstanceManager for the async lifecycle handlers.
+
+    The coroutines (prefixed with `a`) send the requests with the asyncio
+    client of kopf, authenticated with the operator credentials, so the
+    handlers running on the operator loop never block a thread. The
+    blocking methods are still used by the results subscribers from their
+    own threads.
+
+    The coroutines must be awaited on the operator loop, from a handler
+    or a task started by one.
+    """
+
+    MERGE_PATCH_HEADERS = {"Content-Type": "application/merge-patch+json"}
+
+    @staticmethod
+    def _get_settings() -> kopf.OperatorSettings:
+        # the settings of the operator are only passed to the activity
+        # handlers, kopf.info() gets them in the same way
+        return settings_var.get()
+
+    def _crd_url(self) -> str:
+        crd = self.crd_data
+        return (
+            f"/apis/{config.API_GROUP}/{config.API_VERSION}"
+            f"/namespaces/{crd.namespace}/{crd.plural}/{crd.metadata_name}"
+        )
+
+    def _cron_jobs_url(self) -> str:
+        return f"/apis/batch/v1/namespaces/{self.crd_data.namespace}/cronjobs"
+
+    async def apatch_crd(self, patch: dict):
+        """Patch the CRD with the given patch."""
+        with metrics.STATUS_PATCH_SECONDS.labels(
+            kind=self.crd_data.plural
+        ).time():
+            await api.patch(
+                self._crd_url(),
+                payload=patch,
+                headers=self.MERGE_PATCH_HEADERS,
+                settings=self._get_settings(),
+                logger=logger
+            )
+
+    async def aset_phase_to_active(self):
+        """Set the status of the CRD to Active."""
+        await self.apatch_crd(self._get_phase_patch(CRDTestPhase.Active))
+
+    async def aset_phase_to_suspended(self):
+        """Set the status of the CRD to Suspended."""
+        await self.apatch_crd(self._get_phase_patch(CRDTestPhase.Suspended))
+
+    async def aset_phase_to_failed(self):
+        """Set the status of the CRD to Failed."""
+        await self.apatch_crd(self._get_phase_patch(CRDTestPhase.Failed))
+
+    async def asave_and_set_phase_to_active(self):
+        """Save the state of the CRD ctx instance and set it Active.
+
+        A single patch for the metadata and the status.
+        """
+        await self.apatch_crd(merge_patches(
+            self._get_save_patch(),
+            self._get_phase_patch(CRDTestPhase.Active)
+        ))
+
+    async def aset_cronjob_suspend(self, suspend: bool):
+        """Suspend the cronjob."""
+        job_name = self.crd_data.cron_job_name
+        logger.info(f"Suspending cronjob {job_name}")
+        await api.patch(
+            f"{self._cron_jobs_url()}/{job_name}",
+            payload=self._get_cronjob_suspend_patch(suspend),
+            headers=self.MERGE_PATCH_HEADERS,
+            settings=self._get_settings(),
+            logger=logger
+        )
+
+    async def acreate_cron_job(self, cron_job: V1CronJob) -> dict:
+        return await api.post(
+            self._cron_jobs_url(),
+            payload=self.api_client.sanitize_for_serialization(cron_job),
+            settings=self._get_settings(),
+            logger=logger
+        )
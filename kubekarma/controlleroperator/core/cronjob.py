@@ -50,6 +50,19 @@ class CronJobHelper:
                 value=kind
             ),
         ]
+        if config.grpc_server_mode == 'aio':
+            # A stream holds a thread of the threaded server during the
+            # whole execution, the results are sent at once there.
+            envs.append(V1EnvVar(
+                name='WORKER_STREAM_RESULTS',
+                value='true'
+            ))
+        if config.tracing_exporter not in ('', 'none'):
+            # the worker starts the traces continued by the controller
+            envs.append(V1EnvVar(
+                name='WORKER_TRACING_EXPORTER',
+                value=config.tracing_exporter
+            ))
 
         cron_job.spec = {
             "schedule": schedule,
@@ -0,0 +1,162 @@
+import collections
+import dataclasses
+import threading
+import time
+from typing import Callable, Deque, Dict, Hashable, Optional, Tuple
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Post an event with the given message.
+PostEvent = Callable[[str], None]
+
+
+@dataclasses.dataclass
+class _AggregatedEvent:
+    """The occurrences of an event inside the current window."""
+    message: str
+    post: PostEvent
+    window_started_at: float
+    # occurrences not posted yet
+    count: int = 0
+
+
+class EventAggregator:
+    """Aggregate the kubernetes events before posting them.
+
+    A test suite failing on every execution reports the same events again
+    and again (e.g. "Test suite failed" or "NoResultsReceived"), so:
+
+    - The first occurrence of an event (object, type, reason and message)
+      is posted, the identical ones inside the next `window` seconds are
+      only counted. When the window ends, a single event with the count is
+      posted and a new window starts; an event not repeated inside the
+      window is forgotten.
+    - The events are posted by a background thread, at most `rate` events
+      per second with bursts of `burst` events. The events exceeding the
+      rate wait, when more than `max_pending` are waiting the oldest ones
+      are dropped.
+    """
+
+    def __init__(
+        self,
+        window: float = 600,
+        rate: float = 1,
+        burst: int = 20,
+        max_pending: int = 1000,
+        flush_interval: float = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.window = window
+        self.rate = rate
+        self.burst = burst
+        self.flush_interval = flush_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._events: Dict[Hashable, _AggregatedEvent] = {}
+        self._pending: Deque[Tuple[PostEvent, str]] = collections.deque(
+            maxlen=max_pending
+        )
+        self._tokens = float(burst)
+        self._tokens_updated_at = clock()
+        self._counters = {"posted": 0, "aggregated": 0, "dropped": 0}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def emit(
+        self,
+        involved_object: Hashable,
+        event_type: str,
+        reason: str,
+        message: str,
+        post: PostEvent
+    ):
+        """Queue an event, unless an identical one is inside its window."""
+        key = (involved_object, event_type, reason, message)
+        with self._lock:
+            event = self._events.get(key)
+            if event is not None:
+                event.count += 1
+                self._counters["aggregated"] += 1
+                return
+            self._events[key] = _AggregatedEvent(
+                message=message,
+                post=post,
+                window_started_at=self._clock()
+            )
+            self._enqueue(post, message)
+
+    def _enqueue(self, post: PostEvent, message: str):
+        if len(self._pending) == self._pending.maxlen:
+            self._counters["dropped"] += 1
+        self._pending.append((post, message))
+
+    def _close_windows(self, now: float):
+        """Queue the count of the events whose window has finished."""
+        for key, event in list(self._events.items()):
+            if now - event.window_started_at < self.window:
+                continue
+            if not event.count:
+                del self._events[key]
+                continue
+            self._enqueue(
+                event.post,
+                f"{event.message} (repeated {event.count} times in the "
+                f"last {self.window:.0f}s)"
+            )
+            event.count = 0
+            event.window_started_at = now
+
+    def _take_tokens(self, now: float) -> int:
+        """Return the number of events allowed to be posted now."""
+        self._tokens = min(
+            float(self.burst),
+            self._tokens + (now - self._tokens_updated_at) * self.rate
+        )
+        self._tokens_updated_at = now
+        allowed = min(int(self._tokens), len(self._pending))
+        self._tokens -= allowed
+        return allowed
+
+    def flush(self):
+        """Post the pending events allowed by the rate limit."""
+        with self._lock:
+            now = self._clock()
+            self._close_windows(now)
+            to_post = [
+                self._pending.popleft() for _ in range(self._take_tokens(now))
+            ]
+            self._counters["posted"] += len(to_post)
+        for post, message in to_post:
+            try:
+                post(message)
+            except Exception:
+                logger.exception("Error posting the event: %s", message)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        # last chance for the events waiting for the rate limit
+        self.flush()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="event-aggregator",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return dict(self._counters, pending=len(self._pending))
@@ -0,0 +1,65 @@
+"""The Prometheus metrics of the controller, served by /metrics.
+
+The labels only take a few values (the plural of the kinds, the gRPC
+methods), never the name of a test suite, so the series don't grow with
+the test suites.
+"""
+import re
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# From a millisecond to a minute, the dispatch and the patches of the
+# status are expected to take a few milliseconds.
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+    30, 60
+)
+
+REPORT_RESULTS_SECONDS = Histogram(
+    "kubekarma_controller_report_results_seconds",
+    "Time answering the results reported by the workers.",
+    ["method"],
+    buckets=LATENCY_BUCKETS
+)
+RESULTS_DISPATCH_SECONDS = Histogram(
+    "kubekarma_controller_results_dispatch_seconds",
+    "Time notifying the results to the subscribers of a test suite.",
+    buckets=LATENCY_BUCKETS
+)
+STATUS_PATCH_SECONDS = Histogram(
+    "kubekarma_controller_status_patch_seconds",
+    "Latency of the patches of the CRDs sent to the API server.",
+    ["kind"],
+    buckets=LATENCY_BUCKETS
+)
+SCHEDULER_LATENESS_SECONDS = Histogram(
+    "kubekarma_controller_scheduler_lateness_seconds",
+    "Time the events of the scheduler were run after they were due.",
+    buckets=LATENCY_BUCKETS
+)
+RESULTS_RECEIVED = Counter(
+    "kubekarma_controller_results_received",
+    "Results of the executions of the test suites received.",
+    ["kind"]
+)
+# The statistics are named by the worker code (e.g. dns_cache_hits), a
+# fixed set; the names not looking like one are not counted.
+WORKER_STATISTICS = Counter(
+    "kubekarma_controller_worker_statistics",
+    "Counters reported by the workers with the results of the executions.",
+    ["kind", "statistic"]
+)
+WORKER_STATISTIC_NAME = re.compile(r"^[a-z][a-z0-9_]{0,63}$")
+SUBSCRIBERS = Gauge(
+    "kubekarma_controller_results_subscribers",
+    "Subscribers listening to the results of the test suites."
+)
+PENDING_DEADLINES = Gauge(
+    "kubekarma_controller_pending_deadlines",
+    "Events waiting in the scheduler, mostly the results deadlines."
+)
+WARM_START_SECONDS = Gauge(
+    "kubekarma_controller_warm_start_seconds",
+    "Time from the start of the controller until the test suites were "
+    "resumed by the warm start."
+)
@@ -0,0 +1,168 @@
+import math
+import queue
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from kubekarma.controlleroperator.core.abc.resultspublisher import \
+    ITestResultsPublisher
+from kubekarma.shared.tracing import SpanContext, tracer
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (is partial, execution id, results, trace of the servicer), None stops
+# the consumer
+_Item = Optional[Tuple[bool, str, object, Optional[SpanContext]]]
+
+
+class ResultsIngestQueue:
+    """A bounded queue between the gRPC servicers and the publisher.
+
+    The servicers only enqueue the results and answer the worker, the
+    consumer threads notify the subscribers (building the status and
+    patching the CRDs), so a slow kubernetes API doesn't keep the workers
+    waiting. When the queue is full the results are rejected and the
+    worker retries them later.
+
+    There is a queue per consumer and the results of an execution always
+    go to the same one, so they are processed in the received order.
+
+    The worker retries the results when the answer is lost (e.g. its
+    deadline expires once they are enqueued), so the results of an
+    execution already enqueued are accepted without enqueuing them again.
+    """
+
+    def __init__(
+        self,
+        publisher: ITestResultsPublisher,
+        max_size: int = 1000,
+        consumers: int = 4
+    ):
+        self.publisher = publisher
+        size = math.ceil(max_size / consumers)
+        self._queues: List["queue.Queue[_Item]"] = [
+            queue.Queue(maxsize=size) for _ in range(consumers)
+        ]
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._counters = {
+            "accepted": 0,
+            "rejected": 0,
+            "duplicated": 0,
+            "processed": 0,
+            "partial_skipped": 0,
+        }
+        # execution id -> start time of the last results enqueued
+        self._submitted: Dict[str, int] = {}
+        self._submitted_lock = threading.Lock()
+
+    def _increment(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _queue_of(self, execution_id: str) -> "queue.Queue[_Item]":
+        return self._queues[hash(execution_id) % len(self._queues)]
+
+    def submit(
+        self,
+        execution_id: str,
+        results,
+        started_at: Optional[int] = None
+    ) -> bool:
+        """Enqueue the results, False if the queue is full.
+
+        Args:
+            started_at: The start time of the execution, when given the
+                results of an execution already enqueued are skipped.
+        """
+        with self._submitted_lock:
+            if (
+                started_at is not None
+                and self._submitted.get(execution_id) == started_at
+            ):
+                self._increment("duplicated")
+                return True
+            try:
+                self._queue_of(execution_id).put_nowait(
+                    (False, execution_id, results, tracer.current_context())
+                )
+            except queue.Full:
+                self._increment("rejected")
+                return False
+            if started_at is not None:
+                self._submitted[execution_id] = started_at
+        self._increment("accepted")
+        return True
+
+    def submit_partial(self, execution_id: str, results) -> bool:
+        """Enqueue the partial results, skipped if the queue is half full.
+
+        The half of the queue is kept for the whole results, the partial
+        ones are only a preview. The results must not be modified after
+        being submitted.
+        """
+        items = self._queue_of(execution_id)
+        if items.qsize() >= items.maxsize // 2:
+            self._increment("partial_skipped")
+            return False
+        try:
+            items.put_nowait(
+                (True, execution_id, results, tracer.current_context())
+            )
+        except queue.Full:
+            self._increment("partial_skipped")
+            return False
+        return True
+
+    def _consume(self, items: "queue.Queue[_Item]"):
+        while (item := items.get()) is not None:
+            is_partial, execution_id, results, trace_context = item
+            try:
+                # the time waiting in the queue is the gap with the parent
+                with tracer.start_span(
+                    "ResultsIngestQueue.process",
+                    parent=trace_context,
+                    attributes={"partial": is_partial}
+                ):
+                    if is_partial:
+                        self.publisher.notify_partial_results(
+                            execution_id, results=results
+                        )
+                        continue
+                    self.publisher.notify_new_results(
+                        execution_id, results=results
+                    )
+                self._increment("processed")
+            except Exception as e:
+                logger.exception(e)
+
+    def start(self):
+        if self._threads:
+            return
+        for i, items in enumerate(self._queues):
+            thread = threading.Thread(
+                target=self._consume,
+                args=(items,),
+                name=f"results-consumer-{i}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop the consumers once they process the results in the queue."""
+        if not self._threads:
+            return
+        for items in self._queues:
+            items.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def pending(self) -> int:
+        return sum(items.qsize() for items in self._queues)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return dict(self._counters, pending=self.pending())
@@ -1,9 +1,12 @@
-from typing import Dict, Set
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
 
+from kubekarma.controlleroperator.core import metrics
 from kubekarma.controlleroperator.core.abc.resultspublisher import (
     ITestResultsPublisher,
     IResultsSubscriber
 )
+from kubekarma.shared.tracing import tracer
 
 import logging
 
@@ -11,9 +14,44 @@ logger = logging.getLogger(__name__)
 
 
 class ResultsReportPublisher(ITestResultsPublisher):
+    """Publish the results to the subscribers of each execution.
 
-    def __init__(self):
-        self.subscribers: Dict[str, Set[IResultsSubscriber]] = {}
+    The listeners are added and removed from the kopf handler threads while
+    the results are notified from the gRPC threads, so the subscribers are
+    kept in shards by execution id, each one with its own lock. The sets of
+    subscribers are never modified, a new set replaces the previous one
+    (copy on write), so the notifications don't take any lock and never
+    contend with each other.
+
+    A notification started before removing the listeners may still call
+    the removed subscribers with the set it already got.
+    """
+
+    def __init__(self, shards: int = 16):
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._shards: List[Dict[str, FrozenSet[IResultsSubscriber]]] = [
+            {} for _ in range(shards)
+        ]
+
+    def _shard_of(self, execution_id: str) -> int:
+        return hash(execution_id) % len(self._shards)
+
+    def get_subscribers(
+        self,
+        execution_id: str
+    ) -> FrozenSet[IResultsSubscriber]:
+        """Return the subscribers of the execution task."""
+        return self._shards[self._shard_of(execution_id)].get(
+            execution_id, frozenset()
+        )
+
+    def count_subscribers(self) -> int:
+        """Return the subscribers of all the execution tasks."""
+        return sum(
+            len(subscribers)
+            for shard in self._shards
+            for subscribers in list(shard.values())
+        )
 
     def add_results_listener(
         self,
@@ -26,11 +64,43 @@ class ResultsReportPublisher(ITestResultsPublisher):
             subscriber,
             execution_id
         )
-        self.subscribers.setdefault(execution_id, set()).add(subscriber)
+        index = self._shard_of(execution_id)
+        with self._locks[index]:
+            shard = self._shards[index]
+            shard[execution_id] = (
+                shard.get(execution_id, frozenset()) | {subscriber}
+            )
+
+    def add_results_listeners(
+        self,
+        listeners: Iterable[Tuple[str, IResultsSubscriber]]
+    ):
+        """Add many listeners, copying the set of each execution once."""
+        by_shard: List[Dict[str, Set[IResultsSubscriber]]] = [
+            {} for _ in self._shards
+        ]
+        count = 0
+        for execution_id, subscriber in listeners:
+            by_shard[self._shard_of(execution_id)].setdefault(
+                execution_id, set()
+            ).add(subscriber)
+            count += 1
+        for index, added in enumerate(by_shard):
+            if not added:
+                continue
+            with self._locks[index]:
+                shard = self._shards[index]
+                for execution_id, subscribers in added.items():
+                    shard[execution_id] = (
+                        shard.get(execution_id, frozenset()) | subscribers
+                    )
+        logger.info("Added %s listeners", count)
 
     def remove_results_listeners(self, execution_id: str):
+        index = self._shard_of(execution_id)
+        with self._locks[index]:
+            subscribers_set = self._shards[index].pop(execution_id, frozenset())
         # Delete all abject to avoid memory leaks.
-        subscribers_set = self.subscribers.pop(execution_id, {})
         for subscriber in subscribers_set:
             # Catch any exception to avoid breaking the loop causing
             # orphaned subscribers.
@@ -47,8 +117,23 @@ class ResultsReportPublisher(ITestResultsPublisher):
                 del subscriber
 
     def notify_new_results(self, execution_id: str, results):
-        for subscriber in self.subscribers.get(execution_id, []):
+        subscribers = self.get_subscribers(execution_id)
+        with metrics.RESULTS_DISPATCH_SECONDS.time(), tracer.start_span(
+            "ResultsReportPublisher.notify_new_results",
+            attributes={
+                "execution_id": execution_id,
+                "subscribers": len(subscribers),
+            }
+        ):
+            for subscriber in subscribers:
+                try:
+                    subscriber.update(results)
+                except Exception as e:
+                    logger.exception(e)
+
+    def notify_partial_results(self, execution_id: str, results):
+        for subscriber in self.get_subscribers(execution_id):
             try:
-                subscriber.update(results)
+                subscriber.update_partial(results)
             except Exception as e:
                 logger.exception(e)
@@ -1,31 +1,68 @@
-import sched
+import contextlib
+import dataclasses
+import heapq
+import itertools
 import threading
 import time
 import logging
+from typing import Callable, Iterator, List, Optional
+
+from kubekarma.controlleroperator.core import metrics
 
 logger = logging.getLogger(__name__)
 
 
+@dataclasses.dataclass(order=True)
+class ScheduledEvent:
+    """An event of the scheduler, returned to be able to cancel it."""
+    time: float
+    priority: int
+    # keep the insertion order for the events with the same time and
+    # priority, and never compare the actions
+    sequence: int
+    action: Callable = dataclasses.field(compare=False)
+    argument: tuple = dataclasses.field(compare=False, default=())
+    kwargs: dict = dataclasses.field(compare=False, default_factory=dict)
+    cancelled: bool = dataclasses.field(compare=False, default=False)
+    done: bool = dataclasses.field(compare=False, default=False)
+
+
 class SchedulerThread(threading.Thread):
     """A Daemon thread that runs a __scheduler.
 
     This thread is used to schedule tasks to be executed at a specific time,
     or after a specific delay, without blocking the main thread.
 
+    The events are kept in a heap, the thread sleeps until the first one
+    is due or an earlier one is entered. enterabs() and cancel() are
+    thread safe and O(log n): a cancelled event is only marked, and removed
+    when it reaches the top of the heap or when the cancelled events are
+    the most of the heap.
 
     Considerations:
         If the __scheduler is stopped while there are pending events, those
         events will be lost.
+        The times are wall clock timestamps (time.time), the thread never
+        sleeps more than MAX_WAIT seconds to follow the clock adjustments.
     """
 
-    def __init__(self):
+    MAX_WAIT = 300
+
+    def __init__(self, timefunc: Callable[[], float] = time.time):
         super().__init__()
-        self.__scheduler = sched.scheduler(time.time, time.sleep)
-        self.__event = threading.Event()
+        self.__timefunc = timefunc
+        self.__queue: List[ScheduledEvent] = []
+        self.__condition = threading.Condition()
+        self.__sequence = itertools.count()
+        self.__cancelled = 0
+        self.__bulk = False
         # Set this thread as a daemon to avoid waiting for it to finish
         # when the main thread finishes.
         self.daemon = True
         self.__stop = False
+        self.__executed = 0
+        self.__lateness_total = 0.0
+        self.__lateness_max = 0.0
 
     def enterabs(
             self,
@@ -34,42 +71,149 @@ class SchedulerThread(threading.Thread):
             action,
             argument=(),
             kwargs={}
-    ) -> sched.Event:
-        event = self.__scheduler.enterabs(
+    ) -> ScheduledEvent:
+        event = ScheduledEvent(
             a_time,
             priority,
+            next(self.__sequence),
             action,
             argument,
             kwargs
         )
-        self.__event.set()
+        with self.__condition:
+            if self.__bulk:
+                # sorted when the bulk ends
+                self.__queue.append(event)
+                return event
+            heapq.heappush(self.__queue, event)
+            if self.__queue[0] is event:
+                # wake up the thread to wait for the new first event
+                self.__condition.notify()
+        return event
+
+    @contextlib.contextmanager
+    def bulk(self) -> Iterator[None]:
+        """Enter many events at once, e.g. on a controller restart.
+
+        The events entered by the thread inside the block are sorted once
+        when it exits (heapify), the scheduler and the other threads wait
+        for it.
+        """
+        with self.__condition:
+            self.__bulk = True
+            try:
+                yield
+            finally:
+                self.__bulk = False
+                heapq.heapify(self.__queue)
+                self.__condition.notify()
+
+    def cancel(self, event: ScheduledEvent):
+        with self.__condition:
+            if event.cancelled or event.done:
+                # as sched.scheduler.cancel
+                raise ValueError("The event is not in the queue")
+            event.cancelled = True
+            self.__cancelled += 1
+            if self.__cancelled > len(self.__queue) // 2:
+                self.__compact()
+
+    def __compact(self):
+        """Remove the cancelled events from the heap."""
+        self.__queue = [e for e in self.__queue if not e.cancelled]
+        heapq.heapify(self.__queue)
+        self.__cancelled = 0
+
+    def __pop_cancelled(self):
+        while self.__queue and self.__queue[0].cancelled:
+            heapq.heappop(self.__queue)
+            self.__cancelled -= 1
+
+    def __pop_due_event(self) -> Optional[ScheduledEvent]:
+        """Return the first event if it is due, holding the condition."""
+        self.__pop_cancelled()
+        if not self.__queue:
+            return None
+        delay = self.__queue[0].time - self.__timefunc()
+        if delay > 0:
+            return None
+        event = heapq.heappop(self.__queue)
+        event.done = True
+        self.__executed += 1
+        self.__lateness_total += -delay
+        self.__lateness_max = max(self.__lateness_max, -delay)
+        metrics.SCHEDULER_LATENESS_SECONDS.observe(-delay)
         return event
 
+    def __wait(self):
+        """Wait for the first event to be due, holding the condition."""
+        if not self.__queue:
+            self.__condition.wait()
+            return
+        delay = self.__queue[0].time - self.__timefunc()
+        self.__condition.wait(min(delay, self.MAX_WAIT))
+
+    @staticmethod
+    def __run_event(event: ScheduledEvent):
+        try:
+            event.action(*event.argument, **event.kwargs)
+        except Exception:
+            logger.exception("Error running the scheduled %s", event)
+
+    def run_pending(self):
+        """Run the events already due, without waiting."""
+        while True:
+            with self.__condition:
+                event = self.__pop_due_event()
+            if event is None:
+                return
+            self.__run_event(event)
+
     def run(self):
         logger.info("Starting __scheduler thread.")
-        while not self.__stop:
-            if self.__scheduler.empty():
-                self.__event.wait()
+        while True:
+            with self.__condition:
+                while (
+                    not self.__stop and
+                    (event := self.__pop_due_event()) is None
+                ):
+                    self.__wait()
+                if self.__stop:
+                    break
+            self.__run_event(event)
 
-            self.__scheduler.run(blocking=False)
-            time.sleep(1)
-
-        if not self.__scheduler.empty():
+        if not self.empty():
             logger.info(
                 "I'm dying and __scheduler is not empty,"
                 " pending events (%s)",
-                len(self.__scheduler.queue)
+                self.pending()
             )
 
-    def cancel(self, event):
-        self.__scheduler.cancel(event)
-
     def stop(self):
-        self.__stop = True
-        self.__event.set()
+        with self.__condition:
+            self.__stop = True
+            self.__condition.notify()
 
     def is_running(self) -> bool:
         return not self.__stop
 
+    def pending(self) -> int:
+        """Return the number of events waiting to be run."""
+        with self.__condition:
+            return len(self.__queue) - self.__cancelled
+
     def empty(self):
-        return self.__scheduler.empty()
+        return self.pending() == 0
+
+    def statistics(self) -> dict:
+        """Return the queue depth and how late the events were run."""
+        with self.__condition:
+            executed = self.__executed
+            return {
+                "pending": len(self.__queue) - self.__cancelled,
+                "executed": executed,
+                "lateness_avg_seconds": (
+                    self.__lateness_total / executed if executed else 0.0
+                ),
+                "lateness_max_seconds": self.__lateness_max,
+            }
@@ -0,0 +1,162 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+from kopf import Body
+
+from kubekarma.controlleroperator.core.abc.shardassignee import IShardAssignee
+from kubekarma.controlleroperator.core.sharding.forwarder import \
+    ResultsForwarder
+from kubekarma.controlleroperator.core.sharding.hashring import HashRing
+from kubekarma.grpcgen.collectors.v1alpha import controller_pb2
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ShardCoordinator:
+    """Split the test suites between the replicas of the controller.
+
+    A test suite is owned by a single replica, chosen by its worker task
+    id in a consistent hash ring of the live replicas. The owner keeps the
+    listeners, the results deadline and patches the status; the results
+    received by another replica are forwarded to it.
+
+    Every replica tracks all the test suites, so when a replica joins or
+    leaves the ring each one takes the test suites it now owns and
+    releases the ones owned by others. Until every replica sees the new
+    members (a renewal of the leases), a test suite may be handled by two
+    replicas or by none, the results received in the meantime are rejected
+    as UNAVAILABLE and retried by the workers.
+
+    Until the members are known the replica owns nothing.
+    """
+
+    def __init__(
+        self,
+        identity: str,
+        address: str,
+        vnodes: int = 64,
+        forward_timeout: float = 10
+    ):
+        self.identity = identity
+        self.address = address
+        self.vnodes = vnodes
+        self.forwarder = ResultsForwarder(identity, timeout=forward_timeout)
+        self._lock = threading.Lock()
+        self._ring = HashRing(vnodes=vnodes)
+        self._addresses: Dict[str, str] = {}
+        # worker task id -> (last body seen, the one holding its state)
+        self._tracked: Dict[str, Tuple[Body, IShardAssignee]] = {}
+        # The test suites are reconciled by the membership thread and the
+        # kopf handlers, one at a time for each worker task id.
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._counters = {
+            "rebalances": 0,
+            "acquired": 0,
+            "released": 0,
+            "forwarded": 0,
+        }
+
+    def is_local(self, key: str) -> bool:
+        """Return True if this replica owns the worker task id."""
+        return self._ring.owner(key) == self.identity
+
+    def owner_address(self, key: str) -> Optional[str]:
+        """Return the address of the owner, None if nobody owns the key."""
+        with self._lock:
+            return self._addresses.get(self._ring.owner(key))
+
+    def forward(self, address: str, results: controller_pb2.ExecutionResultRequest):
+        """Forward the results to their owner, raise grpc.RpcError on errors."""
+        self.forwarder.forward(address, results)
+        with self._lock:
+            self._counters["forwarded"] += 1
+
+    def update_members(self, members: Dict[str, str]):
+        """Rebuild the ring with the live replicas, {identity: address}."""
+        ring = HashRing(members, vnodes=self.vnodes)
+        with self._lock:
+            self._ring = ring
+            self._addresses = dict(members)
+            self._counters["rebalances"] += 1
+            tracked = list(self._tracked.items())
+        self.forwarder.retain(
+            address for identity, address in members.items()
+            if identity != self.identity
+        )
+        for key, (body, assignee) in tracked:
+            self._reconcile(key, body, assignee)
+
+    def track(self, key: str, body: Body, assignee: IShardAssignee):
+        """Keep the last body of a test suite, taking it if it's owned."""
+        with self._lock:
+            self._tracked[key] = (body, assignee)
+        self._reconcile(key, body, assignee)
+
+    def forget(self, key: str):
+        """Stop tracking a deleted test suite, releasing it if acquired."""
+        with self._key_lock(key):
+            with self._lock:
+                body, assignee = self._tracked.pop(key, (None, None))
+                self._key_locks.pop(key, None)
+            if assignee is not None and assignee.is_acquired(body):
+                self._release(body, assignee)
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _reconcile(self, key: str, body: Body, assignee: IShardAssignee):
+        with self._key_lock(key):
+            with self._lock:
+                if key not in self._tracked:
+                    # forgotten meanwhile
+                    return
+                # the last body, the given one may be older
+                body, assignee = self._tracked[key]
+            owned = self.is_local(key)
+            acquired = assignee.is_acquired(body)
+            if owned and not acquired:
+                self._acquire(body, assignee)
+            elif not owned and acquired:
+                self._release(body, assignee)
+
+    def _acquire(self, body: Body, assignee: IShardAssignee):
+        try:
+            assignee.acquire(body)
+        except Exception:
+            logger.exception(
+                "Error acquiring %s/%s",
+                body["metadata"]["namespace"],
+                body["metadata"]["name"]
+            )
+            return
+        with self._lock:
+            self._counters["acquired"] += 1
+
+    def _release(self, body: Body, assignee: IShardAssignee):
+        try:
+            assignee.release(body)
+        except Exception:
+            logger.exception(
+                "Error releasing %s/%s",
+                body["metadata"]["namespace"],
+                body["metadata"]["name"]
+            )
+            return
+        with self._lock:
+            self._counters["released"] += 1
+
+    def close(self):
+        self.forwarder.close()
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            tracked = list(self._tracked)
+            return dict(
+                self._counters,
+                members=self._ring.members,
+                tracked=len(tracked),
+                owned=sum(self.is_local(key) for key in tracked),
+            )
@@ -0,0 +1,63 @@
+import threading
+from typing import Dict, Iterable
+
+import grpc
+
+from kubekarma.grpcgen.collectors.v1alpha import controller_pb2, \
+    controller_pb2_grpc
+from kubekarma.shared.tracing import tracer
+
+# The identity of the replica forwarding the results, a forwarded
+# request is never forwarded again.
+FORWARDED_BY_METADATA = "kubekarma-forwarded-by"
+
+
+class ResultsForwarder:
+    """Send the results received by this replica to their owner.
+
+    A channel is kept for each replica, the channels of the replicas
+    leaving are closed.
+    """
+
+    def __init__(self, identity: str, timeout: float = 10):
+        self.identity = identity
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._channels: Dict[str, grpc.Channel] = {}
+
+    def _get_stub(
+        self,
+        address: str
+    ) -> controller_pb2_grpc.TestSuiteExecutionResultServiceStub:
+        with self._lock:
+            if address not in self._channels:
+                self._channels[address] = grpc.insecure_channel(address)
+            channel = self._channels[address]
+        return controller_pb2_grpc.TestSuiteExecutionResultServiceStub(channel)
+
+    def forward(
+        self,
+        address: str,
+        results: controller_pb2.ExecutionResultRequest
+    ):
+        """Report the results to the replica, raise grpc.RpcError on errors."""
+        self._get_stub(address).ReportResults(
+            results,
+            timeout=self.timeout,
+            metadata=tracer.inject(((FORWARDED_BY_METADATA, self.identity),))
+        )
+
+    def retain(self, addresses: Iterable[str]):
+        """Close the channels to the other addresses."""
+        addresses = set(addresses)
+        with self._lock:
+            closed = [
+                self._channels.pop(address)
+                for address in list(self._channels)
+                if address not in addresses
+            ]
+        for channel in closed:
+            channel.close()
+
+    def close(self):
+        self.retain(())
@@ -0,0 +1,68 @@
+import bisect
+import hashlib
+from typing import Dict, Iterable, List, Optional
+
+
+def _hash(key: str) -> int:
+    # hash() is salted per process, the replicas must agree on the owners
+    return int.from_bytes(
+        hashlib.sha1(key.encode("utf-8")).digest()[:8], "big"
+    )
+
+
+class HashRing:
+    """A consistent hash ring of the controller replicas.
+
+    Each member is placed `vnodes` times in the ring and a key is owned by
+    the first member after its hash, so when a member joins or leaves
+    only ~1/N of the keys change their owner.
+    """
+
+    def __init__(self, members: Iterable[str] = (), vnodes: int = 64):
+        self.vnodes = vnodes
+        self._members: Dict[str, List[int]] = {}
+        self._points: List[int] = []
+        self._owners: Dict[int, str] = {}
+        for member in members:
+            self.add(member)
+
+    def add(self, member: str):
+        if member in self._members:
+            return
+        points = [_hash(f"{member}#{i}") for i in range(self.vnodes)]
+        self._members[member] = points
+        for point in points:
+            # on a (very unlikely) collision the lowest member wins, so
+            # the result doesn't depend on the order of the additions
+            if point in self._owners:
+                self._owners[point] = min(self._owners[point], member)
+                continue
+            self._owners[point] = member
+            bisect.insort(self._points, point)
+
+    def remove(self, member: str):
+        if member not in self._members:
+            return
+        del self._members[member]
+        self._points = []
+        self._owners = {}
+        members, self._members = self._members, {}
+        for other in members:
+            self.add(other)
+
+    def owner(self, key: str) -> Optional[str]:
+        """Return the member owning the key, None if the ring is empty."""
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(key))
+        return self._owners[self._points[index % len(self._points)]]
+
+    @property
+    def members(self) -> List[str]:
+        return sorted(self._members)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, member: str) -> bool:
+        return member in self._members
@@ -0,0 +1,184 @@
+import datetime
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from kubernetes import client
+from kubernetes.client.exceptions import ApiException
+
+from kubekarma.controlleroperator.config import config
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+SHARD_LABEL = f"{config.API_GROUP}/controller-shard"
+ADDRESS_ANNOTATION = f"{config.API_GROUP}/shard-address"
+
+# Called with the live members, {identity: gRPC address}.
+OnMembersChange = Callable[[Dict[str, str]], None]
+
+
+class LeaseMembership:
+    """The live replicas of the controller, known by their Leases.
+
+    Each replica renews its own Lease every `renew_interval` seconds, with
+    the address of its gRPC server, and lists the Leases of the others. A
+    replica is alive while its Lease keeps being renewed: the clocks of
+    the pods may differ, so (as the leader election of client-go does) a
+    renewal is timed with the local clock when it is observed, not with
+    the renewTime written by the replica. A replica stopping deletes its
+    Lease, so the others don't wait for it to expire.
+
+    A replica that can't renew its own Lease for `lease_duration` seconds
+    is no longer a member either, its keys are taken by the others.
+    """
+
+    def __init__(
+        self,
+        coordination_api: client.CoordinationV1Api,
+        namespace: str,
+        identity: str,
+        address: str,
+        on_change: Optional[OnMembersChange] = None,
+        lease_duration: float = 15,
+        renew_interval: float = 5,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.coordination_api = coordination_api
+        self.namespace = namespace
+        self.identity = identity
+        self.address = address
+        self.on_change = on_change
+        self.lease_duration = lease_duration
+        self.renew_interval = renew_interval
+        self._clock = clock
+        self._renewed_at: Optional[float] = None
+        # identity -> (last renewTime seen, local time it was seen)
+        self._observed: Dict[str, Tuple[object, float]] = {}
+        self._members: Dict[str, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def lease_name(self) -> str:
+        return f"kubekarma-shard-{self.identity}"
+
+    @property
+    def members(self) -> Dict[str, str]:
+        return dict(self._members)
+
+    def _get_lease(self) -> client.V1Lease:
+        return client.V1Lease(
+            metadata=client.V1ObjectMeta(
+                name=self.lease_name,
+                labels={SHARD_LABEL: "true"},
+                annotations={ADDRESS_ANNOTATION: self.address}
+            ),
+            spec=client.V1LeaseSpec(
+                holder_identity=self.identity,
+                lease_duration_seconds=int(self.lease_duration),
+                renew_time=datetime.datetime.now(datetime.timezone.utc)
+            )
+        )
+
+    def renew(self):
+        """Renew the Lease of this replica, creating it if needed."""
+        lease = self._get_lease()
+        try:
+            self.coordination_api.patch_namespaced_lease(
+                self.lease_name, self.namespace, lease
+            )
+        except ApiException as e:
+            if e.status != 404:
+                raise
+            self.coordination_api.create_namespaced_lease(
+                self.namespace, lease
+            )
+        self._renewed_at = self._clock()
+
+    def leave(self):
+        """Delete the Lease of this replica."""
+        try:
+            self.coordination_api.delete_namespaced_lease(
+                self.lease_name, self.namespace
+            )
+        except ApiException as e:
+            if e.status != 404:
+                raise
+
+    def _is_alive(self, identity: str, renew_time, now: float) -> bool:
+        if identity == self.identity:
+            return (
+                self._renewed_at is not None
+                and now - self._renewed_at < self.lease_duration
+            )
+        seen = self._observed.get(identity)
+        if seen is None or seen[0] != renew_time:
+            seen = (renew_time, now)
+        self._observed[identity] = seen
+        return now - seen[1] < self.lease_duration
+
+    def refresh(self) -> Dict[str, str]:
+        """List the Leases and return the live members."""
+        leases = self.coordination_api.list_namespaced_lease(
+            self.namespace, label_selector=f"{SHARD_LABEL}=true"
+        ).items
+        now = self._clock()
+        members = {}
+        for lease in leases:
+            identity = lease.spec.holder_identity
+            if identity and self._is_alive(identity, lease.spec.renew_time, now):
+                members[identity] = (
+                    lease.metadata.annotations[ADDRESS_ANNOTATION]
+                )
+        # forget the deleted Leases
+        for identity in set(self._observed) - {
+            lease.spec.holder_identity for lease in leases
+        }:
+            del self._observed[identity]
+        if members != self._members:
+            logger.info("Controller replicas: %s", sorted(members))
+            self._members = members
+            if self.on_change is not None:
+                self.on_change(dict(members))
+        return members
+
+    def heartbeat(self):
+        """Renew the Lease and refresh the members."""
+        try:
+            self.renew()
+        except Exception:
+            logger.exception("Error renewing the lease %s", self.lease_name)
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception("Error listing the controller replicas")
+
+    def _run(self):
+        while not self._stop.wait(self.renew_interval):
+            self.heartbeat()
+
+    def start(self):
+        """Join the replicas, the first members are known on return."""
+        if self._thread is not None:
+            return
+        self.heartbeat()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="shard-membership",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is None:
+            return
+        self._thread.join()
+        self._thread = None
+        try:
+            self.leave()
+        except Exception:
+            logger.exception("Error deleting the lease %s", self.lease_name)
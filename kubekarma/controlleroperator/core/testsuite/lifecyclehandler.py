@@ -1,17 +1,28 @@
 import contextvars
+import time
+from typing import Iterator, Optional
 
 import kopf
 from kopf import Body, Spec
+from kopf._cogs.clients import errors
+from kubernetes import client
 
 from kubekarma.controlleroperator.config import config
+from kubekarma.controlleroperator.core.abc.shardassignee import IShardAssignee
 from kubekarma.controlleroperator.core.abc.testsuitekind import ITestSuiteKind
-from kubekarma.controlleroperator.core.crdinstancemanager import CRD, \
-    CRDInstanceManager
+from kubekarma.controlleroperator.core.crdinstancemanager import \
+    AsyncCRDInstanceManager, CRD, CRDInstanceManager
+from kubekarma.controlleroperator.core.eventaggregator import \
+    EventAggregator
+from kubekarma.controlleroperator.core.sharding.coordinator import \
+    ShardCoordinator
+from kubekarma.controlleroperator.core.warmstart import WarmStartStatistics
 
 import logging
 
 from kubekarma.controlleroperator.core.testsuite.controllercrdvalidator import \
     ControllerCRDValidator
+from kubekarma.shared.crd.genericcrd import CRDTestPhase
 from kubekarma.shared.loghelper import PrefixFilter
 
 logger = logging.getLogger(__name__)
@@ -19,13 +30,24 @@ logger = logging.getLogger(__name__)
 logger.addFilter(PrefixFilter("ControllerCRDLifecycleHandler: "))
 
 
-class ControllerCRDLifecycleHandler:
+class ControllerCRDLifecycleHandler(IShardAssignee):
+
+    crd_manager_class = CRDInstanceManager
 
     def __init__(
         self,
         test_suite_kind: ITestSuiteKind,
+        event_aggregator: Optional[EventAggregator] = None,
+        shard_coordinator: Optional[ShardCoordinator] = None
     ):
-        """Initialize the handler."""
+        """Initialize the handler.
+
+        Args:
+            event_aggregator: Used by the CRD managers to post the events.
+            shard_coordinator: When the controller is sharded, the handlers
+                are only called for the CRDs owned by this replica (see
+                .owns()) and .handle_event() must receive all the events.
+        """
 
         self.kind = test_suite_kind.kind
         self.api_plural = test_suite_kind.api_plural
@@ -33,7 +55,12 @@ class ControllerCRDLifecycleHandler:
             validator=test_suite_kind.get_crd_validator()
         )
         self.test_suite_kind = test_suite_kind
-        self.__crds_managers: dict[str, CRDInstanceManager] = {}
+        self.event_aggregator = event_aggregator
+        self.shard_coordinator = shard_coordinator
+        self._crds_managers: dict[str, CRDInstanceManager] = {}
+        # The context of the last kopf handler, the CRDs acquired from the
+        # membership thread are created with it to post their events.
+        self._handler_context: Optional[contextvars.Context] = None
 
     def get_crd_manager(
         self,
@@ -44,15 +71,46 @@ class ControllerCRDLifecycleHandler:
         # related to the context management of the handlers, because
         # it uses the contextvars to store the settings of each handler.
         context_copy: contextvars.Context = contextvars.copy_context()
-        return CRDInstanceManager(
+        return self.crd_manager_class(
             api_client=self.test_suite_kind.api_client,
             crd_ctx=crd,
             body=body,
-            contextvars_copy=context_copy
+            contextvars_copy=context_copy,
+            event_aggregator=self.event_aggregator
         )
 
     def handle_create(self, spec: Spec, body: Body, **kwargs):
         """Handle the creation of the CRD instance."""
+        self._create(spec, body)
+
+    def _create(self, spec: Spec, body: Body):
+        crd_manager = self._create_crd_manager(body)
+        if not self._validate_spec(spec, crd_manager):
+            crd_manager.set_phase_to_failed()
+            return
+
+        cron_job = self._generate_cron_job(spec, body, crd_manager.crd_data)
+
+        # Call the api to create the cronjob
+        try:
+            crd_manager.create_cron_job(cron_job)
+        except client.ApiException as e:
+            if e.status != 409:
+                raise
+            self._on_cron_job_exists(cron_job)
+
+        self._on_cron_job_created(spec, cron_job, crd_manager)
+
+        # A single patch for the metadata and the status
+        with crd_manager.batch():
+            # Store the information of the CRD instance
+            crd_manager.save()
+
+            # Set the phase of the CRD to Active
+            crd_manager.set_phase_to_active()
+
+    def _create_crd_manager(self, body: Body) -> CRDInstanceManager:
+        """Return the CRD manager of a new CRD instance."""
         self._assert_is_expected_kind(body)
 
         crd = self.test_suite_kind.get_crd_for_creation(
@@ -60,12 +118,26 @@ class ControllerCRDLifecycleHandler:
             metadata_name=body['metadata']['name'],
             api_plural=self.api_plural
         )
+        if crd.metadata_name in self._crds_managers:
+            # A previous attempt failed after listening for the results
+            # (e.g. kopf retries it after a failed patch of the CRD), its
+            # listeners and deadlines are replaced by the ones of this one.
+            self.test_suite_kind.remove_all_listeners(crd.worker_task_id)
         crd_manager = self.get_crd_manager(
             body=body,
             crd=crd
         )
-        self.__crds_managers[crd.metadata_name] = crd_manager
+        self._crds_managers[crd.metadata_name] = crd_manager
+        return crd_manager
+
+    def _validate_spec(
+        self,
+        spec: Spec,
+        crd_manager: CRDInstanceManager
+    ) -> bool:
+        """Return False and report the errors if the spec is invalid."""
         if errors := self.controller_crd_validator.validate(spec):
+            crd = crd_manager.crd_data
             logger.error(
                 "Invalid spec for %s/%s of kind %s: %s",
 
@@ -74,13 +146,14 @@ class ControllerCRDLifecycleHandler:
                 self.kind,
                 errors
             )
-            crd_manager.set_phase_to_failed()
             crd_manager.error_event(
                 reason="InvalidSpec",
                 message=f"Invalid spec: {' '.join(errors)}"
             )
-            return
+            return False
+        return True
 
+    def _generate_cron_job(self, spec: Spec, body: Body, crd: CRD):
         cron_job = self.test_suite_kind.generate_cron_job(
             kind=self.kind,
             crd=crd,
@@ -92,27 +165,31 @@ class ControllerCRDLifecycleHandler:
         # Adopt the CronJob to set the owner reference in order to delete
         # the CronJob in cascade.
         kopf.adopt(cron_job, owner=body)  # type: ignore
+        return cron_job
 
-        # Call the api to create the cronjob
-        crd_manager.create_cron_job(cron_job)
+    @staticmethod
+    def _on_cron_job_exists(cron_job):
+        # The name is derived from the CRD, it was created by a previous
+        # attempt which failed before saving the CRD.
+        logger.info("CronJob %s already exists", cron_job.metadata.name)
 
+    def _on_cron_job_created(
+        self,
+        spec: Spec,
+        cron_job,
+        crd_manager: CRDInstanceManager
+    ):
         crd_manager.info_event(
             reason="CronJobCreated",
             message=f"CronJob created: {cron_job.metadata.name}"
         )
 
         self.test_suite_kind.initialize_results_listeners(
-            crd,
+            crd_manager.crd_data,
             dict(spec),
             crd_manager
         )
 
-        # Store the information of the CRD instance
-        crd_manager.save()
-
-        # Set the phase of the CRD to Active
-        crd_manager.set_phase_to_active()
-
     def handle_delete(self, spec, body, **kwargs):
         """Handle the deletion of the CRD instance.
 
@@ -120,7 +197,9 @@ class ControllerCRDLifecycleHandler:
         instance classes should be deleted.
         """
         self._assert_is_expected_kind(body)
-        crd_manager = self.__crds_managers[body['metadata']['name']]
+        self._remove(self._crds_managers[body['metadata']['name']])
+
+    def _remove(self, crd_manager: CRDInstanceManager):
         crd = crd_manager.crd_data
 
         logger.info(
@@ -131,7 +210,8 @@ class ControllerCRDLifecycleHandler:
         )
 
         self.test_suite_kind.remove_all_listeners(crd.worker_task_id)
-        self.__crds_managers.pop(crd.metadata_name)
+        self.test_suite_kind.remove_results_history(crd)
+        self._crds_managers.pop(crd.metadata_name)
 
     def handle_update(self, spec, body, **kwargs):
         self._assert_is_expected_kind(body)
@@ -143,9 +223,13 @@ class ControllerCRDLifecycleHandler:
         needs to be resumed using the information coming from the CRD.
         """
         self._assert_is_expected_kind(body)
+        self._resume(spec, body)
+
+    def _resume(self, spec, body: Body):
         crd = CRD.from_body(body, self.api_plural)
-        if crd.metadata_name in self.__crds_managers:
-            logger.error("FUCK! CRD instance already exists: %s", crd.metadata_name)
+        if crd.metadata_name in self._crds_managers:
+            # e.g. already resumed by the warm start
+            logger.debug("CRD instance already resumed: %s", crd.metadata_name)
             return
 
         logger.info(
@@ -155,12 +239,10 @@ class ControllerCRDLifecycleHandler:
             crd.metadata_name,
             self.kind
         )
-        # Generate the CRD manager as it was created by the handle_create
-        crd_manager = self.get_crd_manager(
-            body=body,
-            crd=crd
-        )
-        self.__crds_managers[crd.metadata_name] = crd_manager
+        crd_manager = self._add_crd_manager(body, crd)
+        if spec.get('suspend'):
+            # the listeners are initialized when it is resumed
+            return
 
         # At this point the controller relies on the information stored
         # to resume the operations (listeners), also trust the CronJob
@@ -168,15 +250,113 @@ class ControllerCRDLifecycleHandler:
         self.test_suite_kind.initialize_results_listeners(
             crd,
             dict(spec),
-            crd_manager
+            crd_manager,
+            status=body.get('status')
         )
 
+    def _add_crd_manager(self, body: Body, crd: CRD) -> CRDInstanceManager:
+        # Generate the CRD manager as it was created by the handle_create
+        crd_manager = self.get_crd_manager(
+            body=body,
+            crd=crd
+        )
+        self._crds_managers[crd.metadata_name] = crd_manager
+        return crd_manager
+
+    def warm_start(
+        self,
+        statistics: Optional[WarmStartStatistics] = None,
+        page_size: int = 500
+    ) -> int:
+        """Resume the operations for all the CRDs, on controller restarts.
+
+        The CRDs are listed at once (in pages) instead of being resumed one
+        by one by the resume handler, which then finds them resumed. The
+        status of each CRD is kept by the next results, and the listeners
+        and deadlines are registered in bulk. Return the CRDs resumed.
+        """
+        started_at = time.perf_counter()
+        items = list(self._list_all(page_size))
+        listed_at = time.perf_counter()
+        resumed = 0
+        suites = []
+        for item in items:
+            body = Body(item)
+            if (
+                not self._is_created(body)
+                or not self.owns(body)
+                or self.is_acquired(body)
+            ):
+                continue
+            crd = CRD.from_body(body, self.api_plural)
+            crd_manager = self._add_crd_manager(body, crd)
+            resumed += 1
+            if not body['spec'].get('suspend'):
+                suites.append(
+                    (crd, dict(body['spec']), crd_manager, body.get('status'))
+                )
+        self.test_suite_kind.initialize_results_listeners_bulk(suites)
+        finished_at = time.perf_counter()
+        logger.info(
+            "Warm start of %s: %s listed, %s resumed in %.3fs",
+            self.kind,
+            len(items),
+            resumed,
+            finished_at - started_at
+        )
+        if statistics is not None:
+            statistics.add(
+                listed=len(items),
+                resumed=resumed,
+                list_seconds=listed_at - started_at,
+                resume_seconds=finished_at - listed_at
+            )
+        return resumed
+
+    def _list_all(self, page_size: int) -> Iterator[dict]:
+        """Yield all the CRDs of the kind, in all the namespaces."""
+        custom_objects_api = client.CustomObjectsApi(
+            api_client=self.test_suite_kind.api_client
+        )
+        continue_token = None
+        while True:
+            page = custom_objects_api.list_cluster_custom_object(
+                config.API_GROUP,
+                config.API_VERSION,
+                self.api_plural,
+                limit=page_size,
+                _continue=continue_token
+            )
+            for item in page['items']:
+                item.setdefault(
+                    'apiVersion', f"{config.API_GROUP}/{config.API_VERSION}"
+                )
+                item.setdefault('kind', self.kind)
+                yield item
+            continue_token = page['metadata'].get('continue')
+            if not continue_token:
+                return
+
     def handle_suspend(self, spec, body, **kwargs):
         """Pause the controller operations for the CRD."""
         self._assert_is_expected_kind(body)
-        crd_manager = self.__crds_managers[body['metadata']['name']]
-        crd = crd_manager.crd_data
+        crd_manager = self._crds_managers[body['metadata']['name']]
         suspend = spec['suspend']
+        self._log_suspend(suspend, crd_manager)
+
+        if suspend:
+            crd_manager.set_cronjob_suspend(True)
+            self.test_suite_kind.suspend_operations(crd_manager)
+            crd_manager.set_phase_to_suspended()
+            self._on_suspended(crd_manager)
+        else:
+            crd_manager.set_cronjob_suspend(False)
+            self.test_suite_kind.resume_operations(crd_manager, dict(spec))
+            crd_manager.set_phase_to_active()
+            self._on_resumed(crd_manager)
+
+    def _log_suspend(self, suspend: bool, crd_manager: CRDInstanceManager):
+        crd = crd_manager.crd_data
         action = "Suspending" if suspend else "Resuming after suspension"
         logger.info(
             "%s controller operations for %s/%s of kind %s",
@@ -186,22 +366,96 @@ class ControllerCRDLifecycleHandler:
             self.kind
         )
 
-        if suspend:
-            crd_manager.set_cronjob_suspend(True)
-            self.test_suite_kind.suspend_operations(crd_manager)
-            crd_manager.set_phase_to_suspended()
-            crd_manager.info_event(
-                reason="TestSuiteSuspended",
-                message="Test suite suspended"
-            )
+    @staticmethod
+    def _on_suspended(crd_manager: CRDInstanceManager):
+        crd_manager.info_event(
+            reason="TestSuiteSuspended",
+            message="Test suite suspended"
+        )
+
+    @staticmethod
+    def _on_resumed(crd_manager: CRDInstanceManager):
+        crd_manager.info_event(
+            reason="TestSuiteResumed",
+            message="Test suite resumed "
+        )
+
+    def shard_key(self, body: Body) -> str:
+        """Return the worker task id, the key of the CRD in the ring."""
+        return self.test_suite_kind.get_crd_for_creation(
+            namespace=body['metadata']['namespace'],
+            metadata_name=body['metadata']['name'],
+            api_plural=self.api_plural
+        ).worker_task_id
+
+    def owns(self, body: Body, **kwargs) -> bool:
+        """Return True if this replica handles the CRD, a kopf filter."""
+        return (
+            self.shard_coordinator is None
+            or self.shard_coordinator.is_local(self.shard_key(body))
+        )
+
+    def handle_event(self, event, body: Body, **kwargs):
+        """Track all the CRDs, to take the ones owned after a rebalance."""
+        self._assert_is_expected_kind(body)
+        self._handler_context = contextvars.copy_context()
+        key = self.shard_key(body)
+        if event['type'] == 'DELETED':
+            self.shard_coordinator.forget(key)
         else:
-            crd_manager.set_cronjob_suspend(False)
-            self.test_suite_kind.resume_operations(crd_manager, dict(spec))
-            crd_manager.set_phase_to_active()
-            crd_manager.info_event(
-                reason="TestSuiteResumed",
-                message="Test suite resumed "
-            )
+            self.shard_coordinator.track(key, body, self)
+
+    def is_acquired(self, body: Body) -> bool:
+        return body['metadata']['name'] in self._crds_managers
+
+    def acquire(self, body: Body):
+        """Resume the operations for a CRD, creating it if it wasn't yet.
+
+        When sharded the CRDs are created here instead of by a kopf create
+        handler: kopf stores the last handled state on the CRD, shared by
+        all the replicas, so the owner may never see the creation if
+        another replica (or none) owned the CRD when it was added.
+        """
+        if self._is_created(body):
+            self._resume(body['spec'], body)
+            return
+        if not self._needs_create(body):
+            return
+        context = (
+            self._handler_context.copy()
+            if self._handler_context is not None
+            else contextvars.copy_context()
+        )
+        try:
+            context.run(self._create, body['spec'], body)
+        except Exception:
+            # created again on the next event or rebalance
+            self.release(body)
+            raise
+
+    @staticmethod
+    def _is_created(body: Body) -> bool:
+        """Return True if the CRD was created and it is not being deleted."""
+        annotations = body['metadata'].get('annotations', {})
+        return (
+            f"{config.API_GROUP}/cronjob" in annotations
+            and not body['metadata'].get('deletionTimestamp')
+        )
+
+    @staticmethod
+    def _needs_create(body: Body) -> bool:
+        """Return True if the CRD was not created, nor rejected, yet."""
+        return (
+            not body['metadata'].get('deletionTimestamp')
+            and (body.get('status') or {}).get('phase')
+            != CRDTestPhase.Failed.value
+        )
+
+    def release(self, body: Body):
+        """Stop the operations for a CRD, the CronJob keeps running."""
+        crd_manager = self._crds_managers.get(body['metadata']['name'])
+        if crd_manager is not None:
+            self._remove(crd_manager)
 
     def _assert_is_expected_kind(self, body: Body):
         """Validate if it is handling the correct kind.
@@ -211,3 +465,65 @@ class ControllerCRDLifecycleHandler:
         assert body["kind"] == self.kind, (
             f"Invalid kind: {body['kind']} expected {self.kind}"
         )
+
+
+class AsyncControllerCRDLifecycleHandler(ControllerCRDLifecycleHandler):
+    """The lifecycle handlers as coroutines, run on the operator loop.
+
+    kopf runs the sync handlers in its executor, so each request to the
+    kubernetes API blocks one of its threads. These handlers await the
+    requests instead, so a burst of creations is only limited by the
+    kubernetes API.
+    """
+
+    crd_manager_class = AsyncCRDInstanceManager
+
+    async def handle_create(self, spec: Spec, body: Body, **kwargs):
+        """Handle the creation of the CRD instance."""
+        crd_manager: AsyncCRDInstanceManager = self._create_crd_manager(body)
+        if not self._validate_spec(spec, crd_manager):
+            await crd_manager.aset_phase_to_failed()
+            return
+
+        cron_job = self._generate_cron_job(spec, body, crd_manager.crd_data)
+
+        # Call the api to create the cronjob
+        try:
+            await crd_manager.acreate_cron_job(cron_job)
+        except errors.APIConflictError:
+            self._on_cron_job_exists(cron_job)
+
+        self._on_cron_job_created(spec, cron_job, crd_manager)
+
+        await crd_manager.asave_and_set_phase_to_active()
+
+    async def handle_delete(self, spec, body, **kwargs):
+        # without requests to the kubernetes API
+        super().handle_delete(spec, body, **kwargs)
+
+    async def handle_update(self, spec, body, **kwargs):
+        super().handle_update(spec, body, **kwargs)
+
+    async def handle_resume_controller_restart(self, spec, body, **kwargs):
+        # without requests to the kubernetes API
+        super().handle_resume_controller_restart(spec, body, **kwargs)
+
+    async def handle_suspend(self, spec, body, **kwargs):
+        """Pause the controller operations for the CRD."""
+        self._assert_is_expected_kind(body)
+        crd_manager: AsyncCRDInstanceManager = (
+            self._crds_managers[body['metadata']['name']]
+        )
+        suspend = spec['suspend']
+        self._log_suspend(suspend, crd_manager)
+
+        if suspend:
+            await crd_manager.aset_cronjob_suspend(True)
+            self.test_suite_kind.suspend_operations(crd_manager)
+            await crd_manager.aset_phase_to_suspended()
+            self._on_suspended(crd_manager)
+        else:
+            await crd_manager.aset_cronjob_suspend(False)
+            self.test_suite_kind.resume_operations(crd_manager, dict(spec))
+            await crd_manager.aset_phase_to_active()
+            self._on_resumed(crd_manager)
@@ -1,4 +1,3 @@
-import sched
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -13,6 +12,7 @@ import logging
 
 from kubekarma.controlleroperator.core.crdinstancemanager import \
     CRDInstanceManager
+from kubekarma.controlleroperator.core.scheduler import ScheduledEvent
 from kubekarma.shared.loghelper import PrefixFilter
 
 logger = logging.getLogger(__name__)
@@ -45,7 +45,7 @@ class ResultsDeadlineValidator(IResultsSubscriber):
         )
         self.__expected_time_to_receive_results: Optional[datetime] = None
         self.__last_time_received_results: Optional[datetime] = None
-        self.__next_sched_event: Optional[sched.Event] = None
+        self.__next_sched_event: Optional[ScheduledEvent] = None
         self.__set_next_time_to_receive_results()
 
     def mark_results_received(self, received_at: datetime):
@@ -116,9 +116,8 @@ class ResultsDeadlineValidator(IResultsSubscriber):
 
     def update(self, results: T):
         self.mark_results_received(
-            datetime.fromisoformat(
-                results.started_at_time
-            )
+            # local time, as the rest of the times of this validator
+            datetime.fromtimestamp(results.start_time.seconds)
         )
 
     def on_delete(self):
@@ -0,0 +1,208 @@
+import sys
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from kubekarma.shared.crd.genericcrd import CRDTestExecutionStatus
+
+# The status of an execution is stored as its index in this tuple
+STATUS_CODES: Tuple[CRDTestExecutionStatus, ...] = tuple(CRDTestExecutionStatus)
+
+
+class ExecutionRecord:
+    """An execution of a test suite, as read from the history."""
+
+    __slots__ = ("timestamp", "status", "duration", "failed", "failed_tests")
+
+    def __init__(
+        self,
+        timestamp: float,
+        status: CRDTestExecutionStatus,
+        duration: float,
+        failed: int,
+        failed_tests: List[str]
+    ):
+        self.timestamp = timestamp
+        self.status = status
+        self.duration = duration
+        # all the test cases failed, the names may be truncated
+        self.failed = failed
+        self.failed_tests = failed_tests
+
+    def as_dict(self) -> dict:
+        return {
+            "timestamp": self.timestamp,
+            "status": self.status.value,
+            "duration": self.duration,
+            "failed": self.failed,
+            "failedTests": self.failed_tests,
+        }
+
+
+class ExecutionHistory:
+    """The last `capacity` executions of a test suite, in a ring buffer.
+
+    The records are stored by columns in arrays allocated once, so the
+    memory doesn't grow with the executions: 8 bytes for the timestamp,
+    4 for the duration, 1 for the status and 2 for the failed count of
+    each execution. The failed test cases are stored as indexes of a
+    table of names shared by the records, up to `max_failed_tests` per
+    execution.
+    """
+
+    def __init__(self, capacity: int = 100, max_failed_tests: int = 32):
+        self.capacity = capacity
+        self.max_failed_tests = max_failed_tests
+        self._lock = threading.Lock()
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._durations = array("f", bytes(4 * capacity))
+        self._statuses = array("B", bytes(capacity))
+        self._failed = array("H", bytes(2 * capacity))
+        self._failed_tests: List[Optional[array]] = [None] * capacity
+        self._names: List[str] = []
+        self._name_indexes: Dict[str, int] = {}
+        self._max_names = min(capacity * max_failed_tests, 0xFFFF)
+        # the next slot to write, the oldest record once full
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _name_index(self, name: str) -> int:
+        index = self._name_indexes.get(name)
+        if index is None:
+            index = len(self._names)
+            self._names.append(name)
+            self._name_indexes[name] = index
+        return index
+
+    def _compact_names(self):
+        """Drop the names not referenced by the records anymore."""
+        names: List[str] = []
+        name_indexes: Dict[str, int] = {}
+        for failed_tests in self._failed_tests:
+            if failed_tests is None:
+                continue
+            for position, index in enumerate(failed_tests):
+                name = self._names[index]
+                if name not in name_indexes:
+                    name_indexes[name] = len(names)
+                    names.append(name)
+                failed_tests[position] = name_indexes[name]
+        self._names = names
+        self._name_indexes = name_indexes
+
+    def add(
+        self,
+        timestamp: float,
+        status: CRDTestExecutionStatus,
+        duration: float,
+        failed_tests: Iterable[str] = ()
+    ):
+        """Record an execution, overwriting the oldest one when full."""
+        failed_tests = list(failed_tests)
+        names = failed_tests[:self.max_failed_tests]
+        with self._lock:
+            slot = self._next
+            # unreference the names of the overwritten record first
+            self._failed_tests[slot] = None
+            self._timestamps[slot] = timestamp
+            self._durations[slot] = duration
+            self._statuses[slot] = STATUS_CODES.index(status)
+            self._failed[slot] = min(len(failed_tests), 0xFFFF)
+            if names:
+                # the names of the renamed or removed test cases are kept
+                # while some record references them
+                if len(self._names) + len(names) > self._max_names:
+                    self._compact_names()
+                self._failed_tests[slot] = array(
+                    "H", map(self._name_index, names)
+                )
+            self._next = (slot + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def _record(self, slot: int) -> ExecutionRecord:
+        failed_tests = self._failed_tests[slot]
+        return ExecutionRecord(
+            timestamp=self._timestamps[slot],
+            status=STATUS_CODES[self._statuses[slot]],
+            # float32, rounded to its precision
+            duration=round(self._durations[slot], 6),
+            failed=self._failed[slot],
+            failed_tests=(
+                [self._names[index] for index in failed_tests]
+                if failed_tests is not None else []
+            )
+        )
+
+    def records(self, offset: int = 0, limit: int = 20) -> List[ExecutionRecord]:
+        """Return a page of the records, the most recent first."""
+        with self._lock:
+            stop = min(offset + limit, self._size)
+            return [
+                self._record((self._next - 1 - position) % self.capacity)
+                for position in range(max(offset, 0), stop)
+            ]
+
+    def memory_bytes(self) -> int:
+        """Return the bytes allocated by the history, an approximation."""
+        with self._lock:
+            size = sum(map(sys.getsizeof, (
+                self._timestamps,
+                self._durations,
+                self._statuses,
+                self._failed,
+                self._failed_tests,
+                self._names,
+                self._name_indexes,
+            )))
+            size += sum(
+                sys.getsizeof(failed_tests)
+                for failed_tests in self._failed_tests
+                if failed_tests is not None
+            )
+            size += sum(map(sys.getsizeof, self._names))
+            return size
+
+
+class ResultsHistory:
+    """The executions history of all the test suites of the controller."""
+
+    def __init__(self, capacity: int = 100, max_failed_tests: int = 32):
+        self.capacity = capacity
+        self.max_failed_tests = max_failed_tests
+        self._lock = threading.Lock()
+        self._histories: Dict[Tuple[str, str], ExecutionHistory] = {}
+
+    def get_or_create(self, namespace: str, name: str) -> ExecutionHistory:
+        """Return the history of a test suite, kept across suspensions."""
+        with self._lock:
+            history = self._histories.get((namespace, name))
+            if history is None:
+                history = ExecutionHistory(
+                    capacity=self.capacity,
+                    max_failed_tests=self.max_failed_tests
+                )
+                self._histories[(namespace, name)] = history
+            return history
+
+    def get(self, namespace: str, name: str) -> Optional[ExecutionHistory]:
+        with self._lock:
+            return self._histories.get((namespace, name))
+
+    def remove(self, namespace: str, name: str):
+        with self._lock:
+            self._histories.pop((namespace, name), None)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            histories = list(self._histories.values())
+        memory = [history.memory_bytes() for history in histories]
+        return {
+            "suites": len(histories),
+            "records": sum(map(len, histories)),
+            "capacity": self.capacity,
+            "memory_bytes": sum(memory),
+            "memory_bytes_max_per_suite": max(memory, default=0),
+        }
@@ -1,6 +1,8 @@
-from datetime import datetime
-from typing import List
+import time
+from datetime import timedelta, timezone
+from typing import List, Optional, Tuple
 
+from kubekarma.controlleroperator.core import metrics
 from kubekarma.controlleroperator.core.abc.resultspublisher import (
     IResultsSubscriber
 )
@@ -9,10 +11,13 @@ from kubekarma.controlleroperator.core.crdinstancemanager import (
     CRDInstanceManager
 )
 
+from kubekarma.controlleroperator.core.testsuite.resultshistory import \
+    ExecutionHistory
 from kubekarma.controlleroperator.core.testsuite.statustracker import \
-    TestSuiteStatusTracker
+    StatusPatchCounters, TestSuiteStatusTracker
 from kubekarma.controlleroperator.core.testsuite.types import TestCaseStatusType
 from kubekarma.grpcgen.collectors.v1alpha import controller_pb2
+from kubekarma.shared.tracing import tracer
 from kubekarma.shared.crd.genericcrd import (
     CRDTestExecutionStatus,
     AssertValidationStatus
@@ -32,38 +37,62 @@ class ResultsReportSubscriber(IResultsSubscriber):
     def __init__(
         self,
         schedule: str,
-        crd_manager: CRDInstanceManager
+        crd_manager: CRDInstanceManager,
+        partial_update_interval: timedelta = timedelta(seconds=5),
+        patch_counters: Optional[StatusPatchCounters] = None,
+        status: Optional[dict] = None,
+        history: Optional[ExecutionHistory] = None,
+        kind: str = "unknown"
     ):
         """Initialize the subscriber.
 
         Args:
             schedule: The schedule of the test suite, in crontab format.
             crd_manager: The manager of the CRD instance.
+            partial_update_interval: The minimum time between two status
+                updates while the results are being streamed, to avoid
+                patching the CRD once per test case.
+            patch_counters: Counters of the status patches sent, skipped
+                and minimized, shared by all the subscribers.
+            status: The current status of the CRD, to continue from it
+                when the controller is restarted.
+            history: The history of the executions of the test suite,
+                where each execution is recorded.
+            kind: The kind of the CRD, to count the results received.
         """
         self.crd_manager = crd_manager
         self.test_suite_status_tracker = TestSuiteStatusTracker()
+        self.test_suite_status_tracker.seed(status)
         self.schedule = schedule
+        self.partial_update_interval = partial_update_interval
+        self.__last_partial_update: Optional[float] = None
+        self.patch_counters = patch_counters or StatusPatchCounters()
+        self.history = history
+        self.kind = kind
 
-    def update(
-        self,
-        results: controller_pb2.ExecutionResultRequest
-    ):
-        """Receive the results of some the execution task.
+    def _apply_status(self, status: dict):
+        """Patch the CRD with the fields of the status that changed."""
+        tracker = self.test_suite_status_tracker
+        patch = tracker.calculate_status_patch(status)
+        if not patch:
+            self.patch_counters.increment("skipped")
+            return
+        self.crd_manager.set_test_suite_result_status(status=patch)
+        tracker.mark_as_applied(patch)
+        self.patch_counters.increment("sent")
+        if len(patch) < len(status):
+            self.patch_counters.increment("minimized")
 
-        This method is called by the __publisher when the results of an
-        execution task are available. The results should be interpreted
-        and used to set  the status of the CRD.
-        """
+    @staticmethod
+    def _get_test_cases_status(
+        results: controller_pb2.ExecutionResultRequest
+    ) -> Tuple[List[TestCaseStatusType], List[str]]:
+        """Return the status of each test case and the failed test names."""
         # Define the status that are considered as bad
         bad_status = (AssertValidationStatus.Failed, AssertValidationStatus.Error)
-
-        # prepare the patch to be applied to the CRD to report the results
         test_cases: List[TestCaseStatusType] = []
-        # The whole test execution status
-        whole_test_execution_status = CRDTestExecutionStatus.Succeeding
         failed_test = []
-
-        for result in results.test_case_results:
+        for result in results.validation_results:
             test_status = AssertValidationStatus.from_pb2_test_status(result.status)
             specific_test_case_status: TestCaseStatusType = {
                 # The unique name of the test case, we can consider this
@@ -72,17 +101,108 @@ class ResultsReportSubscriber(IResultsSubscriber):
                 # The status of the test case.
                 "status": test_status.value,
                 # The time it took to execute the test case.
-                "executionTime": result.execution_duration,
+                "executionTime": result.duration.ToJsonString(),
             }
-            # Check if the whole test suite should be marked as failing
             if test_status in bad_status:
-                whole_test_execution_status = CRDTestExecutionStatus.Failing
                 failed_test.append(result.name)
                 # If the test case failed due to an error,
                 # add the error message to the status.
                 if test_status == AssertValidationStatus.Error:
                     specific_test_case_status["error"] = result.error_message
             test_cases.append(specific_test_case_status)
+        return test_cases, failed_test
+
+    @staticmethod
+    def _get_execution_duration(
+        results: controller_pb2.ExecutionResultRequest
+    ) -> float:
+        """Return the wall time of the execution, in seconds.
+
+        The test cases may run concurrently, so it is the time from the
+        start of the execution to the end of the last test case, not the
+        sum of their durations.
+        """
+        if not results.validation_results:
+            return 0.0
+        start = results.start_time.ToNanoseconds()
+        end = max(
+            (
+                result.start_time.ToNanoseconds()
+                if result.HasField("start_time") else start
+            ) + result.duration.ToNanoseconds()
+            for result in results.validation_results
+        )
+        return max(end - start, 0) / 1e9
+
+    def _record_statistics(
+        self,
+        results: controller_pb2.ExecutionResultRequest
+    ):
+        """Log and count the statistics of the worker, e.g. the DNS cache."""
+        statistics = dict(results.statistics)
+        logger.info("Statistics of the execution %s: %s", results.token, statistics)
+        for name, value in statistics.items():
+            if value <= 0 or not metrics.WORKER_STATISTIC_NAME.match(name):
+                continue
+            metrics.WORKER_STATISTICS.labels(
+                kind=self.kind, statistic=name
+            ).inc(value)
+
+    def update_partial(
+        self,
+        results: controller_pb2.ExecutionResultRequest
+    ):
+        """Receive the results received so far of a running execution.
+
+        The status is updated with the test cases already completed, at
+        most once per `partial_update_interval`.
+        """
+        if not results.validation_results:
+            return
+        now = time.monotonic()
+        if (
+            self.__last_partial_update is not None and
+            now - self.__last_partial_update <
+            self.partial_update_interval.total_seconds()
+        ):
+            return
+        self.__last_partial_update = now
+        test_cases, _ = self._get_test_cases_status(results)
+        self._apply_status(
+            self.test_suite_status_tracker
+            .calculate_partial_test_suite_status(test_cases=test_cases)
+        )
+
+    def update(
+        self,
+        results: controller_pb2.ExecutionResultRequest
+    ):
+        """Receive the results of some the execution task.
+
+        This method is called by the __publisher when the results of an
+        execution task are available. The results should be interpreted
+        and used to set  the status of the CRD.
+        """
+        with tracer.start_span(
+            "ResultsReportSubscriber.update",
+            attributes={
+                "kind": self.kind,
+                "test_cases": len(results.validation_results),
+            }
+        ):
+            self._update(results)
+
+    def _update(self, results: controller_pb2.ExecutionResultRequest):
+        self.__last_partial_update = None
+        metrics.RESULTS_RECEIVED.labels(kind=self.kind).inc()
+        if results.statistics:
+            self._record_statistics(results)
+        test_cases, failed_test = self._get_test_cases_status(results)
+        # The whole test execution status
+        whole_test_execution_status = CRDTestExecutionStatus.Succeeding
+        if failed_test:
+            # at least one test case failed
+            whole_test_execution_status = CRDTestExecutionStatus.Failing
 
         if whole_test_execution_status == CRDTestExecutionStatus.Failing:
             logger.error("Test suite failed: %s", failed_test)
@@ -90,17 +210,22 @@ class ResultsReportSubscriber(IResultsSubscriber):
                 reason="Test suite failed",
                 message=f"Failed test: {failed_test}"
             )
+        if self.history is not None:
+            self.history.add(
+                timestamp=results.start_time.ToMicroseconds() / 1e6,
+                status=whole_test_execution_status,
+                duration=self._get_execution_duration(results),
+                failed_tests=failed_test
+            )
         # Create the status object to be applied to the CRD
         status_payload = (
             self.test_suite_status_tracker
             .calculate_current_test_suite_status(
                 current_status_reported=whole_test_execution_status,
                 test_cases=test_cases,
-                execution_time=datetime.fromisoformat(
-                    results.started_at_time
+                execution_time=results.start_time.ToDatetime(
+                    tzinfo=timezone.utc
                 )
             )
         )
-        self.crd_manager.set_test_suite_result_status(
-            status=status_payload
-        )
+        self._apply_status(status_payload)
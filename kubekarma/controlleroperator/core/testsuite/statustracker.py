@@ -1,18 +1,86 @@
-from datetime import datetime
-from typing import Optional
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 import logging
 
-from kubekarma.controlleroperator.core.testsuite.types import TestSuiteStatusType
+from kubekarma.controlleroperator.core.testsuite.types import (
+    TestCaseStatusType,
+    TestSuiteStatusType
+)
 from kubekarma.shared.crd.genericcrd import CRDTestExecutionStatus, \
     AssertValidationStatus
 
 logger = logging.getLogger(__name__)
 
 
-class TestSuiteStatusTracker:
+class StatusPatchCounters:
+    """Count the status patches sent, skipped and minimized.
+
+    A single instance is shared by the subscribers of all the CRDs.
+    """
 
     def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters = {"sent": 0, "skipped": 0, "minimized": 0}
+
+    def increment(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+
+class TestSuiteStatusTracker:
+
+    # Fields updated by every execution, a change on them alone is not
+    # worth a patch (and the watch events it triggers).
+    VOLATILE_FIELDS = frozenset({
+        "lastExecutionTime",
+        "lastSucceededTime",
+        "lastExecutionErrorTime",
+    })
+    VOLATILE_TEST_CASE_FIELDS = frozenset({"executionTime"})
+
+    def __init__(
+        self,
+        refresh_interval: timedelta = timedelta(minutes=10)
+    ) -> None:
+        """Initialize the tracker.
+
+        Args:
+            refresh_interval: The max time the volatile fields of the
+                status applied to the CRD are kept without changes.
+        """
         self.latest_status: Optional[TestSuiteStatusType] = None
+        # The status known to be applied to the CRD
+        self.applied_status: dict = {}
+        self.refresh_interval = refresh_interval
+        self.__applied_at: Optional[float] = None
+
+    def seed(self, status: Optional[dict]):
+        """Continue from the status of the CRD, e.g. after a restart.
+
+        The times of the last success and error are kept by the next
+        executions, and the fields already applied are not patched again.
+        """
+        if not status:
+            return
+        self.applied_status = dict(status)
+        if "lastExecutionTime" not in status:
+            # never executed
+            return
+        self.latest_status = {
+            "lastExecutionTime": status["lastExecutionTime"],
+            "lastExecutionErrorTime": status.get("lastExecutionErrorTime", "-"),
+            "lastSucceededTime": status.get("lastSucceededTime", "-"),
+            "testExecutionStatus": status.get("testExecutionStatus", ""),
+            "testCases": status.get("testCases", []),
+            "passingCount": status.get("passingCount", ""),
+            "suspended": status.get("suspended", False),
+        }
 
     def calculate_current_test_suite_status(
         self,
@@ -31,13 +99,6 @@ class TestSuiteStatusTracker:
         All times are in RFC3339 format.
         """
         execution_time_iso = execution_time.isoformat()
-        # count total failed test cases
-        failed_test_cases = [
-            test_case for test_case in test_cases
-            if test_case["status"] in (
-                AssertValidationStatus.Failed.value, AssertValidationStatus.Error.value
-            )
-        ]
 
         data: TestSuiteStatusType = {
             "lastExecutionTime": execution_time_iso,
@@ -51,7 +112,7 @@ class TestSuiteStatusTracker:
             ),
             "testExecutionStatus": current_status_reported.value,
             "testCases": test_cases,
-            "passingCount": f"{len(test_cases) - len(failed_test_cases) } / {len(test_cases)}", # noqa
+            "passingCount": self.get_passing_count(test_cases),
             "suspended": False
         }
         logger.info("data: %s", data)
@@ -59,6 +120,98 @@ class TestSuiteStatusTracker:
         self.latest_status = data
         return data
 
+    def calculate_partial_test_suite_status(
+        self,
+        test_cases: List[TestCaseStatusType]
+    ) -> dict:
+        """Return the status of the test cases of a running execution.
+
+        The test cases already completed replace the ones of the previous
+        execution with the same name, the rest are kept until they are
+        reported. Only the test cases related properties are returned, the
+        times are calculated when the whole execution is completed, so the
+        latest status is not modified.
+        """
+        test_cases_by_name = {
+            test_case["name"]: test_case for test_case in test_cases
+        }
+        previous_test_cases = (
+            self.latest_status["testCases"] if self.latest_status else []
+        )
+        merged = [
+            test_cases_by_name.pop(test_case["name"], test_case)
+            for test_case in previous_test_cases
+        ]
+        merged.extend(test_cases_by_name.values())
+        return {
+            "testCases": merged,
+            "passingCount": self.get_passing_count(merged),
+        }
+
+    def calculate_status_patch(self, status: dict) -> dict:
+        """Return the patch to apply the status over the applied status.
+
+        Only the fields that changed are returned, an empty patch means
+        there is nothing worth patching: only the volatile fields changed
+        and the applied status was refreshed recently.
+
+        The patch must be marked with .mark_as_applied() once sent.
+        """
+        changed = {
+            key: value for key, value in status.items()
+            if key not in self.applied_status or self.applied_status[key] != value
+        }
+        meaningful = [
+            key for key in changed
+            if key not in self.VOLATILE_FIELDS and not (
+                key == "testCases" and key in self.applied_status and
+                self._without_volatile(self.applied_status[key]) ==
+                self._without_volatile(changed[key])
+            )
+        ]
+        if self._must_refresh():
+            return changed
+        if not meaningful:
+            return {}
+        if "testCases" not in meaningful:
+            # only the execution times of the test cases changed
+            changed.pop("testCases", None)
+        return changed
+
+    def mark_as_applied(self, patch: dict):
+        """Keep track of a patch applied to the CRD."""
+        self.applied_status.update(patch)
+        if self.VOLATILE_FIELDS & patch.keys():
+            self.__applied_at = time.monotonic()
+
+    def _must_refresh(self) -> bool:
+        return (
+            self.__applied_at is None or
+            time.monotonic() - self.__applied_at >=
+            self.refresh_interval.total_seconds()
+        )
+
+    def _without_volatile(self, test_cases: list) -> list:
+        return [
+            {
+                key: value for key, value in test_case.items()
+                if key not in self.VOLATILE_TEST_CASE_FIELDS
+            }
+            for test_case in test_cases
+        ]
+
+    @staticmethod
+    def get_passing_count(test_cases: List[TestCaseStatusType]) -> str:
+        """Return the count of passing test cases, e.g. "3 / 4"."""
+        # count total failed test cases
+        failed_test_cases = [
+            test_case for test_case in test_cases
+            if test_case["status"] in (
+                AssertValidationStatus.Failed.value, AssertValidationStatus.Error.value
+            )
+        ]
+        return f"{len(test_cases) - len(failed_test_cases)} / {len(test_cases)}"
+
     def get_last_succeeded_time(
             self,
             current_status: CRDTestExecutionStatus,
@@ -36,7 +36,7 @@ A TestSuite Kind is composed of:
 """
 from abc import ABC
 from hashlib import sha1
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from kubernetes import client
 from kubernetes.client import V1CronJob
@@ -75,14 +75,11 @@ class TestSuiteKindBase(ITestSuiteKind, ABC):
     ):
         self.controller_engine = controller_engine
         self.publisher = self.controller_engine.get_results_publisher()
-        self.__api_client: Optional[client.ApiClient] = None
 
     @property
     def api_client(self) -> client.ApiClient:
-        """Return the api client."""
-        if not self.__api_client:
-            self.__api_client = client.ApiClient()
-        return self.__api_client
+        """Return the api client, shared by all the kinds."""
+        return self.controller_engine.api_client
 
     @staticmethod
     def generate_cron_job(
@@ -103,12 +100,19 @@ class TestSuiteKindBase(ITestSuiteKind, ABC):
     def get_results_subscriber(
         self,
         spec,
-        crd_manager: CRDInstanceManager
+        crd_manager: CRDInstanceManager,
+        status: Optional[dict] = None
     ) -> IResultsSubscriber:
         """Return the results' subscriber to react to the results test."""
         return ResultsReportSubscriber(
             schedule=spec['schedule'],
             crd_manager=crd_manager,
+            patch_counters=self.controller_engine.status_patch_counters,
+            status=status,
+            history=self.controller_engine.get_results_history(
+                crd_manager.crd_data
+            ),
+            kind=self.kind
         )
 
     def get_crd_for_creation(
@@ -131,12 +135,13 @@ class TestSuiteKindBase(ITestSuiteKind, ABC):
             plural=api_plural
         )
 
-    def initialize_results_listeners(
+    def _get_results_listeners(
         self,
         crd: CRD,
         spec: dict,
-        crd_manager: CRDInstanceManager
-    ) -> IResultsSubscriber:
+        crd_manager: CRDInstanceManager,
+        status: Optional[dict] = None
+    ) -> Tuple[IResultsSubscriber, IResultsSubscriber]:
         # Listen for the results of the execution task that run in a pod
         # controlled by a CronJob running on a specific namespace.
         logger.debug(
@@ -149,11 +154,8 @@ class TestSuiteKindBase(ITestSuiteKind, ABC):
         # test execution result
         result_subscriber = self.get_results_subscriber(
             spec=spec,
-            crd_manager=crd_manager
-        )
-        self.publisher.add_results_listener(
-            execution_id=crd.worker_task_id,
-            subscriber=result_subscriber
+            crd_manager=crd_manager,
+            status=status
         )
 
         # A listener to watch and ensure the result are received in time.
@@ -163,6 +165,22 @@ class TestSuiteKindBase(ITestSuiteKind, ABC):
             controller_engine=self.controller_engine,
             crd_manager=crd_manager
         )
+        return result_subscriber, deadline_validator
+
+    def initialize_results_listeners(
+        self,
+        crd: CRD,
+        spec: dict,
+        crd_manager: CRDInstanceManager,
+        status: Optional[dict] = None
+    ) -> IResultsSubscriber:
+        result_subscriber, deadline_validator = self._get_results_listeners(
+            crd, spec, crd_manager, status
+        )
+        self.publisher.add_results_listener(
+            execution_id=crd.worker_task_id,
+            subscriber=result_subscriber
+        )
         self.publisher.add_results_listener(
             execution_id=crd.worker_task_id,
             subscriber=deadline_validator
@@ -170,11 +188,35 @@ class TestSuiteKindBase(ITestSuiteKind, ABC):
 
         return result_subscriber
 
+    def initialize_results_listeners_bulk(
+        self,
+        suites: List[Tuple[CRD, dict, CRDInstanceManager, Optional[dict]]]
+    ):
+        """Listen for the results of many execution tasks at once.
+
+        The deadlines are scheduled in a single bulk of the scheduler and
+        the listeners added with a lock of the publisher per shard.
+        """
+        listeners = []
+        with self.controller_engine.scheduler.bulk():
+            for crd, spec, crd_manager, status in suites:
+                listeners.extend(
+                    (crd.worker_task_id, listener)
+                    for listener in self._get_results_listeners(
+                        crd, spec, crd_manager, status
+                    )
+                )
+        self.publisher.add_results_listeners(listeners)
+
     def remove_all_listeners(self, worker_task_id):
         self.publisher.remove_results_listeners(
             execution_id=worker_task_id
         )
 
+    def remove_results_history(self, crd: CRD):
+        """Forget the executions history of a removed CRD instance."""
+        self.controller_engine.remove_results_history(crd)
+
     def suspend_operations(self, crd_manager: CRDInstanceManager):
         """Suspend the operations for the CRD instance."""
         self.publisher.remove_results_listeners(
@@ -0,0 +1,269 @@
+import contextlib
+import dataclasses
+import itertools
+import math
+import threading
+import time
+import logging
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from kubekarma.controlleroperator.core import metrics
+from kubekarma.controlleroperator.core.scheduler import ScheduledEvent
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(order=True)
+class WheelEvent(ScheduledEvent):
+    # the tick the event is due, and the slot holding it
+    tick: int = dataclasses.field(compare=False, default=0)
+    slot: Optional[dict] = dataclasses.field(
+        compare=False, default=None, repr=False
+    )
+
+
+class TimingWheelScheduler(threading.Thread):
+    """A scheduler thread built on a hierarchical timing wheel.
+
+    It has the API of the SchedulerThread, but entering and cancelling an
+    event is O(1): the events are kept in slots of `tick` seconds. The
+    first wheel has a slot per tick, each next wheel has slots as large as
+    a whole turn of the previous one (by default: 60 seconds, 60 minutes,
+    24 hours and 400 days). When a wheel completes a turn, the events of
+    the next slot of the upper wheel are moved down, so an event is moved
+    at most once per wheel before running.
+
+    The granularity matches the cron schedules (minutes) with slots of a
+    second: an event never runs before its time, and at most one tick
+    later. The events of the same tick run in time and priority order.
+    """
+
+    DEFAULT_WHEELS = (60, 60, 24, 400)
+
+    def __init__(
+        self,
+        tick: float = 1.0,
+        wheels: Sequence[int] = DEFAULT_WHEELS,
+        timefunc: Callable[[], float] = time.time
+    ):
+        super().__init__()
+        self.daemon = True
+        self.tick = tick
+        self.__timefunc = timefunc
+        self.__sizes = tuple(wheels)
+        # the ticks of a slot of each wheel
+        self.__spans = [1]
+        for size in self.__sizes[:-1]:
+            self.__spans.append(self.__spans[-1] * size)
+        self.__wheels: List[List[Dict[int, WheelEvent]]] = [
+            [{} for _ in range(size)] for size in self.__sizes
+        ]
+        # the events beyond the last wheel
+        self.__overflow: Dict[int, WheelEvent] = {}
+        # the last tick processed
+        self.__current = self.__tick_of(timefunc())
+        # the tick the thread is sleeping until
+        self.__wakeup_tick: float = math.inf
+        self.__pending = 0
+        self.__sequence = itertools.count()
+        self.__condition = threading.Condition()
+        self.__bulk = False
+        self.__stop = False
+        self.__executed = 0
+        self.__lateness_total = 0.0
+        self.__lateness_max = 0.0
+
+    def __tick_of(self, a_time: float) -> int:
+        return math.floor(a_time / self.tick)
+
+    def __place(self, event: WheelEvent):
+        """Put the event in its slot, holding the condition."""
+        delta = event.tick - self.__current
+        for level, size in enumerate(self.__sizes):
+            if delta < self.__spans[level] * size:
+                slot = self.__wheels[level][
+                    (event.tick // self.__spans[level]) % size
+                ]
+                break
+        else:
+            slot = self.__overflow
+        slot[event.sequence] = event
+        event.slot = slot
+
+    def enterabs(
+            self,
+            a_time,
+            priority,
+            action,
+            argument=(),
+            kwargs={}
+    ) -> ScheduledEvent:
+        event = WheelEvent(
+            a_time,
+            priority,
+            next(self.__sequence),
+            action,
+            argument,
+            kwargs
+        )
+        with self.__condition:
+            if not self.__pending:
+                # nothing to move down, skip the idle ticks
+                self.__current = max(
+                    self.__current, self.__tick_of(self.__timefunc())
+                )
+            # run at the first tick starting after its time, or the next
+            # one if it is already due
+            event.tick = max(
+                math.ceil(a_time / self.tick), self.__current + 1
+            )
+            self.__place(event)
+            self.__pending += 1
+            if event.tick < self.__wakeup_tick and not self.__bulk:
+                self.__condition.notify()
+        return event
+
+    @contextlib.contextmanager
+    def bulk(self) -> Iterator[None]:
+        """Enter many events at once, e.g. on a controller restart.
+
+        The thread is woken up once when the block exits, the scheduler
+        and the other threads wait for it.
+        """
+        with self.__condition:
+            self.__bulk = True
+            try:
+                yield
+            finally:
+                self.__bulk = False
+                self.__condition.notify()
+
+    def cancel(self, event: ScheduledEvent):
+        with self.__condition:
+            if event.cancelled or event.done:
+                # as sched.scheduler.cancel
+                raise ValueError("The event is not in the queue")
+            event.cancelled = True
+            del event.slot[event.sequence]
+            event.slot = None
+            self.__pending -= 1
+
+    def __cascade(self):
+        """Move down the events of the upper wheels due in this turn."""
+        for level in range(1, len(self.__sizes)):
+            if self.__current % self.__spans[level]:
+                return
+            slot = self.__wheels[level][
+                (self.__current // self.__spans[level]) % self.__sizes[level]
+            ]
+            self.__replace(slot)
+        if self.__current % (self.__spans[-1] * self.__sizes[-1]) == 0:
+            self.__replace(self.__overflow)
+
+    def __replace(self, slot: Dict[int, WheelEvent]):
+        events = list(slot.values())
+        slot.clear()
+        for event in events:
+            self.__place(event)
+
+    def __pop_due_events(self) -> List[WheelEvent]:
+        """Advance the wheels up to now, holding the condition."""
+        now = self.__timefunc()
+        now_tick = self.__tick_of(now)
+        if not self.__pending:
+            self.__current = max(self.__current, now_tick)
+            return []
+        due: List[WheelEvent] = []
+        while self.__current < now_tick:
+            self.__current += 1
+            self.__cascade()
+            slot = self.__wheels[0][self.__current % self.__sizes[0]]
+            due.extend(slot.values())
+            slot.clear()
+        due.sort()
+        for event in due:
+            event.done = True
+            event.slot = None
+            lateness = max(0.0, now - event.time)
+            self.__lateness_total += lateness
+            self.__lateness_max = max(self.__lateness_max, lateness)
+            metrics.SCHEDULER_LATENESS_SECONDS.observe(lateness)
+        self.__pending -= len(due)
+        self.__executed += len(due)
+        return due
+
+    def __next_wakeup_tick(self) -> float:
+        """Return the next tick with events to run or to move down."""
+        if not self.__pending:
+            return math.inf
+        if any(self.__wheels[0]):
+            return self.__current + 1
+        # the first wheel is empty until the next events are moved down
+        span = self.__spans[1] if len(self.__spans) > 1 else 1
+        return (self.__current // span + 1) * span
+
+    @staticmethod
+    def __run_events(events: List[WheelEvent]):
+        for event in events:
+            try:
+                event.action(*event.argument, **event.kwargs)
+            except Exception:
+                logger.exception("Error running the scheduled %s", event)
+
+    def run_pending(self):
+        """Run the events already due, without waiting."""
+        with self.__condition:
+            due = self.__pop_due_events()
+        self.__run_events(due)
+
+    def run(self):
+        logger.info("Starting timing wheel scheduler thread.")
+        while True:
+            with self.__condition:
+                while not self.__stop and not (due := self.__pop_due_events()):
+                    self.__wakeup_tick = self.__next_wakeup_tick()
+                    if self.__wakeup_tick == math.inf:
+                        self.__condition.wait()
+                    else:
+                        self.__condition.wait(
+                            self.__wakeup_tick * self.tick - self.__timefunc()
+                        )
+                self.__wakeup_tick = math.inf
+                if self.__stop:
+                    break
+            self.__run_events(due)
+
+        if self.__pending:
+            logger.info(
+                "I'm dying and the scheduler is not empty, pending events (%s)",
+                self.__pending
+            )
+
+    def stop(self):
+        with self.__condition:
+            self.__stop = True
+            self.__condition.notify()
+
+    def is_running(self) -> bool:
+        return not self.__stop
+
+    def pending(self) -> int:
+        """Return the number of events waiting to be run."""
+        with self.__condition:
+            return self.__pending
+
+    def empty(self):
+        return self.pending() == 0
+
+    def statistics(self) -> dict:
+        """Return the queue depth and how late the events were run."""
+        with self.__condition:
+            executed = self.__executed
+            return {
+                "pending": self.__pending,
+                "executed": executed,
+                "lateness_avg_seconds": (
+                    self.__lateness_total / executed if executed else 0.0
+                ),
+                "lateness_max_seconds": self.__lateness_max,
+            }
@@ -0,0 +1,59 @@
+import threading
+import time
+from typing import Callable, Optional
+
+from kubekarma.controlleroperator.core import metrics
+
+
+class WarmStartStatistics:
+    """How long the controller took to resume the test suites.
+
+    The time to ready is counted from the creation of the controller
+    engine (the start of the process) until the warm start ends.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.started_at = clock()
+        self.ready_at: Optional[float] = None
+        self.listed = 0
+        self.resumed = 0
+        self.list_seconds = 0.0
+        self.resume_seconds = 0.0
+
+    def add(
+        self,
+        listed: int,
+        resumed: int,
+        list_seconds: float,
+        resume_seconds: float
+    ):
+        """Count the CRDs of a kind resumed by the warm start."""
+        with self._lock:
+            self.listed += listed
+            self.resumed += resumed
+            self.list_seconds += list_seconds
+            self.resume_seconds += resume_seconds
+
+    def mark_ready(self):
+        with self._lock:
+            if self.ready_at is None:
+                self.ready_at = self._clock()
+                metrics.WARM_START_SECONDS.set(self.ready_at - self.started_at)
+
+    def is_ready(self) -> bool:
+        return self.ready_at is not None
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "listed": self.listed,
+                "resumed": self.resumed,
+                "list_seconds": self.list_seconds,
+                "resume_seconds": self.resume_seconds,
+                "time_to_ready_seconds": (
+                    self.ready_at - self.started_at
+                    if self.ready_at is not None else None
+                ),
+            }
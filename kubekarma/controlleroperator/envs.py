@@ -1,11 +1,33 @@
 import logging
 import os
+import socket
+from typing import Optional
 
 
 class Envs:
     EXPOSED_CONTROLLER_GRPC_ADDRESS = 'EXPOSED_CONTROLLER_GRPC_ADDRESS'
     WORKER_DOCKER_IMAGE = 'WORKER_DOCKER_IMAGE'
     LOG_LEVEL = 'LOG_LEVEL'
+    GRPC_SERVER_MODE = 'GRPC_SERVER_MODE'
+    GRPC_MAX_CONCURRENT_REPORTS = 'GRPC_MAX_CONCURRENT_REPORTS'
+    GRPC_MAX_CONCURRENT_RPCS = 'GRPC_MAX_CONCURRENT_RPCS'
+    EVENTS_AGGREGATION_WINDOW = 'EVENTS_AGGREGATION_WINDOW'
+    EVENTS_RATE_LIMIT = 'EVENTS_RATE_LIMIT'
+    EVENTS_BURST = 'EVENTS_BURST'
+    DEADLINE_SCHEDULER = 'DEADLINE_SCHEDULER'
+    RESULTS_QUEUE_SIZE = 'RESULTS_QUEUE_SIZE'
+    RESULTS_QUEUE_CONSUMERS = 'RESULTS_QUEUE_CONSUMERS'
+    K8S_API_MAX_CONNECTIONS = 'K8S_API_MAX_CONNECTIONS'
+    K8S_API_KEEPALIVE = 'K8S_API_KEEPALIVE'
+    LIFECYCLE_HANDLERS_MODE = 'LIFECYCLE_HANDLERS_MODE'
+    SHARDING_ENABLED = 'SHARDING_ENABLED'
+    SHARD_IDENTITY = 'SHARD_IDENTITY'
+    SHARD_ADDRESS = 'SHARD_ADDRESS'
+    SHARD_NAMESPACE = 'SHARD_NAMESPACE'
+    SHARD_LEASE_DURATION = 'SHARD_LEASE_DURATION'
+    WARM_START = 'WARM_START'
+    RESULTS_HISTORY_SIZE = 'RESULTS_HISTORY_SIZE'
+    TRACING_EXPORTER = 'TRACING_EXPORTER'
 
     def get_exposed_controller_grpc_address(self) -> str:
         return os.getenv(self.EXPOSED_CONTROLLER_GRPC_ADDRESS)
@@ -13,6 +35,109 @@ class Envs:
     def get_worker_docker_image(self) -> str:
         return os.getenv(self.WORKER_DOCKER_IMAGE)
 
+    def get_grpc_server_mode(self) -> str:
+        """Return the gRPC server implementation.
+
+        possible values:
+            threads: a thread pool server (default).
+            aio: an asyncio server running on the operator event loop,
+                the workers stream their results to it.
+        """
+        return os.getenv(self.GRPC_SERVER_MODE, 'threads').lower()
+
+    def get_grpc_max_concurrent_reports(self) -> int:
+        return int(os.getenv(self.GRPC_MAX_CONCURRENT_REPORTS, '10'))
+
+    def get_grpc_max_concurrent_rpcs(self) -> Optional[int]:
+        """Return the limit of RPCs in flight, None (or 0) for no limit."""
+        value = int(os.getenv(self.GRPC_MAX_CONCURRENT_RPCS) or 0)
+        return value or None
+
+    def get_events_aggregation_window(self) -> float:
+        """Return the seconds the identical events are aggregated."""
+        return float(os.getenv(self.EVENTS_AGGREGATION_WINDOW, '600'))
+
+    def get_events_rate_limit(self) -> float:
+        """Return the events posted per second, for all the objects."""
+        return float(os.getenv(self.EVENTS_RATE_LIMIT, '1'))
+
+    def get_events_burst(self) -> int:
+        return int(os.getenv(self.EVENTS_BURST, '20'))
+
+    def get_deadline_scheduler(self) -> str:
+        """Return the scheduler of the results deadlines.
+
+        possible values:
+            heap: a heap of events (default).
+            wheel: a hierarchical timing wheel with slots of a second,
+                cheaper with tens of thousands of test suites.
+        """
+        return os.getenv(self.DEADLINE_SCHEDULER, 'heap').lower()
+
+    def get_results_queue_size(self) -> int:
+        """Return the results waiting to be processed, 0 for no queue."""
+        return int(os.getenv(self.RESULTS_QUEUE_SIZE, '1000'))
+
+    def get_results_queue_consumers(self) -> int:
+        return int(os.getenv(self.RESULTS_QUEUE_CONSUMERS, '4'))
+
+    def get_k8s_api_max_connections(self) -> int:
+        """Return the connections to the API server, for all the threads."""
+        return int(os.getenv(self.K8S_API_MAX_CONNECTIONS, '16'))
+
+    def get_k8s_api_keepalive(self) -> int:
+        """Return the idle seconds before the TCP keepalive probes."""
+        return int(os.getenv(self.K8S_API_KEEPALIVE, '60'))
+
+    def get_lifecycle_handlers_mode(self) -> str:
+        """Return how the lifecycle handlers of the CRDs are run.
+
+        possible values:
+            threads: in the executor of the operator (default).
+            async: as coroutines on the operator loop, with the asyncio
+                kubernetes client of kopf.
+        """
+        return os.getenv(self.LIFECYCLE_HANDLERS_MODE, 'threads').lower()
+
+    def get_sharding_enabled(self) -> bool:
+        """Return True to split the test suites between the replicas."""
+        return os.getenv(self.SHARDING_ENABLED, 'false').lower() == 'true'
+
+    def get_shard_identity(self) -> str:
+        """Return the name of the replica, the pod name by default."""
+        return os.getenv(self.SHARD_IDENTITY) or socket.gethostname()
+
+    def get_shard_address(self) -> str:
+        """Return the gRPC address where the other replicas forward."""
+        return os.getenv(self.SHARD_ADDRESS, f'{self.get_shard_identity()}:8080')
+
+    def get_shard_namespace(self) -> str:
+        """Return the namespace of the leases of the replicas."""
+        return os.getenv(self.SHARD_NAMESPACE, 'default')
+
+    def get_shard_lease_duration(self) -> float:
+        """Return the seconds a replica is alive without renewing its lease."""
+        return float(os.getenv(self.SHARD_LEASE_DURATION, '15'))
+
+    def get_warm_start(self) -> bool:
+        """Return True to resume all the CRDs at once on startup."""
+        return os.getenv(self.WARM_START, 'true').lower() == 'true'
+
+    def get_results_history_size(self) -> int:
+        """Return the executions kept per test suite, 0 for no history."""
+        return int(os.getenv(self.RESULTS_HISTORY_SIZE, '100'))
+
+    def get_tracing_exporter(self) -> str:
+        """Return where the spans are exported, see shared.tracing.
+
+        possible values:
+            none: the spans are not exported (default).
+            stdout: a JSON line per span in the standard output.
+            file:<path>: a JSON line per span appended to the file.
+            <module>:<class>: a custom ISpanExporter.
+        """
+        return os.getenv(self.TRACING_EXPORTER, 'none')
+
     def get_log_level(self) -> int:
         """Return the log level.
 
@@ -1,27 +1,307 @@
+import asyncio
+import contextvars
+import functools
+from concurrent import futures
+from typing import AsyncIterator, Iterator, Optional
+
 import grpc
 
+from kubekarma.controlleroperator.core import metrics
 from kubekarma.controlleroperator.core.abc.resultspublisher import \
     ITestResultsPublisher
+from kubekarma.controlleroperator.core.resultsingestqueue import \
+    ResultsIngestQueue
+from kubekarma.controlleroperator.core.sharding.coordinator import \
+    ShardCoordinator
+from kubekarma.controlleroperator.core.sharding.forwarder import \
+    FORWARDED_BY_METADATA
 from kubekarma.grpcgen.collectors.v1alpha import controller_pb2, \
     controller_pb2_grpc
+from kubekarma.shared.tracing import tracer
+
+
+QUEUE_FULL_DETAILS = "The results queue is full, retry later"
+NOT_OWNER_DETAILS = "The owner of the test suite is not known, retry later"
+
+
+def snapshot(
+    results: controller_pb2.ExecutionResultRequest
+) -> controller_pb2.ExecutionResultRequest:
+    """Return a copy of the results merged so far."""
+    copy = controller_pb2.ExecutionResultRequest()
+    copy.CopyFrom(results)
+    return copy
+
+
+def started_at(results: controller_pb2.ExecutionResultRequest) -> Optional[int]:
+    """Return the start time of the execution, in nanoseconds."""
+    if not results.HasField("start_time"):
+        return None
+    return results.start_time.ToNanoseconds()
+
+
+def start_span(method: str, context):
+    """Continue the trace of the worker (or the forwarding replica)."""
+    return tracer.start_span(
+        f"ControllerServiceServicer.{method}",
+        parent=tracer.extract(context.invocation_metadata())
+    )
+
+
+def was_forwarded(context) -> bool:
+    return any(
+        key == FORWARDED_BY_METADATA
+        for key, _ in context.invocation_metadata() or ()
+    )
 
 
 class ControllerServiceServicer(
     controller_pb2_grpc.TestSuiteExecutionResultServiceServicer
 ):
+    """Receive the results of the workers.
+
+    Without an ingest queue the subscribers are notified before answering
+    the worker. With an ingest queue the results are only enqueued, and
+    rejected with RESOURCE_EXHAUSTED when it is full.
+
+    With a shard coordinator, the results of the test suites owned by
+    another replica are forwarded to it (only the whole results, not the
+    partial ones) and the worker gets the answer of the owner. The
+    forwarded results are never forwarded again, they are rejected with
+    UNAVAILABLE while the replicas don't agree on the owner.
+    """
 
-    def __init__(self, result_publisher: ITestResultsPublisher):
+    def __init__(
+        self,
+        result_publisher: ITestResultsPublisher,
+        ingest_queue: Optional[ResultsIngestQueue] = None,
+        shard_coordinator: Optional[ShardCoordinator] = None
+    ):
         self.result_publisher = result_publisher
+        self.ingest_queue = ingest_queue
+        self.shard_coordinator = shard_coordinator
+
+    def _is_local(self, results: controller_pb2.ExecutionResultRequest) -> bool:
+        return (
+            self.shard_coordinator is None
+            or self.shard_coordinator.is_local(results.token)
+        )
+
+    def _route(
+        self,
+        results: controller_pb2.ExecutionResultRequest,
+        context: grpc.ServicerContext
+    ) -> bool:
+        """Return True if the results are owned, forward them otherwise."""
+        if self._is_local(results):
+            return True
+        address = self.shard_coordinator.owner_address(results.token)
+        if address is None or was_forwarded(context):
+            context.abort(grpc.StatusCode.UNAVAILABLE, NOT_OWNER_DETAILS)
+        try:
+            self.shard_coordinator.forward(address, results)
+        except grpc.RpcError as e:
+            context.abort(e.code(), e.details())
+        return False
+
+    def _notify_new_results(
+        self,
+        results: controller_pb2.ExecutionResultRequest,
+        context: grpc.ServicerContext
+    ):
+        if self.ingest_queue is None:
+            self.result_publisher.notify_new_results(
+                results.token,
+                results=results
+            )
+        elif not self.ingest_queue.submit(
+            results.token, results, started_at=started_at(results)
+        ):
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, QUEUE_FULL_DETAILS)
+
+    def _notify_partial_results(
+        self,
+        results: controller_pb2.ExecutionResultRequest
+    ):
+        if self.ingest_queue is None:
+            self.result_publisher.notify_partial_results(
+                results.token,
+                results=results
+            )
+        else:
+            # the next chunks are merged into the results
+            self.ingest_queue.submit_partial(results.token, snapshot(results))
 
     def ReportResults(
         self,
         request: controller_pb2.ExecutionResultRequest,
         context: grpc.ServicerContext
     ):
-        self.result_publisher.notify_new_results(
-            request.token,
-            results=request
+        with metrics.REPORT_RESULTS_SECONDS.labels(
+            method="ReportResults"
+        ).time(), start_span("ReportResults", context):
+            if self._route(request, context):
+                self._notify_new_results(request, context)
+        return controller_pb2.ExecutionResultResponse(
+            message="ok"
+        )
+
+    def StreamResults(
+        self,
+        request_iterator: Iterator[controller_pb2.ExecutionResultRequest],
+        context: grpc.ServicerContext
+    ):
+        # Merging the chunks in order rebuilds the whole request.
+        results = controller_pb2.ExecutionResultRequest()
+        with start_span("StreamResults", context):
+            for chunk in request_iterator:
+                results.MergeFrom(chunk)
+                if self._is_local(results):
+                    self._notify_partial_results(results)
+            # the answer once the stream ends, not the whole stream
+            with metrics.REPORT_RESULTS_SECONDS.labels(
+                method="StreamResults"
+            ).time():
+                if self._route(results, context):
+                    self._notify_new_results(results, context)
+        return controller_pb2.ExecutionResultResponse(
+            message="ok"
         )
+
+
+class AsyncControllerServiceServicer(
+    controller_pb2_grpc.TestSuiteExecutionResultServiceServicer
+):
+    """The ControllerServiceServicer for a grpc.aio server.
+
+    The requests are received on the event loop, so a stream of results
+    doesn't hold a thread while the worker is running the test suite.
+    The subscribers of the publisher (which patch the CRDs with the
+    blocking kubernetes client) are notified from the executor, at most
+    `max_concurrent_reports` at the same time; the rest of the requests
+    wait on the event loop. With an ingest queue the results are only
+    enqueued, and with a shard coordinator the results owned by another
+    replica are forwarded, as the ControllerServiceServicer does.
+    """
+
+    def __init__(
+        self,
+        result_publisher: ITestResultsPublisher,
+        executor: futures.Executor,
+        max_concurrent_reports: int,
+        ingest_queue: Optional[ResultsIngestQueue] = None,
+        shard_coordinator: Optional[ShardCoordinator] = None
+    ):
+        self.result_publisher = result_publisher
+        self.ingest_queue = ingest_queue
+        self.shard_coordinator = shard_coordinator
+        self._executor = executor
+        self._semaphore = asyncio.Semaphore(max_concurrent_reports)
+
+    async def _notify(self, notify, *args, **kwargs):
+        async with self._semaphore:
+            # the executor threads don't get the context (the span)
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                functools.partial(
+                    contextvars.copy_context().run, notify, *args, **kwargs
+                )
+            )
+
+    def _is_local(self, results: controller_pb2.ExecutionResultRequest) -> bool:
+        return (
+            self.shard_coordinator is None
+            or self.shard_coordinator.is_local(results.token)
+        )
+
+    async def _route(
+        self,
+        results: controller_pb2.ExecutionResultRequest,
+        context: grpc.aio.ServicerContext
+    ) -> bool:
+        """Return True if the results are owned, forward them otherwise."""
+        if self._is_local(results):
+            return True
+        address = self.shard_coordinator.owner_address(results.token)
+        if address is None or was_forwarded(context):
+            await context.abort(grpc.StatusCode.UNAVAILABLE, NOT_OWNER_DETAILS)
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                contextvars.copy_context().run,
+                self.shard_coordinator.forward,
+                address,
+                results
+            )
+        except grpc.RpcError as e:
+            await context.abort(e.code(), e.details())
+        return False
+
+    async def _notify_new_results(
+        self,
+        results: controller_pb2.ExecutionResultRequest,
+        context: grpc.aio.ServicerContext
+    ):
+        if self.ingest_queue is None:
+            await self._notify(
+                self.result_publisher.notify_new_results,
+                results.token,
+                results=results
+            )
+        elif not self.ingest_queue.submit(
+            results.token, results, started_at=started_at(results)
+        ):
+            await context.abort(
+                grpc.StatusCode.RESOURCE_EXHAUSTED, QUEUE_FULL_DETAILS
+            )
+
+    async def _notify_partial_results(
+        self,
+        results: controller_pb2.ExecutionResultRequest
+    ):
+        if self.ingest_queue is None:
+            await self._notify(
+                self.result_publisher.notify_partial_results,
+                results.token,
+                results=results
+            )
+        else:
+            self.ingest_queue.submit_partial(results.token, snapshot(results))
+
+    async def ReportResults(
+        self,
+        request: controller_pb2.ExecutionResultRequest,
+        context: grpc.aio.ServicerContext
+    ):
+        with metrics.REPORT_RESULTS_SECONDS.labels(
+            method="ReportResults"
+        ).time(), start_span("ReportResults", context):
+            if await self._route(request, context):
+                await self._notify_new_results(request, context)
+        return controller_pb2.ExecutionResultResponse(
+            message="ok"
+        )
+
+    async def StreamResults(
+        self,
+        request_iterator: AsyncIterator[controller_pb2.ExecutionResultRequest],
+        context: grpc.aio.ServicerContext
+    ):
+        # Merging the chunks in order rebuilds the whole request. Each
+        # notification is awaited before merging the next chunk, so the
+        # subscribers never see the results changing.
+        results = controller_pb2.ExecutionResultRequest()
+        with start_span("StreamResults", context):
+            async for chunk in request_iterator:
+                results.MergeFrom(chunk)
+                if self._is_local(results):
+                    await self._notify_partial_results(results)
+            # the answer once the stream ends, not the whole stream
+            with metrics.REPORT_RESULTS_SECONDS.labels(
+                method="StreamResults"
+            ).time():
+                if await self._route(results, context):
+                    await self._notify_new_results(results, context)
         return controller_pb2.ExecutionResultResponse(
             message="ok"
         )
@@ -21,3 +21,13 @@ class HealthServicer(health_pb2_grpc.HealthServicer):
     def Watch(self, request, context):
         logger.debug("Health watch request received.")
         return HealthCheckResponse(status=self.__status)
+
+
+class AsyncHealthServicer(HealthServicer):
+    """The HealthServicer for a grpc.aio server."""
+
+    async def Check(self, request, context):
+        return super().Check(request, context)
+
+    async def Watch(self, request, context):
+        return super().Watch(request, context)
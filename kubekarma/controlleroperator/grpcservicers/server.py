@@ -1,17 +1,72 @@
+from typing import Optional
+
 import grpc
 from concurrent import futures
 
 from kubekarma.controlleroperator.core.controllerengine import ControllerEngine
 from kubekarma.controlleroperator.grpcservicers.utils import \
-    add_all_servicers_to_server
+    add_all_async_servicers_to_server, add_all_servicers_to_server
+
+SERVER_OPTIONS = [
+    # allow the keepalive pings of the workers (every 30s), the
+    # default policy closes the connections pinging more than
+    # once every 5 minutes.
+    ("grpc.http2.min_ping_interval_without_data_ms", 20_000),
+    ("grpc.keepalive_permit_without_calls", 1),
+]
 
 
 def build_grpc_server(
     server_address,
-    controller_engine: ControllerEngine
+    controller_engine: ControllerEngine,
+    max_concurrent_reports: int = 10,
+    max_concurrent_rpcs: Optional[int] = None
 ) -> grpc.Server:
-    """Return the gRPC server for the Master service."""
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    """Return the gRPC server for the Master service.
+
+    Each RPC is handled by a thread of the pool for its whole duration,
+    including the streams of results of the running workers.
+    """
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=max_concurrent_reports),
+        options=SERVER_OPTIONS,
+        maximum_concurrent_rpcs=max_concurrent_rpcs
+    )
     add_all_servicers_to_server(server, controller_engine)
     server.add_insecure_port(server_address)
     return server
+
+
+def build_aio_grpc_server(
+    server_address,
+    controller_engine: ControllerEngine,
+    max_concurrent_reports: int = 10,
+    max_concurrent_rpcs: Optional[int] = None
+) -> grpc.aio.Server:
+    """Return the gRPC server for the Master service, using grpc.aio.
+
+    The server runs on the event loop where it is started (the kopf one),
+    so the number of connected workers is not bounded by threads. Only the
+    notification of the results to the subscribers runs in a pool of
+    `max_concurrent_reports` threads.
+
+    Args:
+        max_concurrent_rpcs: The RPCs in flight, the new ones are
+            rejected with RESOURCE_EXHAUSTED. None for no limit.
+    """
+    executor = futures.ThreadPoolExecutor(
+        max_workers=max_concurrent_reports,
+        thread_name_prefix="grpc-reports"
+    )
+    server = grpc.aio.server(
+        options=SERVER_OPTIONS,
+        maximum_concurrent_rpcs=max_concurrent_rpcs
+    )
+    add_all_async_servicers_to_server(
+        server,
+        controller_engine,
+        executor=executor,
+        max_concurrent_reports=max_concurrent_reports
+    )
+    server.add_insecure_port(server_address)
+    return server
@@ -1,8 +1,11 @@
+from concurrent import futures
+
 import grpc
 from kubekarma.controlleroperator.core.controllerengine import ControllerEngine
 from kubekarma.controlleroperator.grpcservicers.controller import \
-    ControllerServiceServicer
-from kubekarma.controlleroperator.grpcservicers.health import HealthServicer
+    AsyncControllerServiceServicer, ControllerServiceServicer
+from kubekarma.controlleroperator.grpcservicers.health import \
+    AsyncHealthServicer, HealthServicer
 from kubekarma.grpcgen.collectors.v1alpha import controller_pb2_grpc
 from kubekarma.grpcgen.health.v1 import health_pb2_grpc
 
@@ -18,7 +21,33 @@ def add_all_servicers_to_server(
     )
     controller_pb2_grpc.add_TestSuiteExecutionResultServiceServicer_to_server(
         ControllerServiceServicer(
-            result_publisher=controller_engine.get_results_publisher()
+            result_publisher=controller_engine.get_results_publisher(),
+            ingest_queue=controller_engine.get_results_ingest_queue(),
+            shard_coordinator=controller_engine.get_shard_coordinator()
+        ),
+        server
+    )
+    return server
+
+
+def add_all_async_servicers_to_server(
+    server: grpc.aio.Server,
+    controller_engine: ControllerEngine,
+    executor: futures.Executor,
+    max_concurrent_reports: int
+) -> grpc.aio.Server:
+    """Add all servicers into a grpc.aio server."""
+    health_pb2_grpc.add_HealthServicer_to_server(
+        AsyncHealthServicer(),
+        server
+    )
+    controller_pb2_grpc.add_TestSuiteExecutionResultServiceServicer_to_server(
+        AsyncControllerServiceServicer(
+            result_publisher=controller_engine.get_results_publisher(),
+            executor=executor,
+            max_concurrent_reports=max_concurrent_reports,
+            ingest_queue=controller_engine.get_results_ingest_queue(),
+            shard_coordinator=controller_engine.get_shard_coordinator()
         ),
         server
     )
@@ -4,9 +4,10 @@ import asyncio
 import threading
 from typing import Optional
 
-from fastapi import FastAPI, Response, Request, status
+from fastapi import FastAPI, Query, Response, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from pydantic import BaseModel
 
@@ -55,6 +56,49 @@ def healthz(response: Response,  include_in_schema=False):
     return {"status": "ok"}
 
 
+@app.get("/stats")
+def stats(response: Response):
+    """Return the counters of the controller."""
+    if not the_controller_engine:
+        response.status_code = status.HTTP_425_TOO_EARLY
+        return {}
+    return the_controller_engine.statistics()
+
+
+@app.get("/metrics")
+def metrics():
+    """Return the metrics of the controller, in the Prometheus format."""
+    if the_controller_engine:
+        the_controller_engine.update_metrics()
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/suites/{namespace}/{name}/history")
+def suite_history(
+    namespace: str,
+    name: str,
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Return a page of the last executions of a test suite."""
+    if not the_controller_engine:
+        response.status_code = status.HTTP_425_TOO_EARLY
+        return {}
+    history = the_controller_engine.find_results_history(namespace, name)
+    if history is None:
+        response.status_code = status.HTTP_404_NOT_FOUND
+        return {}
+    return {
+        "total": len(history),
+        "offset": offset,
+        "limit": limit,
+        "items": [
+            record.as_dict() for record in history.records(offset, limit)
+        ],
+    }
+
+
 class ThreadedUvicorn:
     """A wrapper to run uvicorn in a thread.
 
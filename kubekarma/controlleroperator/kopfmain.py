@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Any
 
+import grpc
 import kopf
 import logging
 
@@ -9,11 +10,13 @@ from kubekarma.controlleroperator.core.controllerengine import (
 )
 from kubekarma.controlleroperator.config import config
 from kubekarma.controlleroperator.core.testsuite.lifecyclehandler import \
-    ControllerCRDLifecycleHandler
-from kubekarma.controlleroperator.grpcservicers.server import build_grpc_server
+    AsyncControllerCRDLifecycleHandler, ControllerCRDLifecycleHandler
+from kubekarma.controlleroperator.grpcservicers.server import \
+    build_aio_grpc_server, build_grpc_server
 from kubekarma.controlleroperator.kinds.networktestsuite import \
     NetworkTestSuite
 from kubekarma.controlleroperator.httpserver import get_threaded_server
+from kubekarma.shared import tracing
 from kubernetes import client
 
 
@@ -23,6 +26,8 @@ logger = logging.getLogger()
 root_logger = logging.getLogger()
 root_logger.setLevel(config.log_level)
 
+tracing.tracer.set_exporter(tracing.get_exporter(config.tracing_exporter))
+
 controller_engine = ControllerEngine()
 api_client = client.ApiClient()
 
@@ -33,10 +38,9 @@ http_server_thread = get_threaded_server(
     http_host="0.0.0.0",
     controller_engine=controller_engine
 )
-grpc_server = build_grpc_server(
-    "[::]:8080",
-    controller_engine
-)
+GRPC_SERVER_ADDRESS = "[::]:8080"
+# Built on startup, the grpc.aio server must be created on the kopf loop.
+grpc_server = None
 
 
 @kopf.on.login()
@@ -44,9 +48,27 @@ def login(**kwargs):
     conn = kopf.login_via_client(**kwargs)
     global api_client
     api_client = client.ApiClient()
+    # The leases of the replicas are renewed with the operator credentials,
+    # and the owned CRDs must be known before watching them.
+    controller_engine.start_shard_membership()
+    if config.warm_start:
+        warm_start()
     return conn
 
 
+def warm_start():
+    """Resume all the CRDs before watching them, once."""
+    statistics = controller_engine.warm_start_statistics
+    if statistics.is_ready():
+        return
+    try:
+        handlers.warm_start(statistics)
+    except Exception:
+        # the resume handlers (or the shard coordinator) resume them
+        logger.exception("Error on the warm start, resuming one by one")
+    statistics.mark_ready()
+
+
 @kopf.on.startup()
 def configure(settings: kopf.OperatorSettings, **_):
     # Events configuration
@@ -70,24 +92,49 @@ def configure(settings: kopf.OperatorSettings, **_):
 
 @kopf.on.startup()
 def start_http_server(**kwargs):
-    global grpc_server
     global http_server_thread
     global controller_engine
     http_server_thread.start()
     controller_engine.start()
-    logger.info("Starting gRPC server...")
-    grpc_server.start()
+
+
+@kopf.on.startup()
+async def start_grpc_server(**kwargs):
+    global grpc_server
+    logger.info("Starting gRPC server (%s)...", config.grpc_server_mode)
+    if config.grpc_server_mode == "aio":
+        grpc_server = build_aio_grpc_server(
+            GRPC_SERVER_ADDRESS,
+            controller_engine,
+            max_concurrent_reports=config.grpc_max_concurrent_reports,
+            max_concurrent_rpcs=config.grpc_max_concurrent_rpcs
+        )
+        await grpc_server.start()
+    else:
+        grpc_server = build_grpc_server(
+            GRPC_SERVER_ADDRESS,
+            controller_engine,
+            max_concurrent_reports=config.grpc_max_concurrent_reports,
+            max_concurrent_rpcs=config.grpc_max_concurrent_rpcs
+        )
+        grpc_server.start()
+
+
+@kopf.on.cleanup()
+async def stop_grpc_server(**kwargs):
+    logger.info("Stopping gRPC server...")
+    if isinstance(grpc_server, grpc.aio.Server):
+        await grpc_server.stop(0)
+    elif grpc_server is not None:
+        grpc_server.stop(0)
 
 
 @kopf.on.cleanup()
 def stop_results_receiver(**kwargs):
     logger.info(repr(kwargs))
-    global grpc_server
     global http_server_thread
     logger.info("Stopping http server...")
     http_server_thread.stop()
-    logger.info("Stopping gRPC server...")
-    grpc_server.stop(0)
     logger.info("Stopping controller engine...")
     global controller_engine
     controller_engine.stop()
@@ -110,14 +157,49 @@ args = (
     network_test_suite.api_plural
 )
 
-handlers = ControllerCRDLifecycleHandler(test_suite_kind=network_test_suite)
-(kopf.on.create(*args)(handlers.handle_create))
-(kopf.on.delete(*args)(handlers.handle_delete))
-(kopf.on.resume(*args)(handlers.handle_resume_controller_restart)) # noqa
-(kopf.on.field(
-    *args,
-    field='spec.suspend',
+if config.lifecycle_handlers_mode == "async":
+    handlers_class = AsyncControllerCRDLifecycleHandler
+else:
+    handlers_class = ControllerCRDLifecycleHandler
+shard_coordinator = controller_engine.get_shard_coordinator()
+handlers = handlers_class(
+    test_suite_kind=network_test_suite,
+    event_aggregator=controller_engine.event_aggregator,
+    shard_coordinator=shard_coordinator
+)
+
+
+def not_on_create(reason, **_):
     # Avoid call this handler when the CRD is created
-    when=lambda reason, **_: reason is not kopf.Reason.CREATE
-)(handlers.handle_suspend)) # noqa
-(kopf.on.update(*args)(handlers.handle_update))
+    return reason is not kopf.Reason.CREATE
+
+
+if shard_coordinator is None:
+    (kopf.on.create(*args)(handlers.handle_create))
+    (kopf.on.delete(*args)(handlers.handle_delete))
+    (kopf.on.resume(*args)(handlers.handle_resume_controller_restart)) # noqa
+    (kopf.on.field(
+        *args,
+        field='spec.suspend',
+        when=not_on_create
+    )(handlers.handle_suspend)) # noqa
+    (kopf.on.update(*args)(handlers.handle_update))
+else:
+    # Each replica only handles the CRDs it owns. The other replicas don't
+    # see them, so they would remove a finalizer: the deletion doesn't
+    # wait for the owner, which releases the CRD on the DELETED event.
+    # The CRDs are created and resumed (on startup and after a rebalance)
+    # by the coordinator from the events: the state stored by kopf on the
+    # CRDs is shared by the replicas, the owner may not see the creation.
+    (kopf.on.event(*args)(handlers.handle_event))
+    (kopf.on.delete(
+        *args,
+        when=handlers.owns,
+        optional=True
+    )(handlers.handle_delete)) # noqa
+    (kopf.on.field(
+        *args,
+        field='spec.suspend',
+        when=kopf.all_([not_on_create, handlers.owns])
+    )(handlers.handle_suspend)) # noqa
+    (kopf.on.update(*args, when=handlers.owns)(handlers.handle_update))
@@ -93,10 +93,27 @@ class ExecutionResultRequest(google.protobuf.message.Message):
 
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
 
+    @typing_extensions.final
+    class StatisticsEntry(google.protobuf.message.Message):
+        DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+        KEY_FIELD_NUMBER: builtins.int
+        VALUE_FIELD_NUMBER: builtins.int
+        key: builtins.str
+        value: builtins.int
+        def __init__(
+            self,
+            *,
+            key: builtins.str = ...,
+            value: builtins.int = ...,
+        ) -> None: ...
+        def ClearField(self, field_name: typing_extensions.Literal["key", b"key", "value", b"value"]) -> None: ...
+
     NAME_FIELD_NUMBER: builtins.int
     START_TIME_FIELD_NUMBER: builtins.int
     VALIDATION_RESULTS_FIELD_NUMBER: builtins.int
     TOKEN_FIELD_NUMBER: builtins.int
+    STATISTICS_FIELD_NUMBER: builtins.int
     name: builtins.str
     """name: is the name of the test suite"""
     @property
@@ -108,6 +125,11 @@ class ExecutionResultRequest(google.protobuf.message.Message):
     def validation_results(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___ValidationResult]: ...
     token: builtins.str
     """token: is used to identify the test suite execution"""
+    @property
+    def statistics(self) -> google.protobuf.internal.containers.ScalarMap[builtins.str, builtins.int]:
+        """statistics: counters collected by the worker during the execution,
+        e.g. the hits and misses of the DNS answer cache
+        """
     def __init__(
         self,
         *,
@@ -115,9 +137,10 @@ class ExecutionResultRequest(google.protobuf.message.Message):
         start_time: google.protobuf.timestamp_pb2.Timestamp | None = ...,
         validation_results: collections.abc.Iterable[global___ValidationResult] | None = ...,
         token: builtins.str = ...,
+        statistics: collections.abc.Mapping[builtins.str, builtins.int] | None = ...,
     ) -> None: ...
     def HasField(self, field_name: typing_extensions.Literal["start_time", b"start_time"]) -> builtins.bool: ...
-    def ClearField(self, field_name: typing_extensions.Literal["name", b"name", "start_time", b"start_time", "token", b"token", "validation_results", b"validation_results"]) -> None: ...
+    def ClearField(self, field_name: typing_extensions.Literal["name", b"name", "start_time", b"start_time", "statistics", b"statistics", "token", b"token", "validation_results", b"validation_results"]) -> None: ...
 
 global___ExecutionResultRequest = ExecutionResultRequest
 
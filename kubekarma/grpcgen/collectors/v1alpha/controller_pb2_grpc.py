@@ -19,6 +19,11 @@ class TestSuiteExecutionResultServiceStub(object):
                 request_serializer=kubekarma_dot_grpcgen_dot_collectors_dot_v1alpha_dot_controller__pb2.ExecutionResultRequest.SerializeToString,
                 response_deserializer=kubekarma_dot_grpcgen_dot_collectors_dot_v1alpha_dot_controller__pb2.ExecutionResultResponse.FromString,
                 )
+        self.StreamResults = channel.stream_unary(
+                '/kubekarma.collectors.v1.TestSuiteExecutionResultService/StreamResults',
+                request_serializer=kubekarma_dot_grpcgen_dot_collectors_dot_v1alpha_dot_controller__pb2.ExecutionResultRequest.SerializeToString,
+                response_deserializer=kubekarma_dot_grpcgen_dot_collectors_dot_v1alpha_dot_controller__pb2.ExecutionResultResponse.FromString,
+                )
 
 
 class TestSuiteExecutionResultServiceServicer(object):
@@ -31,6 +36,19 @@ class TestSuiteExecutionResultServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamResults(self, request_iterator, context):
+        """StreamResults is called by the test runner to report each result as soon as it is available.
+        Every message is a chunk of the whole ExecutionResultRequest, merging all the chunks
+        in order gives the same message that would be sent to ReportResults:
+        - the first chunk carries the name, token and start_time of the execution.
+        - the following chunks carry the validation_results completed since the previous one.
+        - the last chunk may carry the statistics of the execution.
+        The execution is considered complete when the worker closes the stream.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_TestSuiteExecutionResultServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -39,6 +57,11 @@ def add_TestSuiteExecutionResultServiceServicer_to_server(servicer, server):
                     request_deserializer=kubekarma_dot_grpcgen_dot_collectors_dot_v1alpha_dot_controller__pb2.ExecutionResultRequest.FromString,
                     response_serializer=kubekarma_dot_grpcgen_dot_collectors_dot_v1alpha_dot_controller__pb2.ExecutionResultResponse.SerializeToString,
             ),
+            'StreamResults': grpc.stream_unary_rpc_method_handler(
+                    servicer.StreamResults,
+                    request_deserializer=kubekarma_dot_grpcgen_dot_collectors_dot_v1alpha_dot_controller__pb2.ExecutionResultRequest.FromString,
+                    response_serializer=kubekarma_dot_grpcgen_dot_collectors_dot_v1alpha_dot_controller__pb2.ExecutionResultResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'kubekarma.collectors.v1.TestSuiteExecutionResultService', rpc_method_handlers)
@@ -65,3 +88,20 @@ class TestSuiteExecutionResultService(object):
             kubekarma_dot_grpcgen_dot_collectors_dot_v1alpha_dot_controller__pb2.ExecutionResultResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamResults(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/kubekarma.collectors.v1.TestSuiteExecutionResultService/StreamResults',
+            kubekarma_dot_grpcgen_dot_collectors_dot_v1alpha_dot_controller__pb2.ExecutionResultRequest.SerializeToString,
+            kubekarma_dot_grpcgen_dot_collectors_dot_v1alpha_dot_controller__pb2.ExecutionResultResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
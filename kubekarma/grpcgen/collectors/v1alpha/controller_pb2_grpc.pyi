@@ -24,6 +24,18 @@ class TestSuiteExecutionResultServiceStub:
         kubekarma.grpcgen.collectors.v1alpha.controller_pb2.ExecutionResultResponse,
     ]
     """ProcessTestSuiteResults is called by the test runner to report the results of the execution"""
+    StreamResults: grpc.StreamUnaryMultiCallable[
+        kubekarma.grpcgen.collectors.v1alpha.controller_pb2.ExecutionResultRequest,
+        kubekarma.grpcgen.collectors.v1alpha.controller_pb2.ExecutionResultResponse,
+    ]
+    """StreamResults is called by the test runner to report each result as soon as it is available.
+    Every message is a chunk of the whole ExecutionResultRequest, merging all the chunks
+    in order gives the same message that would be sent to ReportResults:
+      - the first chunk carries the name, token and start_time of the execution.
+      - the following chunks carry the validation_results completed since the previous one.
+      - the last chunk may carry the statistics of the execution.
+    The execution is considered complete when the worker closes the stream.
+    """
 
 class TestSuiteExecutionResultServiceAsyncStub:
     ReportResults: grpc.aio.UnaryUnaryMultiCallable[
@@ -31,6 +43,18 @@ class TestSuiteExecutionResultServiceAsyncStub:
         kubekarma.grpcgen.collectors.v1alpha.controller_pb2.ExecutionResultResponse,
     ]
     """ProcessTestSuiteResults is called by the test runner to report the results of the execution"""
+    StreamResults: grpc.aio.StreamUnaryMultiCallable[
+        kubekarma.grpcgen.collectors.v1alpha.controller_pb2.ExecutionResultRequest,
+        kubekarma.grpcgen.collectors.v1alpha.controller_pb2.ExecutionResultResponse,
+    ]
+    """StreamResults is called by the test runner to report each result as soon as it is available.
+    Every message is a chunk of the whole ExecutionResultRequest, merging all the chunks
+    in order gives the same message that would be sent to ReportResults:
+      - the first chunk carries the name, token and start_time of the execution.
+      - the following chunks carry the validation_results completed since the previous one.
+      - the last chunk may carry the statistics of the execution.
+    The execution is considered complete when the worker closes the stream.
+    """
 
 class TestSuiteExecutionResultServiceServicer(metaclass=abc.ABCMeta):
     @abc.abstractmethod
@@ -40,5 +64,19 @@ class TestSuiteExecutionResultServiceServicer(metaclass=abc.ABCMeta):
         context: _ServicerContext,
     ) -> typing.Union[kubekarma.grpcgen.collectors.v1alpha.controller_pb2.ExecutionResultResponse, collections.abc.Awaitable[kubekarma.grpcgen.collectors.v1alpha.controller_pb2.ExecutionResultResponse]]:
         """ProcessTestSuiteResults is called by the test runner to report the results of the execution"""
+    @abc.abstractmethod
+    def StreamResults(
+        self,
+        request_iterator: _MaybeAsyncIterator[kubekarma.grpcgen.collectors.v1alpha.controller_pb2.ExecutionResultRequest],
+        context: _ServicerContext,
+    ) -> typing.Union[kubekarma.grpcgen.collectors.v1alpha.controller_pb2.ExecutionResultResponse, collections.abc.Awaitable[kubekarma.grpcgen.collectors.v1alpha.controller_pb2.ExecutionResultResponse]]:
+        """StreamResults is called by the test runner to report each result as soon as it is available.
+        Every message is a chunk of the whole ExecutionResultRequest, merging all the chunks
+        in order gives the same message that would be sent to ReportResults:
+          - the first chunk carries the name, token and start_time of the execution.
+          - the following chunks carry the validation_results completed since the previous one.
+          - the last chunk may carry the statistics of the execution.
+        The execution is considered complete when the worker closes the stream.
+        """
 
 def add_TestSuiteExecutionResultServiceServicer_to_server(servicer: TestSuiteExecutionResultServiceServicer, server: typing.Union[grpc.Server, grpc.aio.Server]) -> None: ...
@@ -40,7 +40,7 @@ class AssertValidationStatus(enum.Enum):
             return AssertValidationStatus.Succeeded
         elif status == controller_pb2.ValidationResult.Status.FAILED:
             return AssertValidationStatus.Failed
-        elif status == controller_pb2.ValidationResult.Status.NOTIMPLEMENTED:
+        elif status == controller_pb2.ValidationResult.Status.NOT_IMPLEMENTED:
             return AssertValidationStatus.NotImplemented
         elif status == controller_pb2.ValidationResult.Status.ERROR:
             return AssertValidationStatus.Error
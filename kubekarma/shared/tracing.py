@@ -0,0 +1,244 @@
+"""Trace an execution from the worker to the status of the CRD.
+
+The worker starts a trace when it executes a test suite and sends its
+context to the controller in the gRPC metadata, as a W3C `traceparent`,
+so the spans of the controller (receiving the results, notifying the
+subscribers and patching the CRD) are part of the same trace.
+
+The spans are sent to the exporter of the process, set from a spec:
+
+    ""/"none": the spans are not exported (default).
+    "stdout": a JSON line per span written to the standard output.
+    "file:<path>": a JSON line per span appended to the file.
+    "<module>:<class>": an ISpanExporter built without arguments.
+
+Only the standard library is used, the worker imports this module on
+every execution.
+"""
+import abc
+import contextlib
+import contextvars
+import dataclasses
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import IO, Iterable, Iterator, Optional, Tuple
+
+TRACEPARENT_METADATA = "traceparent"
+
+
+@dataclasses.dataclass(frozen=True)
+class SpanContext:
+    """What identifies a span, propagated between the processes."""
+    trace_id: str
+    span_id: str
+
+    @staticmethod
+    def new_id(n_bytes: int) -> str:
+        return os.urandom(n_bytes).hex()
+
+    def to_traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @classmethod
+    def from_traceparent(cls, value: str) -> Optional["SpanContext"]:
+        """Parse a W3C traceparent, None if it is not valid."""
+        parts = value.strip().split("-")
+        if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+            return None
+        try:
+            int(parts[1], 16)
+            int(parts[2], 16)
+        except ValueError:
+            return None
+        return cls(trace_id=parts[1], span_id=parts[2])
+
+
+class Span:
+    """An operation of a trace, ended by the tracer."""
+
+    __slots__ = (
+        "name", "context", "parent_id", "start_time", "end_time",
+        "attributes", "error"
+    )
+
+    def __init__(
+        self,
+        name: str,
+        context: SpanContext,
+        parent_id: Optional[str] = None,
+        attributes: Optional[dict] = None
+    ):
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        self.attributes = dict(attributes or {})
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "parentSpanId": self.parent_id,
+            "startTime": self.start_time,
+            "endTime": self.end_time,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class ISpanExporter(abc.ABC):
+    """Receive the spans once they end."""
+
+    @abc.abstractmethod
+    def export(self, span: Span):
+        """Export an ended span, it must not raise."""
+
+    def shutdown(self):
+        """Flush and release the resources of the exporter."""
+
+
+class NoopSpanExporter(ISpanExporter):
+
+    def export(self, span: Span):
+        pass
+
+
+class StreamSpanExporter(ISpanExporter):
+    """Write a JSON line per span, to a file or the standard output."""
+
+    def __init__(self, stream: IO[str], close_stream: bool = False):
+        self._stream = stream
+        self._close_stream = close_stream
+        self._lock = threading.Lock()
+
+    @classmethod
+    def to_file(cls, path: str) -> "StreamSpanExporter":
+        return cls(open(path, "a", encoding="utf-8"), close_stream=True)
+
+    def export(self, span: Span):
+        line = json.dumps(span.as_dict(), default=str)
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+    def shutdown(self):
+        if self._close_stream:
+            with self._lock:
+                self._stream.close()
+
+
+def get_exporter(spec: Optional[str]) -> ISpanExporter:
+    """Build the exporter of a spec, see the docstring of the module."""
+    spec = (spec or "").strip()
+    if spec in ("", "none"):
+        return NoopSpanExporter()
+    if spec == "stdout":
+        return StreamSpanExporter(sys.stdout)
+    if spec.startswith("file:"):
+        return StreamSpanExporter.to_file(spec[len("file:"):])
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"Invalid tracing exporter: {spec}")
+    exporter = getattr(importlib.import_module(module_name), class_name)()
+    if not isinstance(exporter, ISpanExporter):
+        raise ValueError(f"{spec} is not an ISpanExporter")
+    return exporter
+
+
+class Tracer:
+    """Start the spans, the current one is kept in a context variable.
+
+    The context variables follow the coroutines and the threads started
+    with asyncio.to_thread(), the other threads (executors and queues)
+    must run with a copy of the context of the caller.
+    """
+
+    def __init__(self, exporter: Optional[ISpanExporter] = None):
+        self.exporter = exporter or NoopSpanExporter()
+        self._current: contextvars.ContextVar[Optional[Span]] = (
+            contextvars.ContextVar("kubekarma_current_span", default=None)
+        )
+
+    def set_exporter(self, exporter: ISpanExporter):
+        previous, self.exporter = self.exporter, exporter
+        previous.shutdown()
+
+    def current_span(self) -> Optional[Span]:
+        return self._current.get()
+
+    def current_context(self) -> Optional[SpanContext]:
+        span = self._current.get()
+        return span.context if span is not None else None
+
+    @contextlib.contextmanager
+    def start_span(
+        self,
+        name: str,
+        parent: Optional[SpanContext] = None,
+        attributes: Optional[dict] = None
+    ) -> Iterator[Span]:
+        """Run a span, a child of `parent` or of the current span.
+
+        Without a parent nor a current span a new trace is started.
+        """
+        parent = parent or self.current_context()
+        span = Span(
+            name,
+            SpanContext(
+                trace_id=(
+                    parent.trace_id if parent else SpanContext.new_id(16)
+                ),
+                span_id=SpanContext.new_id(8)
+            ),
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes
+        )
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._current.reset(token)
+            span.end_time = time.time()
+            try:
+                self.exporter.export(span)
+            except Exception:
+                pass
+
+    def inject(
+        self,
+        metadata: Iterable[Tuple[str, str]] = (),
+        context: Optional[SpanContext] = None
+    ) -> Tuple[Tuple[str, str], ...]:
+        """Return the gRPC metadata with the traceparent of the context."""
+        context = context or self.current_context()
+        metadata = tuple(metadata)
+        if context is None:
+            return metadata
+        return metadata + ((TRACEPARENT_METADATA, context.to_traceparent()),)
+
+    @staticmethod
+    def extract(
+        metadata: Optional[Iterable[Tuple[str, str]]]
+    ) -> Optional[SpanContext]:
+        """Return the context sent in the gRPC metadata, if any."""
+        for key, value in metadata or ():
+            if key == TRACEPARENT_METADATA:
+                return SpanContext.from_traceparent(value)
+        return None
+
+
+# The tracer of the process
+tracer = Tracer()
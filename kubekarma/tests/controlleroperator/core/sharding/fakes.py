@@ -0,0 +1,50 @@
+import copy
+import threading
+
+from kubernetes import client
+from kubernetes.client.exceptions import ApiException
+
+
+class FakeCoordinationApi:
+    """The Lease methods of the CoordinationV1Api, in memory.
+
+    Shared by the replicas of a test as the API server would be.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.leases = {}
+
+    def patch_namespaced_lease(self, name, namespace, body):
+        with self.lock:
+            if (namespace, name) not in self.leases:
+                raise ApiException(status=404, reason="Not Found")
+            self.leases[namespace, name] = copy.deepcopy(body)
+
+    def create_namespaced_lease(self, namespace, body):
+        with self.lock:
+            self.leases[namespace, body.metadata.name] = copy.deepcopy(body)
+
+    def delete_namespaced_lease(self, name, namespace):
+        with self.lock:
+            if self.leases.pop((namespace, name), None) is None:
+                raise ApiException(status=404, reason="Not Found")
+
+    def list_namespaced_lease(self, namespace, label_selector):
+        key, value = label_selector.split("=")
+        with self.lock:
+            return client.V1LeaseList(items=[
+                copy.deepcopy(lease)
+                for (lease_namespace, _), lease in self.leases.items()
+                if lease_namespace == namespace
+                and lease.metadata.labels.get(key) == value
+            ])
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
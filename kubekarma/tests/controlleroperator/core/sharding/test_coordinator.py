@@ -0,0 +1,236 @@
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+import grpc
+
+from kubekarma.controlleroperator.core.abc.shardassignee import IShardAssignee
+from kubekarma.controlleroperator.core.controllerengine import ControllerEngine
+from kubekarma.controlleroperator.core.sharding.coordinator import \
+    ShardCoordinator
+from kubekarma.controlleroperator.core.sharding.forwarder import \
+    FORWARDED_BY_METADATA
+from kubekarma.controlleroperator.core.sharding.membership import \
+    LeaseMembership
+from kubekarma.controlleroperator.grpcservicers.server import \
+    build_grpc_server
+from kubekarma.grpcgen.collectors.v1alpha import controller_pb2, \
+    controller_pb2_grpc
+from kubekarma.tests.controlleroperator.core.sharding.fakes import \
+    FakeClock, FakeCoordinationApi
+from kubekarma.tests.controlleroperator.grpcservicers.test_server import \
+    free_port
+
+TOKENS = [f"{i:08x}" for i in range(30)]
+
+
+class RecordingPublisher:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tokens = []
+
+    def notify_new_results(self, token, results):
+        with self.lock:
+            self.tokens.append(token)
+
+    def notify_partial_results(self, token, results):
+        pass
+
+
+class FakeAssignee(IShardAssignee):
+
+    def __init__(self):
+        self.acquired = set()
+
+    def is_acquired(self, body) -> bool:
+        return body["metadata"]["name"] in self.acquired
+
+    def acquire(self, body):
+        self.acquired.add(body["metadata"]["name"])
+
+    def release(self, body):
+        self.acquired.remove(body["metadata"]["name"])
+
+
+class Replica:
+    """A controller replica: a gRPC server, its coordinator and lease."""
+
+    def __init__(self, identity: str, api: FakeCoordinationApi, clock):
+        self.identity = identity
+        self.address = f"127.0.0.1:{free_port()}"
+        self.coordinator = ShardCoordinator(identity, self.address)
+        self.publisher = RecordingPublisher()
+        self.assignee = FakeAssignee()
+        controller_engine = Mock(spec=ControllerEngine)
+        controller_engine.get_results_publisher.return_value = self.publisher
+        controller_engine.get_results_ingest_queue.return_value = None
+        controller_engine.get_shard_coordinator.return_value = (
+            self.coordinator
+        )
+        self.server = build_grpc_server(self.address, controller_engine)
+        self.membership = LeaseMembership(
+            api,
+            namespace="kubekarma",
+            identity=identity,
+            address=self.address,
+            on_change=self.coordinator.update_members,
+            clock=clock
+        )
+
+    def track(self, token: str):
+        body = {"metadata": {"name": token, "namespace": "default"}}
+        self.coordinator.track(token, body, self.assignee)
+
+    def stop(self):
+        self.server.stop(None)
+        self.coordinator.close()
+
+
+class SlowAssignee(FakeAssignee):
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def acquire(self, body):
+        self.calls += 1
+        time.sleep(0.05)
+        super().acquire(body)
+
+
+class ShardCoordinatorTest(unittest.TestCase):
+
+    def test_a_suite_is_acquired_once(self):
+        coordinator = ShardCoordinator("a", "a:8080")
+        self.addCleanup(coordinator.close)
+        assignee = SlowAssignee()
+        body = {"metadata": {"name": "suite", "namespace": "default"}}
+        coordinator.track(TOKENS[0], body, assignee)
+        # the membership thread and a kopf handler at the same time
+        threads = [
+            threading.Thread(
+                target=coordinator.update_members, args=({"a": "a:8080"},)
+            ),
+            threading.Thread(
+                target=coordinator.track, args=(TOKENS[0], body, assignee)
+            ),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(1, assignee.calls)
+        self.assertEqual({"suite"}, assignee.acquired)
+
+    def test_a_forgotten_suite_is_not_acquired(self):
+        coordinator = ShardCoordinator("a", "a:8080")
+        self.addCleanup(coordinator.close)
+        assignee = FakeAssignee()
+        body = {"metadata": {"name": "suite", "namespace": "default"}}
+        coordinator.track(TOKENS[0], body, assignee)
+        coordinator.forget(TOKENS[0])
+        coordinator.update_members({"a": "a:8080"})
+        self.assertFalse(assignee.acquired)
+
+
+class ShardedReplicasTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = FakeCoordinationApi()
+        self.clock = FakeClock()
+        self.replicas = [
+            Replica(identity, self.api, self.clock) for identity in "abc"
+        ]
+        for replica in self.replicas:
+            replica.server.start()
+            self.addCleanup(replica.stop)
+        self.heartbeat()
+        self.channel = grpc.insecure_channel(self.replicas[0].address)
+        self.addCleanup(self.channel.close)
+        self.stub = controller_pb2_grpc.TestSuiteExecutionResultServiceStub(
+            self.channel
+        )
+
+    def heartbeat(self):
+        # twice, so every replica sees the leases renewed by the others
+        for _ in range(2):
+            for replica in self.replicas:
+                replica.membership.heartbeat()
+
+    def owner(self, token: str) -> Replica:
+        owners = [r for r in self.replicas if r.coordinator.is_local(token)]
+        self.assertEqual(1, len(owners))
+        return owners[0]
+
+    def test_the_results_reach_the_owner(self):
+        for token in TOKENS:
+            response = self.stub.ReportResults(
+                controller_pb2.ExecutionResultRequest(token=token)
+            )
+            self.assertEqual("ok", response.message)
+        for replica in self.replicas:
+            self.assertEqual(
+                [t for t in TOKENS if self.owner(t) is replica],
+                replica.publisher.tokens
+            )
+            self.assertGreater(len(replica.publisher.tokens), 0)
+        self.assertEqual(
+            len(TOKENS) - len(self.replicas[0].publisher.tokens),
+            self.replicas[0].coordinator.as_dict()["forwarded"]
+        )
+
+    def test_streamed_results_reach_the_owner(self):
+        token = next(t for t in TOKENS if self.owner(t) is self.replicas[1])
+        chunks = [
+            controller_pb2.ExecutionResultRequest(token=token),
+            controller_pb2.ExecutionResultRequest(name="suite"),
+        ]
+        self.stub.StreamResults(iter(chunks))
+        self.assertEqual([token], self.replicas[1].publisher.tokens)
+
+    def test_the_suites_are_rebalanced(self):
+        for replica in self.replicas:
+            for token in TOKENS:
+                replica.track(token)
+
+        def assert_acquired_once(replicas):
+            acquired = [
+                name for r in replicas for name in r.assignee.acquired
+            ]
+            self.assertEqual(sorted(TOKENS), sorted(acquired))
+            for replica in replicas:
+                for name in replica.assignee.acquired:
+                    self.assertIs(replica, self.owner(name))
+
+        assert_acquired_once(self.replicas)
+        leaving = self.replicas.pop()
+        leaving.membership.leave()
+        self.assertTrue(leaving.assignee.acquired)
+        self.heartbeat()
+        assert_acquired_once(self.replicas)
+
+        for replica in self.replicas:
+            replica.coordinator.forget(TOKENS[0])
+        self.assertNotIn(
+            TOKENS[0],
+            {name for r in self.replicas for name in r.assignee.acquired}
+        )
+
+    def test_forwarded_results_are_not_forwarded_again(self):
+        token = next(t for t in TOKENS if self.owner(t) is not self.replicas[0])
+        with self.assertRaises(grpc.RpcError) as e:
+            self.stub.ReportResults(
+                controller_pb2.ExecutionResultRequest(token=token),
+                metadata=((FORWARDED_BY_METADATA, "b"),)
+            )
+        self.assertEqual(grpc.StatusCode.UNAVAILABLE, e.exception.code())
+
+    def test_results_without_owner_are_rejected(self):
+        self.replicas[0].coordinator.update_members({})
+        with self.assertRaises(grpc.RpcError) as e:
+            self.stub.ReportResults(
+                controller_pb2.ExecutionResultRequest(token=TOKENS[0])
+            )
+        self.assertEqual(grpc.StatusCode.UNAVAILABLE, e.exception.code())
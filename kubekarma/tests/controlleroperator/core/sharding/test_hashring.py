@@ -0,0 +1,50 @@
+import collections
+import unittest
+
+from kubekarma.controlleroperator.core.sharding.hashring import HashRing
+
+KEYS = [f"{i:08x}" for i in range(10_000)]
+
+
+class HashRingTest(unittest.TestCase):
+
+    def owners(self, ring: HashRing) -> dict:
+        return {key: ring.owner(key) for key in KEYS}
+
+    def test_empty_ring(self):
+        self.assertIsNone(HashRing().owner("key"))
+
+    def test_the_owners_do_not_depend_on_the_order(self):
+        self.assertEqual(
+            self.owners(HashRing(["a", "b", "c"])),
+            self.owners(HashRing(["c", "a", "b"]))
+        )
+
+    def test_the_keys_are_balanced(self):
+        counts = collections.Counter(
+            self.owners(HashRing(["a", "b", "c", "d"])).values()
+        )
+        self.assertEqual({"a", "b", "c", "d"}, set(counts))
+        for count in counts.values():
+            self.assertGreater(count, len(KEYS) / 4 * 0.7)
+            self.assertLess(count, len(KEYS) / 4 * 1.3)
+
+    def test_a_member_joining_only_takes_keys(self):
+        ring = HashRing(["a", "b", "c"])
+        before = self.owners(ring)
+        ring.add("d")
+        after = self.owners(ring)
+        moved = [key for key in KEYS if before[key] != after[key]]
+        self.assertEqual({"d"}, {after[key] for key in moved})
+        self.assertLess(len(moved), len(KEYS) / 4 * 1.3)
+
+    def test_a_member_leaving_only_gives_its_keys(self):
+        ring = HashRing(["a", "b", "c"])
+        before = self.owners(ring)
+        ring.remove("b")
+        after = self.owners(ring)
+        for key in KEYS:
+            if before[key] != "b":
+                self.assertEqual(before[key], after[key])
+        self.assertNotIn("b", after.values())
+        self.assertEqual(["a", "c"], ring.members)
@@ -0,0 +1,71 @@
+import unittest
+from unittest.mock import Mock
+
+from kubernetes.client.exceptions import ApiException
+
+from kubekarma.controlleroperator.core.sharding.membership import \
+    LeaseMembership
+from kubekarma.tests.controlleroperator.core.sharding.fakes import \
+    FakeClock, FakeCoordinationApi
+
+
+class LeaseMembershipTest(unittest.TestCase):
+
+    def setUp(self):
+        self.api = FakeCoordinationApi()
+        self.clock = FakeClock()
+        self.changes = []
+
+    def member(self, identity: str, api=None) -> LeaseMembership:
+        return LeaseMembership(
+            api or self.api,
+            namespace="kubekarma",
+            identity=identity,
+            address=f"{identity}:8080",
+            on_change=self.changes.append,
+            lease_duration=15,
+            clock=self.clock
+        )
+
+    def test_the_replicas_see_each_other(self):
+        a, b = self.member("a"), self.member("b")
+        a.heartbeat()
+        self.assertEqual({"a": "a:8080"}, a.members)
+        b.heartbeat()
+        a.heartbeat()
+        self.assertEqual({"a": "a:8080", "b": "b:8080"}, a.members)
+        self.assertEqual(a.members, b.members)
+
+    def test_a_replica_leaving(self):
+        a, b = self.member("a"), self.member("b")
+        for member in (a, b, a):
+            member.heartbeat()
+        b.leave()
+        a.heartbeat()
+        self.assertEqual({"a": "a:8080"}, a.members)
+        self.assertEqual({"a": "a:8080"}, self.changes[-1])
+
+    def test_a_replica_not_renewing_expires(self):
+        a, b = self.member("a"), self.member("b")
+        for member in (a, b, a):
+            member.heartbeat()
+        # b doesn't renew, the expiration is timed by the clock of a
+        self.clock.now = 14
+        a.heartbeat()
+        self.assertIn("b", a.members)
+        self.clock.now = 15
+        a.heartbeat()
+        self.assertEqual({"a": "a:8080"}, a.members)
+
+        b.heartbeat()
+        a.heartbeat()
+        self.assertIn("b", a.members)
+
+    def test_a_replica_not_renewing_its_lease_is_not_a_member(self):
+        api = Mock(wraps=self.api)
+        a = self.member("a", api=api)
+        a.heartbeat()
+        api.patch_namespaced_lease.side_effect = ApiException(status=500)
+        self.clock.now = 20
+        a.heartbeat()
+        self.assertEqual({}, a.members)
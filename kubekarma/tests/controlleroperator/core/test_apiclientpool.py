@@ -0,0 +1,97 @@
+import socket
+import threading
+import time
+import unittest
+from concurrent import futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from kubernetes import client
+
+from kubekarma.controlleroperator.core.apiclientpool import PooledApiClient
+
+
+class SlowApiServer(ThreadingHTTPServer):
+    """Record the connections and the max requests at the same time."""
+
+    daemon_threads = True
+
+    def __init__(self, delay: float):
+        super().__init__(("127.0.0.1", 0), SlowHandler)
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.connections = set()
+        self.running = 0
+        self.max_running = 0
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: SlowApiServer
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.connections.add(self.client_address)
+            self.server.running += 1
+            self.server.max_running = max(
+                self.server.max_running, self.server.running
+            )
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.running -= 1
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class PooledApiClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = SlowApiServer(delay=0.05)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        configuration = client.Configuration(
+            host=f"http://127.0.0.1:{self.server.server_address[1]}"
+        )
+        self.api_client = PooledApiClient(
+            configuration, max_connections=3, keepalive=30
+        )
+
+    def get(self, _=None):
+        return self.api_client.call_api(
+            "/apis/kubekarma.io/v1/networktestsuites",
+            "GET",
+            response_type="object",
+            _return_http_data_only=True
+        )
+
+    def test_requests_share_the_pooled_connections(self):
+        with futures.ThreadPoolExecutor(max_workers=12) as executor:
+            results = list(executor.map(self.get, range(24)))
+        self.assertEqual([{}] * 24, results)
+        self.assertEqual(3, self.server.max_running)
+        # the connections are kept and reused
+        self.assertEqual(3, len(self.server.connections))
+
+        statistics = self.api_client.pool_statistics.as_dict()
+        self.assertEqual(24, statistics["requests"])
+        self.assertEqual(0, statistics["in_use"])
+        self.assertEqual(0, statistics["waiting"])
+        self.assertGreater(statistics["waited"], 0)
+        self.assertGreater(statistics["wait_seconds_max"], 0.0)
+
+    def test_connections_are_kept_alive(self):
+        self.get()
+        pool = self.api_client.rest_client.pool_manager.connection_from_url(
+            self.api_client.configuration.host
+        )
+        connection = pool.pool.queue[-1]
+        self.assertEqual(
+            1, connection.sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+        )
@@ -0,0 +1,129 @@
+import contextvars
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+from kubekarma.controlleroperator.core.crdinstancemanager import CRD, \
+    CRDInstanceManager, merge_patches
+from kubekarma.controlleroperator.core.eventaggregator import \
+    EventAggregator
+
+
+def build_crd_manager() -> CRDInstanceManager:
+    return CRDInstanceManager(
+        api_client=Mock(),
+        crd_ctx=CRD(
+            namespace="default",
+            metadata_name="suite",
+            cron_job_name="suite-123456",
+            worker_task_id="12345678",
+            plural="networktestsuites"
+        ),
+        body={
+            "apiVersion": "kubekarma.io/v1",
+            "kind": "NetworkTestSuite",
+            "metadata": {"name": "suite", "namespace": "default", "uid": "uid"}
+        },
+        contextvars_copy=contextvars.copy_context()
+    )
+
+
+class MergePatchesTest(unittest.TestCase):
+
+    def test_merge(self):
+        target = {"status": {"phase": "Pending", "a": 1}, "metadata": {"x": 1}}
+        merge_patches(target, {"status": {"phase": "Active", "b": None}})
+        self.assertEqual(
+            {
+                "status": {"phase": "Active", "a": 1, "b": None},
+                "metadata": {"x": 1}
+            },
+            target
+        )
+
+
+class CRDInstanceManagerBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch(
+            "kubekarma.controlleroperator.core.crdinstancemanager.client"
+            ".CustomObjectsApi"
+        )
+        self.patch_custom_object = (
+            patcher.start().return_value.patch_namespaced_custom_object
+        )
+        self.addCleanup(patcher.stop)
+        self.crd_manager = build_crd_manager()
+
+    def sent_patches(self) -> list:
+        return [
+            c.kwargs["body"] for c in self.patch_custom_object.call_args_list
+        ]
+
+    def test_patches_without_batch(self):
+        self.crd_manager.save()
+        self.crd_manager.set_phase_to_active()
+        self.assertEqual(2, self.patch_custom_object.call_count)
+
+    def test_batch_merges_metadata_and_status(self):
+        with self.crd_manager.batch():
+            self.crd_manager.save()
+            self.crd_manager.set_phase_to_failed()
+            with self.crd_manager.batch():
+                self.crd_manager.set_phase_to_active()
+            self.patch_custom_object.assert_not_called()
+        self.assertEqual(
+            [{
+                "metadata": {
+                    "annotations": self.crd_manager.crd_data.generate_annotations()
+                },
+                "status": {"phase": "Active", "testExecutionStatus": "Pending"}
+            }],
+            self.sent_patches()
+        )
+
+    def test_pending_patch_is_sent_on_errors(self):
+        with self.assertRaises(ValueError):
+            with self.crd_manager.batch():
+                self.crd_manager.set_phase_to_active()
+                raise ValueError()
+        self.assertEqual(1, self.patch_custom_object.call_count)
+
+    def test_other_threads_are_not_batched(self):
+        with self.crd_manager.batch():
+            thread = threading.Thread(
+                target=self.crd_manager.set_phase_to_suspended
+            )
+            thread.start()
+            thread.join()
+            self.assertEqual(1, self.patch_custom_object.call_count)
+        self.patch_custom_object.assert_called_once()
+
+
+class CRDInstanceManagerEventsTest(unittest.TestCase):
+
+    @patch("kubekarma.controlleroperator.core.crdinstancemanager.kopf")
+    def test_events_are_posted_through_the_aggregator(self, kopf):
+        crd_manager = build_crd_manager()
+        crd_manager._event_aggregator = aggregator = EventAggregator()
+        for _ in range(3):
+            crd_manager.error_event("NoResultsReceived", "No response")
+        kopf.event.assert_not_called()
+        aggregator.flush()
+        kopf.event.assert_called_once_with(
+            crd_manager.body_cache,
+            reason="NoResultsReceived",
+            message="No response",
+            type="Error"
+        )
+        self.assertEqual(2, aggregator.as_dict()["aggregated"])
+
+    @patch("kubekarma.controlleroperator.core.crdinstancemanager.kopf")
+    def test_events_without_aggregator(self, kopf):
+        crd_manager = build_crd_manager()
+        crd_manager.info_event("CronJobCreated", "created")
+        kopf.info.assert_called_once_with(
+            crd_manager.body_cache,
+            reason="CronJobCreated",
+            message="created"
+        )
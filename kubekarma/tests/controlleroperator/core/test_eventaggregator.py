@@ -0,0 +1,109 @@
+import unittest
+from unittest.mock import Mock
+
+from kubekarma.controlleroperator.core.eventaggregator import \
+    EventAggregator
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class EventAggregatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.aggregator = EventAggregator(
+            window=600,
+            rate=1,
+            burst=2,
+            max_pending=3,
+            clock=self.clock
+        )
+        self.post = Mock()
+
+    def emit(self, reason="TestSuiteFailed", message="Test suite failed"):
+        self.aggregator.emit("uid", "Error", reason, message, self.post)
+
+    def posted_messages(self) -> list:
+        return [c.args[0] for c in self.post.call_args_list]
+
+    def test_identical_events_are_aggregated(self):
+        for _ in range(10):
+            self.emit()
+            self.clock.now += 60
+            self.aggregator.flush()
+        self.assertEqual(
+            [
+                "Test suite failed",
+                "Test suite failed (repeated 9 times in the last 600s)"
+            ],
+            self.posted_messages()
+        )
+        self.assertEqual(9, self.aggregator.as_dict()["aggregated"])
+
+    def test_different_events_are_not_aggregated(self):
+        self.emit()
+        self.emit(reason="NoResultsReceived")
+        self.aggregator.emit("other", "Error", "TestSuiteFailed",
+                             "Test suite failed", self.post)
+        for _ in range(2):
+            self.aggregator.flush()
+            self.clock.now += 1
+        self.assertEqual(3, self.post.call_count)
+
+    def test_event_not_repeated_is_forgotten(self):
+        self.emit()
+        self.aggregator.flush()
+        self.clock.now += 600
+        self.aggregator.flush()
+        self.emit()
+        self.aggregator.flush()
+        self.assertEqual(
+            ["Test suite failed", "Test suite failed"],
+            self.posted_messages()
+        )
+
+    def test_rate_limit(self):
+        for i in range(3):
+            self.emit(message=f"message {i}")
+        self.aggregator.flush()
+        self.assertEqual(["message 0", "message 1"], self.posted_messages())
+        self.aggregator.flush()
+        self.assertEqual(2, self.post.call_count)
+        self.clock.now += 1
+        self.aggregator.flush()
+        self.assertEqual(3, self.post.call_count)
+        self.assertEqual(
+            {"posted": 3, "aggregated": 0, "dropped": 0, "pending": 0},
+            self.aggregator.as_dict()
+        )
+
+    def test_oldest_pending_events_are_dropped(self):
+        for i in range(5):
+            self.emit(message=f"message {i}")
+        for _ in range(2):
+            self.aggregator.flush()
+            self.clock.now += 1
+        self.assertEqual(["message 2", "message 3", "message 4"],
+                         self.posted_messages())
+        self.assertEqual(2, self.aggregator.as_dict()["dropped"])
+
+    def test_post_errors_do_not_stop_the_flush(self):
+        self.post.side_effect = [RuntimeError(), None]
+        self.emit(message="a")
+        self.emit(message="b")
+        self.aggregator.flush()
+        self.assertEqual(2, self.post.call_count)
+
+    def test_thread_posts_the_events(self):
+        aggregator = EventAggregator(flush_interval=0.01)
+        aggregator.start()
+        aggregator.emit("uid", "Normal", "CronJobCreated", "created", self.post)
+        aggregator.stop()
+        self.post.assert_called_once_with("created")
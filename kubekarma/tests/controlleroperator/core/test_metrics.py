@@ -0,0 +1,140 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from prometheus_client import REGISTRY
+
+from kubekarma.controlleroperator import httpserver
+from kubekarma.controlleroperator.core.abc.resultspublisher import \
+    IResultsSubscriber
+from kubekarma.controlleroperator.core.controllerengine import ControllerEngine
+from kubekarma.controlleroperator.core.crdinstancemanager import CRD, \
+    CRDInstanceManager
+from kubekarma.controlleroperator.core.scheduler import SchedulerThread
+from kubekarma.controlleroperator.core.testsuite.resultsreportsubscriber \
+    import ResultsReportSubscriber
+from kubekarma.controlleroperator.core.warmstart import WarmStartStatistics
+from kubekarma.grpcgen.collectors.v1alpha.controller_pb2 import \
+    ExecutionResultRequest
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class MetricsTest(unittest.TestCase):
+
+    def test_results_dispatch(self):
+        engine = ControllerEngine()
+        publisher = engine.get_results_publisher()
+        publisher.add_results_listener("task", Mock(spec=IResultsSubscriber))
+        before = sample("kubekarma_controller_results_dispatch_seconds_count")
+        publisher.notify_new_results("task", ExecutionResultRequest())
+        self.assertEqual(
+            before + 1,
+            sample("kubekarma_controller_results_dispatch_seconds_count")
+        )
+
+    def test_results_received_by_kind(self):
+        subscriber = ResultsReportSubscriber(
+            schedule="* * * * *",
+            crd_manager=Mock(spec=CRDInstanceManager),
+            kind="NetworkTestSuite"
+        )
+        name = "kubekarma_controller_results_received_total"
+        before = sample(name, kind="NetworkTestSuite")
+        subscriber.update(ExecutionResultRequest())
+        self.assertEqual(before + 1, sample(name, kind="NetworkTestSuite"))
+
+    def test_worker_statistics(self):
+        subscriber = ResultsReportSubscriber(
+            schedule="* * * * *",
+            crd_manager=Mock(spec=CRDInstanceManager),
+            kind="NetworkTestSuite"
+        )
+        name = "kubekarma_controller_worker_statistics_total"
+
+        def hits() -> float:
+            return sample(
+                name, kind="NetworkTestSuite", statistic="dns_cache_hits"
+            )
+        before = hits()
+        for _ in range(2):
+            subscriber.update(ExecutionResultRequest(statistics={
+                "dns_cache_hits": 7,
+                "dns_cache_misses": 0,
+                "Not a statistic!": 1,
+            }))
+        self.assertEqual(before + 14, hits())
+        self.assertIsNone(REGISTRY.get_sample_value(
+            name, {"kind": "NetworkTestSuite", "statistic": "Not a statistic!"}
+        ))
+
+    def test_status_patches_are_labeled_by_kind_only(self):
+        name = "kubekarma_controller_status_patch_seconds_count"
+        before = sample(name, kind="networktestsuites")
+        for i in range(50):
+            crd_manager = CRDInstanceManager(
+                api_client=Mock(),
+                crd_ctx=CRD(
+                    namespace="default",
+                    metadata_name=f"suite-{i}",
+                    cron_job_name=f"suite-{i}-123456",
+                    worker_task_id=f"task-{i}",
+                    plural="networktestsuites"
+                ),
+                body={
+                    "apiVersion": "kubekarma.io/v1",
+                    "kind": "NetworkTestSuite",
+                    "metadata": {
+                        "name": f"suite-{i}", "namespace": "default", "uid": "uid"
+                    },
+                },
+                contextvars_copy=Mock()
+            )
+            crd_manager.custom_objects_api = Mock()
+            crd_manager.set_phase_to_active()
+        self.assertEqual(before + 50, sample(name, kind="networktestsuites"))
+        # a series per kind, not per test suite
+        series = [
+            s.labels
+            for metric in REGISTRY.collect()
+            if metric.name == "kubekarma_controller_status_patch_seconds"
+            for s in metric.samples
+            if s.name.endswith("_count")
+        ]
+        self.assertEqual(
+            1, sum(labels == {"kind": "networktestsuites"} for labels in series)
+        )
+        self.assertTrue(all(set(labels) == {"kind"} for labels in series))
+
+    def test_scheduler_lateness(self):
+        now = [100.0]
+        scheduler = SchedulerThread(timefunc=lambda: now[0])
+        scheduler.enterabs(90.0, 1, lambda: None)
+        name = "kubekarma_controller_scheduler_lateness_seconds"
+        before = sample(f"{name}_sum")
+        scheduler.run_pending()
+        self.assertEqual(before + 10, sample(f"{name}_sum"))
+
+    def test_warm_start(self):
+        now = [100.0]
+        statistics = WarmStartStatistics(clock=lambda: now[0])
+        now[0] = 112.5
+        statistics.mark_ready()
+        # the next calls don't change the time to ready
+        now[0] = 200.0
+        statistics.mark_ready()
+        self.assertEqual(12.5, sample("kubekarma_controller_warm_start_seconds"))
+
+    def test_metrics_endpoint(self):
+        engine = ControllerEngine()
+        engine.get_results_publisher().add_results_listener(
+            "task", Mock(spec=IResultsSubscriber)
+        )
+        engine.scheduler.enterabs(2e9, 1, lambda: None)
+        with patch.object(httpserver, "the_controller_engine", engine):
+            response = httpserver.metrics()
+        body = response.body.decode()
+        self.assertIn("kubekarma_controller_results_subscribers 1.0", body)
+        self.assertIn("kubekarma_controller_pending_deadlines 1.0", body)
+        self.assertIn("kubekarma_controller_warm_start_seconds", body)
@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import Mock
+
+from kubekarma.controlleroperator.core.abc.resultspublisher import \
+    ITestResultsPublisher
+from kubekarma.controlleroperator.core.resultsingestqueue import \
+    ResultsIngestQueue
+
+
+class ResultsIngestQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.publisher = Mock(spec=ITestResultsPublisher)
+        self.received = []
+        self.publisher.notify_new_results.side_effect = (
+            lambda execution_id, results: self.received.append(
+                (execution_id, results)
+            )
+        )
+
+    def test_results_of_an_execution_are_processed_in_order(self):
+        ingest_queue = ResultsIngestQueue(
+            self.publisher, max_size=1000, consumers=4
+        )
+        ingest_queue.start()
+        for i in range(100):
+            self.assertTrue(ingest_queue.submit(f"execution-{i % 5}", i))
+        ingest_queue.stop()
+        for execution in range(5):
+            self.assertEqual(
+                list(range(execution, 100, 5)),
+                [r for e, r in self.received if e == f"execution-{execution}"]
+            )
+        self.assertEqual(
+            {
+                "accepted": 100,
+                "rejected": 0,
+                "duplicated": 0,
+                "processed": 100,
+                "partial_skipped": 0,
+                "pending": 0,
+            },
+            ingest_queue.as_dict()
+        )
+
+    def test_full_queue_rejects_the_results(self):
+        ingest_queue = ResultsIngestQueue(self.publisher, max_size=2, consumers=1)
+        self.assertTrue(ingest_queue.submit("execution", 1))
+        self.assertFalse(ingest_queue.submit_partial("execution", 2))
+        self.assertTrue(ingest_queue.submit("execution", 3))
+        self.assertFalse(ingest_queue.submit("execution", 4))
+        self.assertEqual(1, ingest_queue.as_dict()["rejected"])
+        self.assertEqual(2, ingest_queue.pending())
+
+    def test_the_retried_results_are_enqueued_once(self):
+        ingest_queue = ResultsIngestQueue(self.publisher, consumers=1)
+        self.assertTrue(ingest_queue.submit("execution", 1, started_at=10))
+        # the worker didn't get the answer and sends them again
+        self.assertTrue(ingest_queue.submit("execution", 1, started_at=10))
+        # the next execution
+        self.assertTrue(ingest_queue.submit("execution", 2, started_at=20))
+        self.assertEqual(2, ingest_queue.pending())
+        self.assertEqual(1, ingest_queue.as_dict()["duplicated"])
+
+    def test_errors_do_not_stop_the_consumers(self):
+        self.publisher.notify_new_results.side_effect = [ValueError(), None]
+        ingest_queue = ResultsIngestQueue(self.publisher, consumers=1)
+        ingest_queue.start()
+        ingest_queue.submit("execution", 1)
+        ingest_queue.submit("execution", 2)
+        ingest_queue.stop()
+        self.assertEqual(2, self.publisher.notify_new_results.call_count)
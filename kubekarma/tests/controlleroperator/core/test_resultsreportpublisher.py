@@ -1,3 +1,5 @@
+import random
+import threading
 import unittest
 from unittest.mock import Mock
 
@@ -42,3 +44,128 @@ class ResultsReportPublisherTest(unittest.TestCase):
         )
         susb_1.update.assert_called_once_with(None)
         susb_2.update.assert_called_once_with(None)
+
+    def test_add_results_listeners(self):
+        publisher = ResultsReportPublisher(shards=4)
+        subscribers = {
+            f"execution-{i}": [Mock(spec=IResultsSubscriber) for _ in range(2)]
+            for i in range(10)
+        }
+        publisher.add_results_listener("execution-0", subscribers["execution-0"][0])
+        publisher.add_results_listeners(
+            (execution_id, subscriber)
+            for execution_id, execution_subscribers in subscribers.items()
+            for subscriber in execution_subscribers
+        )
+        for execution_id, execution_subscribers in subscribers.items():
+            self.assertEqual(
+                set(execution_subscribers),
+                publisher.get_subscribers(execution_id)
+            )
+
+    def test_partial_results(self):
+        publisher = ResultsReportPublisher()
+        subscriber = Mock(spec=IResultsSubscriber)
+        failing_subscriber = Mock(spec=IResultsSubscriber)
+        failing_subscriber.update_partial.side_effect = ValueError()
+        publisher.add_results_listener("execution_id", failing_subscriber)
+        publisher.add_results_listener("execution_id", subscriber)
+
+        publisher.notify_partial_results("execution_id", results=None)
+
+        subscriber.update_partial.assert_called_once_with(None)
+        subscriber.update.assert_not_called()
+
+
+class CountingSubscriber(IResultsSubscriber):
+
+    def __init__(self):
+        self.deletions = 0
+
+    def update(self, results):
+        pass
+
+    def on_delete(self):
+        self.deletions += 1
+
+
+class ResultsReportPublisherConcurrencyTest(unittest.TestCase):
+
+    WRITERS = 4
+    NOTIFIERS = 6
+    EXECUTION_IDS = [f"execution-{i}" for i in range(64)]
+
+    def test_subscribe_unsubscribe_and_notify_concurrently(self):
+        publisher = ResultsReportPublisher()
+        writers_done = threading.Event()
+        errors = []
+        # each writer owns some execution ids, and knows their subscribers
+        expected = [{} for _ in range(self.WRITERS)]
+        removed = [[] for _ in range(self.WRITERS)]
+
+        def write(writer: int):
+            rnd = random.Random(writer)
+            execution_ids = self.EXECUTION_IDS[writer::self.WRITERS]
+            for _ in range(3000):
+                execution_id = rnd.choice(execution_ids)
+                if rnd.random() < 0.2:
+                    publisher.remove_results_listeners(execution_id)
+                    removed[writer].extend(
+                        expected[writer].pop(execution_id, set())
+                    )
+                else:
+                    subscriber = CountingSubscriber()
+                    publisher.add_results_listener(execution_id, subscriber)
+                    expected[writer].setdefault(
+                        execution_id, set()
+                    ).add(subscriber)
+
+        def notify(notifier: int):
+            rnd = random.Random(100 + notifier)
+            try:
+                while not writers_done.is_set():
+                    execution_id = rnd.choice(self.EXECUTION_IDS)
+                    publisher.notify_new_results(execution_id, results=None)
+                    publisher.notify_partial_results(execution_id, results=None)
+            except Exception as e:  # pragma: no cover
+                errors.append(e)
+
+        writers = [
+            threading.Thread(target=write, args=(i,))
+            for i in range(self.WRITERS)
+        ]
+        notifiers = [
+            threading.Thread(target=notify, args=(i,))
+            for i in range(self.NOTIFIERS)
+        ]
+        for thread in notifiers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        writers_done.set()
+        for thread in notifiers:
+            thread.join()
+
+        self.assertEqual([], errors)
+        for writer in range(self.WRITERS):
+            for execution_id, subscribers in expected[writer].items():
+                self.assertEqual(
+                    subscribers, publisher.get_subscribers(execution_id)
+                )
+                self.assertTrue(all(s.deletions == 0 for s in subscribers))
+            self.assertTrue(all(s.deletions == 1 for s in removed[writer]))
+
+    def test_notifications_do_not_wait_for_the_writers(self):
+        publisher = ResultsReportPublisher()
+        subscriber = Mock(spec=IResultsSubscriber)
+        publisher.add_results_listener("execution_id", subscriber)
+        # a writer of the same shard holding the lock
+        with publisher._locks[publisher._shard_of("execution_id")]:
+            thread = threading.Thread(
+                target=publisher.notify_new_results,
+                args=("execution_id", None)
+            )
+            thread.start()
+            thread.join(timeout=1)
+            self.assertFalse(thread.is_alive())
+        subscriber.update.assert_called_once_with(None)
@@ -0,0 +1,92 @@
+import threading
+import time
+import unittest
+
+from kubekarma.controlleroperator.core.scheduler import SchedulerThread
+
+
+class SchedulerThreadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = SchedulerThread()
+        self.scheduler.start()
+        self.addCleanup(self.scheduler.join)
+        self.addCleanup(self.scheduler.stop)
+
+    def test_events_run_in_time_order(self):
+        done = threading.Event()
+        executed = []
+        now = time.time()
+        self.scheduler.enterabs(now + 0.2, 1, done.set)
+        for delay in (0.15, 0.05, 0.1):
+            self.scheduler.enterabs(now + delay, 1, executed.append, (delay,))
+        self.assertTrue(done.wait(timeout=2))
+        self.assertEqual([0.05, 0.1, 0.15], executed)
+
+    def test_earlier_event_wakes_up_the_thread(self):
+        # the thread is waiting for an event one hour ahead
+        self.scheduler.enterabs(time.time() + 3600, 1, self.fail)
+        time.sleep(0.05)
+        done = threading.Event()
+        start = time.time()
+        self.scheduler.enterabs(start + 0.05, 1, done.set)
+        self.assertTrue(done.wait(timeout=2))
+        self.assertLess(time.time() - start, 0.5)
+        statistics = self.scheduler.statistics()
+        self.assertEqual(1, statistics["executed"])
+        self.assertEqual(1, statistics["pending"])
+        self.assertLess(statistics["lateness_max_seconds"], 0.5)
+
+    def test_bulk(self):
+        done = threading.Event()
+        executed = []
+        now = time.time()
+        with self.scheduler.bulk():
+            self.scheduler.enterabs(now + 0.2, 1, done.set)
+            for delay in (0.15, 0.05, 0.1):
+                self.scheduler.enterabs(
+                    now + delay, 1, executed.append, (delay,)
+                )
+            # the thread waits for the bulk
+            time.sleep(0.1)
+            self.assertEqual([], executed)
+        self.assertTrue(done.wait(timeout=2))
+        self.assertEqual([0.05, 0.1, 0.15], executed)
+
+    def test_cancel(self):
+        done = threading.Event()
+        now = time.time()
+        events = [
+            self.scheduler.enterabs(now + 0.05, 1, self.fail)
+            for _ in range(10)
+        ]
+        self.scheduler.enterabs(now + 0.1, 1, done.set)
+        for event in events:
+            self.scheduler.cancel(event)
+        self.assertEqual(1, self.scheduler.pending())
+        with self.assertRaises(ValueError):
+            self.scheduler.cancel(events[0])
+        self.assertTrue(done.wait(timeout=2))
+        self.assertTrue(self.scheduler.empty())
+
+    def test_errors_do_not_stop_the_thread(self):
+        done = threading.Event()
+        now = time.time()
+        self.scheduler.enterabs(now, 1, lambda: 1 / 0)
+        self.scheduler.enterabs(now, 2, done.set)
+        self.assertTrue(done.wait(timeout=2))
+        self.assertTrue(self.scheduler.is_alive())
+
+    def test_concurrent_enter_and_cancel(self):
+        def enter_and_cancel():
+            for _ in range(1000):
+                event = self.scheduler.enterabs(time.time() + 60, 1, self.fail)
+                self.scheduler.cancel(event)
+                self.scheduler.enterabs(time.time() + 60, 1, self.fail)
+
+        threads = [threading.Thread(target=enter_and_cancel) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(8000, self.scheduler.pending())
@@ -0,0 +1,129 @@
+import random
+import threading
+import time
+import unittest
+
+from kubekarma.controlleroperator.core.timingwheel import \
+    TimingWheelScheduler
+
+
+class FakeClock:
+
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TimingWheelSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = TimingWheelScheduler(
+            tick=1.0,
+            wheels=(8, 4, 2),
+            timefunc=self.clock
+        )
+        self.executed = []
+
+    def enter(self, delay: float, priority: int = 1):
+        at = self.clock.now + delay
+        return self.scheduler.enterabs(
+            at, priority, self.executed.append, ((at, priority),)
+        )
+
+    def advance(self, seconds: int):
+        """Advance the clock a second at a time, returning the events run."""
+        executed = []
+        for _ in range(seconds):
+            self.clock.now += 1
+            self.scheduler.run_pending()
+            for at, priority in self.executed:
+                # never early, at most one tick late
+                self.assertLessEqual(at, self.clock.now)
+                self.assertLess(self.clock.now - at, 1 + 1e-6)
+            executed.extend(self.executed)
+            self.executed.clear()
+        return executed
+
+    def test_events_run_in_order_across_the_wheels(self):
+        delays = [0.5, 3, 7.5, 8, 9, 31, 32, 63, 64, 100, 1000]
+        for delay in reversed(delays):
+            self.enter(delay)
+        executed = self.advance(1001)
+        self.assertEqual(sorted(a for a, _ in executed), [a for a, _ in executed])
+        self.assertEqual(len(delays), len(executed))
+        self.assertTrue(self.scheduler.empty())
+
+    def test_same_tick_events_run_by_time_and_priority(self):
+        self.enter(0.75, priority=2)
+        self.enter(0.75, priority=1)
+        self.enter(0.5, priority=3)
+        executed = self.advance(1)
+        self.assertEqual([3, 1, 2], [p for _, p in executed])
+
+    def test_random_events(self):
+        rnd = random.Random(7)
+        events = [self.enter(rnd.uniform(0, 200)) for _ in range(500)]
+        cancelled = rnd.sample(events, 100)
+        for event in cancelled:
+            self.scheduler.cancel(event)
+        self.assertEqual(400, self.scheduler.pending())
+        executed = self.advance(201)
+        self.assertEqual(
+            sorted(e.time for e in events if e not in cancelled),
+            [a for a, _ in executed]
+        )
+        self.assertEqual(400, self.scheduler.statistics()["executed"])
+
+    def test_due_events_run_on_the_next_tick(self):
+        self.enter(-10)
+        self.scheduler.run_pending()
+        self.assertEqual([], self.executed)
+        self.clock.now += 1
+        self.scheduler.run_pending()
+        self.assertEqual(1, len(self.executed))
+        self.assertEqual(
+            11.0, self.scheduler.statistics()["lateness_max_seconds"]
+        )
+
+    def test_bulk(self):
+        now = self.clock.now
+        with self.scheduler.bulk():
+            for delay in (9, 0.5, 3):
+                self.enter(delay)
+        self.assertEqual(
+            [now + delay for delay in (0.5, 3, 9)],
+            [at for at, _ in self.advance(9)]
+        )
+
+    def test_cancel(self):
+        event = self.enter(5)
+        self.scheduler.cancel(event)
+        with self.assertRaises(ValueError):
+            self.scheduler.cancel(event)
+        self.assertEqual([], self.advance(10))
+        executed_event = self.enter(1)
+        self.advance(1)
+        with self.assertRaises(ValueError):
+            self.scheduler.cancel(executed_event)
+
+    def test_idle_ticks_are_skipped(self):
+        self.clock.now += 10 ** 6
+        self.enter(2)
+        self.assertEqual(1, len(self.advance(2)))
+
+
+class TimingWheelSchedulerThreadTest(unittest.TestCase):
+
+    def test_thread(self):
+        scheduler = TimingWheelScheduler(tick=0.01)
+        scheduler.start()
+        done = threading.Event()
+        scheduler.enterabs(time.time() + 3600, 1, done.set)
+        scheduler.enterabs(time.time() + 0.05, 1, done.set)
+        self.assertTrue(done.wait(timeout=2))
+        scheduler.stop()
+        scheduler.join()
+        self.assertEqual(1, scheduler.pending())
@@ -0,0 +1,441 @@
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+
+from kopf._cogs.clients import errors
+from kubernetes import client
+
+from kubekarma.controlleroperator.core.abc.crdvalidator import ICrdValidator
+from kubekarma.controlleroperator.core.controllerengine import ControllerEngine
+from kubekarma.controlleroperator.core.abc.testsuitekind import ITestSuiteKind
+from kubekarma.controlleroperator.core.crdinstancemanager import \
+    AsyncCRDInstanceManager, CRD
+from kubekarma.controlleroperator.core.sharding.coordinator import \
+    ShardCoordinator
+from kubekarma.controlleroperator.core.testsuite.lifecyclehandler import \
+    AsyncControllerCRDLifecycleHandler, ControllerCRDLifecycleHandler
+from kubekarma.controlleroperator.core.warmstart import WarmStartStatistics
+from kubekarma.controlleroperator.kinds.networktestsuite import \
+    NetworkTestSuite
+
+BODY = {
+    "apiVersion": "kubekarma.io/v1",
+    "kind": "NetworkTestSuite",
+    "metadata": {"name": "suite", "namespace": "default", "uid": "uid"},
+}
+CRD_URL = "/apis/kubekarma.io/v1/namespaces/default/networktestsuites/suite"
+CRON_JOBS_URL = "/apis/batch/v1/namespaces/default/cronjobs"
+
+
+class AsyncControllerCRDLifecycleHandlerTest(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        patcher = patch(
+            "kubekarma.controlleroperator.core.crdinstancemanager.api"
+        )
+        self.api = patcher.start()
+        self.api.patch = AsyncMock()
+        self.api.post = AsyncMock()
+        self.addCleanup(patcher.stop)
+        for target in ("settings_var", "kopf"):
+            patcher = patch(
+                f"kubekarma.controlleroperator.core.crdinstancemanager.{target}"
+            )
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.validator = Mock(spec=ICrdValidator)
+        self.validator.validate_spec.return_value = []
+        self.kind = Mock(spec=ITestSuiteKind)
+        self.kind.kind = "NetworkTestSuite"
+        self.kind.api_plural = "networktestsuites"
+        self.kind.api_client = client.ApiClient()
+        self.kind.get_crd_validator.return_value = self.validator
+        self.kind.get_crd_for_creation.return_value = CRD(
+            namespace="default",
+            metadata_name="suite",
+            cron_job_name="suite-123456",
+            worker_task_id="12345678",
+            plural="networktestsuites"
+        )
+        self.kind.generate_cron_job.return_value = client.V1CronJob(
+            metadata=client.V1ObjectMeta(name="suite-123456")
+        )
+        self.handlers = AsyncControllerCRDLifecycleHandler(self.kind)
+
+    def patches(self) -> list:
+        return [
+            (c.args[0], c.kwargs["payload"]) for c in self.api.patch.call_args_list
+        ]
+
+    async def create(self):
+        with patch(
+            "kubekarma.controlleroperator.core.testsuite.lifecyclehandler.kopf"
+        ):
+            await self.handlers.handle_create(
+                spec={"schedule": "* * * * *"}, body=BODY
+            )
+
+    async def test_create(self):
+        await self.create()
+
+        self.api.post.assert_awaited_once()
+        self.assertEqual(CRON_JOBS_URL, self.api.post.call_args.args[0])
+        self.assertEqual(
+            {"metadata": {"name": "suite-123456"}},
+            self.api.post.call_args.kwargs["payload"]
+        )
+        self.assertEqual(
+            [(CRD_URL, {
+                "metadata": {"annotations": {
+                    "kubekarma.io/cronjob": "suite-123456",
+                    "kubekarma.io/worker-task-id": "12345678",
+                }},
+                "status": {"phase": "Active", "testExecutionStatus": "Pending"},
+            })],
+            self.patches()
+        )
+        self.assertEqual(
+            AsyncCRDInstanceManager.MERGE_PATCH_HEADERS,
+            self.api.patch.call_args.kwargs["headers"]
+        )
+        self.kind.initialize_results_listeners.assert_called_once()
+
+    async def test_a_failed_creation_is_retried(self):
+        # the CronJob is created, the patch of the CRD fails
+        self.api.patch.side_effect = [
+            errors.APIServerError(status=500, headers={}), None
+        ]
+        with self.assertRaises(errors.APIServerError):
+            await self.create()
+
+        # kopf retries it, the CronJob of the first attempt is kept
+        self.api.post.side_effect = errors.APIConflictError(
+            status=409, headers={}
+        )
+        await self.create()
+
+        self.assertEqual(
+            {"phase": "Active", "testExecutionStatus": "Pending"},
+            self.patches()[-1][1]["status"]
+        )
+        # the listeners of the first attempt are replaced
+        self.kind.remove_all_listeners.assert_called_once_with("12345678")
+        self.assertEqual(2, self.kind.initialize_results_listeners.call_count)
+
+    async def test_create_with_an_invalid_spec(self):
+        self.validator.validate_spec.return_value = ["schedule is invalid"]
+        await self.create()
+
+        self.api.post.assert_not_awaited()
+        self.assertEqual(
+            [(CRD_URL, {"status": {"phase": "Failed"}})], self.patches()
+        )
+
+    async def test_suspend_and_resume(self):
+        await self.create()
+        self.api.patch.reset_mock()
+
+        await self.handlers.handle_suspend(spec={"suspend": True}, body=BODY)
+        await self.handlers.handle_suspend(
+            spec={"suspend": False, "schedule": "* * * * *"}, body=BODY
+        )
+
+        cron_job_url = f"{CRON_JOBS_URL}/suite-123456"
+        self.assertEqual(
+            [
+                (cron_job_url, {"spec": {"suspend": True}}),
+                (CRD_URL, {"status": {
+                    "phase": "Suspended", "testExecutionStatus": "Pending"
+                }}),
+                (cron_job_url, {"spec": {"suspend": False}}),
+                (CRD_URL, {"status": {
+                    "phase": "Active", "testExecutionStatus": "Pending"
+                }}),
+            ],
+            self.patches()
+        )
+        self.kind.suspend_operations.assert_called_once()
+        self.kind.resume_operations.assert_called_once()
+
+    async def test_delete(self):
+        await self.create()
+        await self.handlers.handle_delete(spec={}, body=BODY)
+        self.kind.remove_all_listeners.assert_called_once_with("12345678")
+
+
+class ShardedControllerCRDLifecycleHandlerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.validator = Mock(spec=ICrdValidator)
+        self.validator.validate_spec.return_value = []
+        self.kind = Mock(spec=ITestSuiteKind)
+        self.kind.kind = "NetworkTestSuite"
+        self.kind.api_plural = "networktestsuites"
+        self.kind.api_client = Mock()
+        self.kind.get_crd_validator.return_value = self.validator
+        self.kind.generate_cron_job.return_value = client.V1CronJob(
+            metadata=client.V1ObjectMeta(name="suite-123456")
+        )
+        self.kind.get_crd_for_creation.return_value = CRD(
+            namespace="default",
+            metadata_name="suite",
+            cron_job_name="suite-123456",
+            worker_task_id="12345678",
+            plural="networktestsuites"
+        )
+        self.coordinator = ShardCoordinator("a", "a:8080")
+        self.handlers = ControllerCRDLifecycleHandler(
+            self.kind, shard_coordinator=self.coordinator
+        )
+        self.body = dict(
+            BODY,
+            spec={"schedule": "* * * * *"},
+            metadata=dict(BODY["metadata"], annotations={
+                "kubekarma.io/cronjob": "suite-123456",
+                "kubekarma.io/worker-task-id": "12345678",
+            })
+        )
+
+    def event(self, event_type: str, body=None):
+        with patch(
+            "kubekarma.controlleroperator.core.crdinstancemanager.kopf"
+        ), patch(
+            "kubekarma.controlleroperator.core.testsuite.lifecyclehandler.kopf"
+        ):
+            self.handlers.handle_event(
+                event={"type": event_type}, body=body or self.body
+            )
+
+    def api_calls(self) -> list:
+        return [
+            (c.args[0], c.args[1])
+            for c in self.kind.api_client.call_api.call_args_list
+        ]
+
+    def test_the_owned_suites_are_resumed(self):
+        self.event(None)
+        self.kind.initialize_results_listeners.assert_not_called()
+        self.assertFalse(self.handlers.owns(self.body))
+
+        self.coordinator.update_members({"a": "a:8080"})
+        self.assertTrue(self.handlers.owns(self.body))
+        self.kind.initialize_results_listeners.assert_called_once()
+        # the next events don't resume it again
+        self.event("MODIFIED")
+        self.kind.initialize_results_listeners.assert_called_once()
+
+    def test_the_owned_suites_not_created_yet_are_created(self):
+        self.coordinator.update_members({"a": "a:8080"})
+        new_body = dict(BODY, spec={"schedule": "* * * * *"})
+        self.event("ADDED", body=new_body)
+        self.kind.initialize_results_listeners.assert_called_once()
+        self.assertTrue(self.handlers.is_acquired(new_body))
+        self.assertEqual(
+            [
+                ("/apis/batch/v1/namespaces/{namespace}/cronjobs", "POST"),
+                (
+                    "/apis/{group}/{version}/namespaces/{namespace}"
+                    "/{plural}/{name}",
+                    "PATCH"
+                ),
+            ],
+            self.api_calls()
+        )
+        # the patch of the status doesn't create it again
+        self.event("MODIFIED", body=new_body)
+        self.kind.generate_cron_job.assert_called_once()
+
+    def test_the_suites_not_owned_are_not_created(self):
+        self.coordinator.update_members({"b": "b:8080"})
+        self.event("ADDED", body=dict(BODY, spec={"schedule": "* * * * *"}))
+        self.kind.generate_cron_job.assert_not_called()
+
+    def test_the_failed_suites_are_not_created_again(self):
+        self.coordinator.update_members({"a": "a:8080"})
+        self.event("ADDED", body=dict(
+            BODY, spec={"schedule": "* * * * *"}, status={"phase": "Failed"}
+        ))
+        self.kind.generate_cron_job.assert_not_called()
+
+    def test_a_failed_creation_is_retried(self):
+        self.coordinator.update_members({"a": "a:8080"})
+        new_body = dict(BODY, spec={"schedule": "* * * * *"})
+        # the CronJob is created, the patch of the CRD fails
+        self.kind.api_client.call_api.side_effect = [
+            None, client.ApiException(status=500)
+        ]
+        self.event("ADDED", body=new_body)
+        self.assertFalse(self.handlers.is_acquired(new_body))
+        self.kind.remove_all_listeners.assert_called_once_with("12345678")
+
+        # the CronJob created by the previous attempt is kept
+        self.kind.api_client.call_api.side_effect = [
+            client.ApiException(status=409), None
+        ]
+        self.event("MODIFIED", body=new_body)
+        self.assertTrue(self.handlers.is_acquired(new_body))
+
+    def test_the_suites_are_released(self):
+        self.coordinator.update_members({"a": "a:8080"})
+        self.event(None)
+        self.coordinator.update_members({"b": "b:8080"})
+        self.kind.remove_all_listeners.assert_called_once_with("12345678")
+        self.assertFalse(self.handlers.is_acquired(self.body))
+
+        self.coordinator.update_members({"a": "a:8080"})
+        self.event("DELETED")
+        self.assertEqual(2, self.kind.remove_all_listeners.call_count)
+
+
+class RetriedCreationTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = ControllerEngine()
+        self.handlers = ControllerCRDLifecycleHandler(
+            NetworkTestSuite(controller_engine=self.engine)
+        )
+        patcher = patch.object(NetworkTestSuite, "api_client", Mock())
+        self.api_client = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.body = dict(BODY, spec={
+            "schedule": "* * * * *",
+            "networkValidations": [{
+                "name": "exact",
+                "testExactDestination": {
+                    "destinationIP": "127.0.0.1",
+                    "port": 80,
+                    "expectSuccess": True
+                }
+            }]
+        })
+        self.worker_task_id = self.handlers.shard_key(self.body)
+
+    def create(self):
+        with patch(
+            "kubekarma.controlleroperator.core.crdinstancemanager.kopf"
+        ), patch(
+            "kubekarma.controlleroperator.core.testsuite.lifecyclehandler.kopf"
+        ):
+            self.handlers.handle_create(spec=self.body["spec"], body=self.body)
+
+    def test_the_listeners_are_not_duplicated_by_a_retry(self):
+        # the CronJob is created, the patch of the CRD fails
+        self.api_client.call_api.side_effect = [
+            None, client.ApiException(status=500)
+        ]
+        with self.assertRaises(client.ApiException):
+            self.create()
+
+        # kopf retries it, the CronJob of the first attempt is kept
+        self.api_client.call_api.side_effect = [
+            client.ApiException(status=409), None
+        ]
+        self.create()
+
+        publisher = self.engine.get_results_publisher()
+        # the subscriber of the status and the deadline
+        self.assertEqual(
+            2, len(publisher.get_subscribers(self.worker_task_id))
+        )
+        self.assertEqual(1, self.engine.scheduler.pending())
+
+
+def listed_suite(name: str, created=True, suspend=False, **metadata) -> dict:
+    annotations = {}
+    if created:
+        annotations = {
+            "kubekarma.io/cronjob": f"{name}-123456",
+            "kubekarma.io/worker-task-id": f"{name}-task",
+        }
+    return {
+        "apiVersion": "kubekarma.io/v1",
+        "kind": "NetworkTestSuite",
+        "metadata": dict(
+            name=name, namespace="default", uid=name,
+            annotations=annotations, **metadata
+        ),
+        "spec": {"schedule": "* * * * *", "suspend": suspend},
+        "status": {
+            "phase": "Active",
+            "lastExecutionTime": "2023-11-14T22:12:20+00:00",
+            "lastExecutionErrorTime": "2023-11-14T22:10:20+00:00",
+            "lastSucceededTime": "2023-11-14T22:12:20+00:00",
+        },
+    }
+
+
+class WarmStartTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = ControllerEngine()
+        self.handlers = ControllerCRDLifecycleHandler(
+            NetworkTestSuite(controller_engine=self.engine)
+        )
+        patcher = patch(
+            "kubekarma.controlleroperator.core.testsuite.lifecyclehandler"
+            ".client.CustomObjectsApi"
+        )
+        self.list_crds = patcher.start().return_value.list_cluster_custom_object
+        self.addCleanup(patcher.stop)
+        self.list_crds.side_effect = [
+            {
+                "items": [
+                    listed_suite("active"),
+                    listed_suite("suspended", suspend=True),
+                ],
+                "metadata": {"continue": "next-page"},
+            },
+            {
+                "items": [
+                    listed_suite("new", created=False),
+                    listed_suite(
+                        "deleted", deletionTimestamp="2023-11-14T22:13:20Z"
+                    ),
+                ],
+                "metadata": {},
+            },
+        ]
+
+    def test_warm_start(self):
+        statistics = WarmStartStatistics()
+        self.assertEqual(2, self.handlers.warm_start(statistics, page_size=2))
+        self.assertEqual(
+            "next-page", self.list_crds.call_args_list[1].kwargs["_continue"]
+        )
+
+        publisher = self.engine.get_results_publisher()
+        # the subscriber of the status and the deadline
+        subscribers = publisher.get_subscribers("active-task")
+        self.assertEqual(2, len(subscribers))
+        self.assertEqual(1, self.engine.scheduler.pending())
+        status_subscriber = next(
+            s for s in subscribers if hasattr(s, "test_suite_status_tracker")
+        )
+        self.assertEqual(
+            "2023-11-14T22:10:20+00:00",
+            status_subscriber.test_suite_status_tracker.latest_status[
+                "lastExecutionErrorTime"
+            ]
+        )
+        # suspended, resumed without listeners
+        self.assertTrue(
+            self.handlers.is_acquired(listed_suite("suspended"))
+        )
+        self.assertFalse(publisher.get_subscribers("suspended-task"))
+        self.assertFalse(self.handlers.is_acquired(listed_suite("new")))
+
+        # the resume handler finds them resumed
+        self.handlers.handle_resume_controller_restart(
+            spec={"schedule": "* * * * *"}, body=listed_suite("active")
+        )
+        self.assertEqual(2, len(publisher.get_subscribers("active-task")))
+
+        statistics.mark_ready()
+        self.assertEqual(
+            {"listed": 4, "resumed": 2},
+            {
+                key: value for key, value in statistics.as_dict().items()
+                if key in ("listed", "resumed")
+            }
+        )
+        self.assertIsNotNone(statistics.as_dict()["time_to_ready_seconds"])
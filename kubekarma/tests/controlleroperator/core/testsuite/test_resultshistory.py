@@ -0,0 +1,127 @@
+import unittest
+from unittest.mock import Mock, patch
+
+from fastapi import Response
+
+from kubekarma.controlleroperator import httpserver
+from kubekarma.controlleroperator.core.controllerengine import ControllerEngine
+from kubekarma.controlleroperator.core.crdinstancemanager import CRD
+from kubekarma.controlleroperator.core.testsuite.resultshistory import \
+    ExecutionHistory, ResultsHistory
+from kubekarma.shared.crd.genericcrd import CRDTestExecutionStatus
+
+Succeeding = CRDTestExecutionStatus.Succeeding
+Failing = CRDTestExecutionStatus.Failing
+
+
+class ExecutionHistoryTest(unittest.TestCase):
+
+    def test_the_last_executions_are_kept(self):
+        history = ExecutionHistory(capacity=3)
+        for i in range(5):
+            history.add(1700000000 + i, Succeeding, duration=i)
+        self.assertEqual(3, len(history))
+        self.assertEqual(
+            [1700000004, 1700000003, 1700000002],
+            [record.timestamp for record in history.records()]
+        )
+
+    def test_records_are_paginated(self):
+        history = ExecutionHistory(capacity=10)
+        for i in range(7):
+            history.add(i, Succeeding, duration=0.5)
+        self.assertEqual(
+            [4, 3, 2], [record.timestamp for record in history.records(2, 3)]
+        )
+        self.assertEqual(
+            [0], [record.timestamp for record in history.records(6, 3)]
+        )
+        self.assertEqual([], history.records(7, 3))
+
+    def test_failed_tests(self):
+        history = ExecutionHistory(capacity=2, max_failed_tests=2)
+        history.add(1, Failing, duration=1.5, failed_tests=["a", "b", "c"])
+        history.add(2, Succeeding, duration=1.5)
+        self.assertEqual(
+            [
+                {
+                    "timestamp": 2.0,
+                    "status": "Succeeding",
+                    "duration": 1.5,
+                    "failed": 0,
+                    "failedTests": [],
+                },
+                {
+                    "timestamp": 1.0,
+                    "status": "Failing",
+                    "duration": 1.5,
+                    "failed": 3,
+                    "failedTests": ["a", "b"],
+                },
+            ],
+            [record.as_dict() for record in history.records()]
+        )
+
+    def test_the_names_of_old_test_cases_are_dropped(self):
+        history = ExecutionHistory(capacity=2, max_failed_tests=1)
+        for i in range(10):
+            history.add(i, Failing, duration=0, failed_tests=[f"t{i}"])
+        self.assertLessEqual(len(history._names), 2)
+        self.assertEqual(
+            [["t9"], ["t8"]],
+            [record.failed_tests for record in history.records()]
+        )
+
+    def test_the_memory_is_bounded(self):
+        history = ExecutionHistory(capacity=100)
+        failed_tests = [f"test-case-{i}" for i in range(5)]
+        for i in range(100):
+            history.add(i, Failing, duration=1, failed_tests=failed_tests)
+        full = history.memory_bytes()
+        for i in range(1000):
+            history.add(i, Failing, duration=1, failed_tests=failed_tests)
+        self.assertEqual(full, history.memory_bytes())
+
+
+class ResultsHistoryTest(unittest.TestCase):
+
+    def test_histories_by_test_suite(self):
+        histories = ResultsHistory(capacity=5)
+        history = histories.get_or_create("default", "suite")
+        history.add(1, Succeeding, duration=1)
+        self.assertIs(history, histories.get_or_create("default", "suite"))
+        self.assertIsNone(histories.get("other", "suite"))
+        statistics = histories.as_dict()
+        self.assertEqual(1, statistics["suites"])
+        self.assertEqual(1, statistics["records"])
+        self.assertGreater(statistics["memory_bytes"], 0)
+
+        histories.remove("default", "suite")
+        self.assertIsNone(histories.get("default", "suite"))
+
+
+class SuiteHistoryEndpointTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = ControllerEngine()
+        patcher = patch.object(httpserver, "the_controller_engine", self.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_history(self):
+        crd = Mock(spec=CRD, namespace="default", metadata_name="suite")
+        history = self.engine.get_results_history(crd)
+        for i in range(3):
+            history.add(i, Succeeding, duration=1)
+        response = Response()
+        page = httpserver.suite_history(
+            "default", "suite", response, offset=1, limit=1
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, page["total"])
+        self.assertEqual([1.0], [item["timestamp"] for item in page["items"]])
+
+    def test_unknown_suite(self):
+        response = Response()
+        httpserver.suite_history("default", "unknown", response, 0, 20)
+        self.assertEqual(404, response.status_code)
@@ -0,0 +1,219 @@
+import unittest
+from datetime import timedelta
+from unittest.mock import Mock
+
+from kubekarma.controlleroperator.core.crdinstancemanager import \
+    CRDInstanceManager
+from kubekarma.controlleroperator.core.testsuite.resultshistory import \
+    ExecutionHistory
+from kubekarma.controlleroperator.core.testsuite.resultsreportsubscriber \
+    import ResultsReportSubscriber
+from kubekarma.grpcgen.collectors.v1alpha.controller_pb2 import \
+    ExecutionResultRequest, ValidationResult
+
+
+def results_of(*statuses, started_at=1700000000) -> ExecutionResultRequest:
+    results = ExecutionResultRequest(name="suite", token="token")
+    results.start_time.FromSeconds(started_at)
+    for i, status in enumerate(statuses):
+        result = results.validation_results.add(name=f"t{i}", status=status)
+        result.duration.FromMilliseconds(started_at % 1000)
+    return results
+
+
+class ResultsReportSubscriberTest(unittest.TestCase):
+
+    def setUp(self):
+        self.crd_manager = Mock(spec=CRDInstanceManager)
+        self.subscriber = ResultsReportSubscriber(
+            schedule="* * * * *",
+            crd_manager=self.crd_manager,
+            partial_update_interval=timedelta(hours=1)
+        )
+
+    def last_status(self) -> dict:
+        return self.crd_manager.set_test_suite_result_status.call_args[1]["status"]
+
+    def test_update(self):
+        self.subscriber.update(results_of(
+            ValidationResult.Status.SUCCEEDED,
+            ValidationResult.Status.FAILED
+        ))
+        status = self.last_status()
+        self.assertEqual("Failing", status["testExecutionStatus"])
+        self.assertEqual("1 / 2", status["passingCount"])
+        self.assertEqual("2023-11-14T22:13:20+00:00", status["lastExecutionTime"])
+        self.assertEqual("0s", status["testCases"][0]["executionTime"])
+        self.crd_manager.error_event.assert_called_once()
+
+    def test_the_executions_are_recorded(self):
+        self.subscriber.history = ExecutionHistory(capacity=10)
+        self.subscriber.update(results_of(
+            ValidationResult.Status.SUCCEEDED,
+            ValidationResult.Status.FAILED,
+            started_at=1700000400
+        ))
+        [record] = self.subscriber.history.records()
+        self.assertEqual(
+            {
+                "timestamp": 1700000400.0,
+                "status": "Failing",
+                "duration": 0.4,
+                "failed": 1,
+                "failedTests": ["t1"],
+            },
+            record.as_dict()
+        )
+
+    def test_the_duration_of_concurrent_test_cases_is_the_wall_time(self):
+        self.subscriber.history = ExecutionHistory(capacity=10)
+        results = results_of(
+            ValidationResult.Status.SUCCEEDED,
+            ValidationResult.Status.SUCCEEDED,
+            ValidationResult.Status.SUCCEEDED
+        )
+        # (started after the execution, duration) in milliseconds
+        for result, (offset, duration) in zip(
+            results.validation_results, [(0, 500), (100, 200), (300, 1200)]
+        ):
+            result.start_time.FromMilliseconds(1700000000000 + offset)
+            result.duration.FromMilliseconds(duration)
+        self.subscriber.update(results)
+        [record] = self.subscriber.history.records()
+        self.assertEqual(1.5, record.duration)
+
+    def test_the_status_of_the_crd_is_continued(self):
+        subscriber = ResultsReportSubscriber(
+            schedule="* * * * *",
+            crd_manager=self.crd_manager,
+            status={
+                "phase": "Active",
+                "lastExecutionTime": "2023-11-14T22:12:20+00:00",
+                "lastExecutionErrorTime": "2023-11-14T22:10:20+00:00",
+                "lastSucceededTime": "2023-11-14T22:12:20+00:00",
+                "testExecutionStatus": "Succeeding",
+                "passingCount": "1 / 1",
+                "suspended": False,
+            }
+        )
+        subscriber.update(results_of(ValidationResult.Status.SUCCEEDED))
+        # the time of the last error survives the restart, and the fields
+        # already applied are not patched again
+        self.assertEqual(
+            {
+                "lastExecutionTime": "2023-11-14T22:13:20+00:00",
+                "lastSucceededTime": "2023-11-14T22:13:20+00:00",
+                "testCases": [
+                    {"name": "t0", "status": "Succeeded", "executionTime": "0s"}
+                ],
+            },
+            self.last_status()
+        )
+        self.assertEqual(
+            "2023-11-14T22:10:20+00:00",
+            subscriber.test_suite_status_tracker.latest_status[
+                "lastExecutionErrorTime"
+            ]
+        )
+
+    def test_partial_updates_are_throttled(self):
+        self.subscriber.update_partial(results_of())
+        self.crd_manager.set_test_suite_result_status.assert_not_called()
+
+        self.subscriber.update_partial(
+            results_of(ValidationResult.Status.SUCCEEDED)
+        )
+        self.subscriber.update_partial(results_of(
+            ValidationResult.Status.SUCCEEDED,
+            ValidationResult.Status.SUCCEEDED
+        ))
+        self.crd_manager.set_test_suite_result_status.assert_called_once()
+        self.assertEqual(
+            {"testCases", "passingCount"},
+            set(self.last_status())
+        )
+
+        # the whole results are always applied, and restart the throttling
+        self.subscriber.update(results_of(ValidationResult.Status.SUCCEEDED))
+        self.subscriber.update_partial(
+            results_of(ValidationResult.Status.FAILED)
+        )
+        self.assertEqual(
+            3, self.crd_manager.set_test_suite_result_status.call_count
+        )
+
+    def test_partial_update_keeps_the_pending_test_cases(self):
+        self.subscriber.update(results_of(
+            ValidationResult.Status.SUCCEEDED,
+            ValidationResult.Status.SUCCEEDED
+        ))
+        self.subscriber.update_partial(
+            results_of(ValidationResult.Status.FAILED)
+        )
+        status = self.last_status()
+        self.assertEqual(
+            [("t0", "Failed"), ("t1", "Succeeded")],
+            [(t["name"], t["status"]) for t in status["testCases"]]
+        )
+        self.assertEqual("1 / 2", status["passingCount"])
+
+
+class DiffAwareStatusPatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.crd_manager = Mock(spec=CRDInstanceManager)
+        self.subscriber = ResultsReportSubscriber(
+            schedule="* * * * *",
+            crd_manager=self.crd_manager
+        )
+        self.counters = self.subscriber.patch_counters
+
+    def sent_patches(self) -> list:
+        return [
+            c.kwargs["status"]
+            for c in self.crd_manager.set_test_suite_result_status.call_args_list
+        ]
+
+    def test_only_volatile_changes_are_skipped(self):
+        for started_at in (1700000000, 1700000060, 1700000120):
+            self.subscriber.update(results_of(
+                ValidationResult.Status.SUCCEEDED, started_at=started_at
+            ))
+        self.assertEqual(1, len(self.sent_patches()))
+        self.assertEqual(
+            {"sent": 1, "skipped": 2, "minimized": 0}, self.counters.as_dict()
+        )
+
+    def test_only_changed_fields_are_sent(self):
+        self.subscriber.update(results_of(
+            ValidationResult.Status.SUCCEEDED,
+            ValidationResult.Status.SUCCEEDED,
+        ))
+        self.subscriber.update(results_of(
+            ValidationResult.Status.SUCCEEDED,
+            ValidationResult.Status.FAILED,
+            started_at=1700000060
+        ))
+        patch = self.sent_patches()[-1]
+        self.assertEqual(
+            {
+                "lastExecutionTime", "lastExecutionErrorTime",
+                "testExecutionStatus", "testCases", "passingCount"
+            },
+            set(patch)
+        )
+        self.assertEqual("Failing", patch["testExecutionStatus"])
+        self.assertEqual(
+            {"sent": 2, "skipped": 0, "minimized": 1}, self.counters.as_dict()
+        )
+
+    def test_volatile_fields_are_refreshed(self):
+        self.subscriber.test_suite_status_tracker.refresh_interval = timedelta(0)
+        self.subscriber.update(results_of(ValidationResult.Status.SUCCEEDED))
+        self.subscriber.update(results_of(
+            ValidationResult.Status.SUCCEEDED, started_at=1700000060
+        ))
+        self.assertEqual(
+            {"lastExecutionTime", "lastSucceededTime", "testCases"},
+            set(self.sent_patches()[-1])
+        )
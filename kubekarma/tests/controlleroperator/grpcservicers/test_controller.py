@@ -0,0 +1,122 @@
+import unittest
+from unittest.mock import Mock
+
+import grpc
+
+from kubekarma.controlleroperator.core.abc.resultspublisher import \
+    ITestResultsPublisher
+from kubekarma.controlleroperator.core.resultsingestqueue import \
+    ResultsIngestQueue
+from kubekarma.controlleroperator.grpcservicers.controller import \
+    ControllerServiceServicer, QUEUE_FULL_DETAILS
+from kubekarma.grpcgen.collectors.v1alpha.controller_pb2 import \
+    ExecutionResultRequest, ValidationResult
+
+
+def grpc_context(metadata=()) -> Mock:
+    context = Mock()
+    context.invocation_metadata.return_value = metadata
+    return context
+
+
+class ControllerServiceServicerTest(unittest.TestCase):
+
+    def test_stream_results(self):
+        publisher = Mock(spec=ITestResultsPublisher)
+        partial_sizes = []
+        publisher.notify_partial_results.side_effect = (
+            lambda token, results: partial_sizes.append(
+                len(results.validation_results)
+            )
+        )
+        chunks = [
+            ExecutionResultRequest(name="suite", token="token"),
+            ExecutionResultRequest(
+                validation_results=[ValidationResult(name="t0")]
+            ),
+            ExecutionResultRequest(
+                validation_results=[ValidationResult(name="t1")]
+            ),
+            ExecutionResultRequest(statistics={"dns_cache_hits": 1}),
+        ]
+
+        response = ControllerServiceServicer(publisher).StreamResults(
+            iter(chunks), context=grpc_context()
+        )
+
+        self.assertEqual("ok", response.message)
+        self.assertEqual([0, 1, 2, 2], partial_sizes)
+        publisher.notify_new_results.assert_called_once()
+        token = publisher.notify_new_results.call_args[0][0]
+        results = publisher.notify_new_results.call_args[1]["results"]
+        self.assertEqual("token", token)
+        self.assertEqual(
+            ["t0", "t1"], [r.name for r in results.validation_results]
+        )
+        self.assertEqual({"dns_cache_hits": 1}, dict(results.statistics))
+
+
+class ControllerServiceServicerIngestQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.publisher = Mock(spec=ITestResultsPublisher)
+        self.ingest_queue = ResultsIngestQueue(
+            self.publisher, max_size=3, consumers=1
+        )
+        self.servicer = ControllerServiceServicer(
+            self.publisher, ingest_queue=self.ingest_queue
+        )
+
+    def test_report_results_is_rejected_when_the_queue_is_full(self):
+        context = grpc_context()
+        for _ in range(4):
+            self.servicer.ReportResults(
+                ExecutionResultRequest(token="token"), context
+            )
+        context.abort.assert_called_once_with(
+            grpc.StatusCode.RESOURCE_EXHAUSTED, QUEUE_FULL_DETAILS
+        )
+        self.publisher.notify_new_results.assert_not_called()
+        self.assertEqual(3, self.ingest_queue.pending())
+
+    def test_report_results_retried_by_the_worker_are_applied_once(self):
+        results = ExecutionResultRequest(token="token")
+        results.start_time.FromSeconds(1700000000)
+        context = grpc_context()
+        for _ in range(2):
+            self.servicer.ReportResults(results, context)
+        context.abort.assert_not_called()
+        self.ingest_queue.start()
+        self.ingest_queue.stop()
+        self.publisher.notify_new_results.assert_called_once()
+
+    def test_stream_results_enqueue_a_copy_of_the_partial_results(self):
+        self.ingest_queue = ResultsIngestQueue(
+            self.publisher, max_size=4, consumers=1
+        )
+        self.servicer.ingest_queue = self.ingest_queue
+        partial_sizes = []
+        self.publisher.notify_partial_results.side_effect = (
+            lambda token, results: partial_sizes.append(
+                len(results.validation_results)
+            )
+        )
+        chunks = [
+            ExecutionResultRequest(name="suite", token="token"),
+            ExecutionResultRequest(
+                validation_results=[ValidationResult(name="t0")]
+            ),
+            ExecutionResultRequest(
+                validation_results=[ValidationResult(name="t1")]
+            ),
+        ]
+        # the last partial results exceed the half of the queue
+        self.servicer.StreamResults(iter(chunks), context=grpc_context())
+        self.ingest_queue.start()
+        self.ingest_queue.stop()
+
+        self.assertEqual([0, 1], partial_sizes)
+        self.publisher.notify_new_results.assert_called_once()
+        self.assertEqual(
+            1, self.ingest_queue.as_dict()["partial_skipped"]
+        )
@@ -0,0 +1,143 @@
+import asyncio
+import socket
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+import grpc
+
+from kubekarma.controlleroperator.core.controllerengine import ControllerEngine
+from kubekarma.controlleroperator.core.resultsingestqueue import \
+    ResultsIngestQueue
+from kubekarma.controlleroperator.grpcservicers.server import \
+    build_aio_grpc_server
+from kubekarma.grpcgen.collectors.v1alpha import controller_pb2, \
+    controller_pb2_grpc
+from kubekarma.grpcgen.health.v1 import health_pb2, health_pb2_grpc
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class SlowPublisher:
+    """Record the max number of notifications running at the same time."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.results = []
+
+    def notify_new_results(self, token, results):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+            self.results.append(results)
+
+    def notify_partial_results(self, token, results):
+        pass
+
+
+class AioGrpcServerTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.publisher = SlowPublisher(delay=0.1)
+        controller_engine = Mock(spec=ControllerEngine)
+        controller_engine.get_results_publisher.return_value = self.publisher
+        controller_engine.get_results_ingest_queue.return_value = None
+        controller_engine.get_shard_coordinator.return_value = None
+        address = f"127.0.0.1:{free_port()}"
+        self.server = build_aio_grpc_server(
+            address, controller_engine, max_concurrent_reports=4
+        )
+        await self.server.start()
+        self.channel = grpc.aio.insecure_channel(address)
+        self.stub = controller_pb2_grpc.TestSuiteExecutionResultServiceStub(
+            self.channel
+        )
+
+    async def asyncTearDown(self):
+        await self.channel.close()
+        await self.server.stop(None)
+
+    async def test_reports_are_processed_up_to_the_limit(self):
+        responses = await asyncio.gather(*(
+            self.stub.ReportResults(
+                controller_pb2.ExecutionResultRequest(token=f"token-{i}")
+            )
+            for i in range(12)
+        ))
+        self.assertEqual(["ok"] * 12, [r.message for r in responses])
+        self.assertEqual(12, len(self.publisher.results))
+        self.assertEqual(4, self.publisher.max_running)
+
+    async def test_stream_results(self):
+        chunks = [
+            controller_pb2.ExecutionResultRequest(name="suite", token="token"),
+            controller_pb2.ExecutionResultRequest(
+                validation_results=[controller_pb2.ValidationResult(name="t0")]
+            ),
+        ]
+        response = await self.stub.StreamResults(iter(chunks))
+        self.assertEqual("ok", response.message)
+        self.assertEqual("token", self.publisher.results[0].token)
+        self.assertEqual(1, len(self.publisher.results[0].validation_results))
+
+    async def test_health(self):
+        response = await health_pb2_grpc.HealthStub(self.channel).Check(
+            health_pb2.HealthCheckRequest()
+        )
+        self.assertEqual(health_pb2.HealthCheckResponse.SERVING, response.status)
+
+
+class AioGrpcServerIngestQueueTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.publisher = SlowPublisher(delay=0)
+        # not started, the results wait in the queue
+        self.ingest_queue = ResultsIngestQueue(
+            self.publisher, max_size=2, consumers=1
+        )
+        controller_engine = Mock(spec=ControllerEngine)
+        controller_engine.get_results_publisher.return_value = self.publisher
+        controller_engine.get_results_ingest_queue.return_value = (
+            self.ingest_queue
+        )
+        controller_engine.get_shard_coordinator.return_value = None
+        address = f"127.0.0.1:{free_port()}"
+        self.server = build_aio_grpc_server(address, controller_engine)
+        await self.server.start()
+        self.channel = grpc.aio.insecure_channel(address)
+        self.stub = controller_pb2_grpc.TestSuiteExecutionResultServiceStub(
+            self.channel
+        )
+
+    async def asyncTearDown(self):
+        await self.channel.close()
+        await self.server.stop(None)
+        self.ingest_queue.stop()
+
+    async def test_results_are_rejected_when_the_queue_is_full(self):
+        for i in range(2):
+            response = await self.stub.ReportResults(
+                controller_pb2.ExecutionResultRequest(token="token")
+            )
+            self.assertEqual("ok", response.message)
+        with self.assertRaises(grpc.aio.AioRpcError) as e:
+            await self.stub.ReportResults(
+                controller_pb2.ExecutionResultRequest(token="token")
+            )
+        self.assertEqual(grpc.StatusCode.RESOURCE_EXHAUSTED, e.exception.code())
+        self.assertEqual([], self.publisher.results)
+
+        self.ingest_queue.start()
+        self.ingest_queue.stop()
+        self.assertEqual(2, len(self.publisher.results))
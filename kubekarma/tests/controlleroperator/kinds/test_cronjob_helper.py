@@ -7,8 +7,46 @@ from kubekarma.controlleroperator.core.crdinstancemanager import CRD
 from kubekarma.controlleroperator.core.cronjob import CronJobHelper
 
 
+def worker_envs(cron: V1CronJob) -> dict:
+    container = cron.spec["jobTemplate"]["spec"]["template"]["spec"][
+        "containers"
+    ][0]
+    return {env.name: env.value for env in container["env"]}
+
+
 class CronJobHelperTest(unittest.TestCase):
 
+    def generate_cronjob(self, **config) -> V1CronJob:
+        return CronJobHelper.generate_cronjob(
+            crd_instance=CRD(
+                namespace="default",
+                plural="NetworkKubarmaTestSuite",
+                metadata_name="test-suite-1",
+                cron_job_name="test-suite-1-npts-1234",
+                worker_task_id="1234"
+            ),
+            schedule="* * * * *",
+            task_execution_config={"name": "test-suite-1"},
+            kind="NetworkKubarmaTestSuite",
+            config=Config(
+                controller_server_host="http://localhost:5000",
+                worker_image="kubekarma/worker:latest",
+                log_level=1,
+                **config
+            )
+        )
+
+    def test_the_results_are_streamed_only_to_the_aio_server(self):
+        self.assertNotIn(
+            "WORKER_STREAM_RESULTS", worker_envs(self.generate_cronjob())
+        )
+        self.assertEqual(
+            "true",
+            worker_envs(
+                self.generate_cronjob(grpc_server_mode="aio")
+            )["WORKER_STREAM_RESULTS"]
+        )
+
     def test_create_cronjob(self):
         cron = CronJobHelper.generate_cronjob(
             crd_instance=CRD(
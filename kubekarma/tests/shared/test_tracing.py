@@ -0,0 +1,234 @@
+import io
+import json
+import os
+import socket
+import tempfile
+import unittest
+from typing import List
+from unittest.mock import Mock
+
+from kubekarma.controlleroperator.core.controllerengine import ControllerEngine
+from kubekarma.controlleroperator.core.crdinstancemanager import CRD, \
+    CRDInstanceManager
+from kubekarma.controlleroperator.core.testsuite.resultsreportsubscriber \
+    import ResultsReportSubscriber
+from kubekarma.controlleroperator.grpcservicers.server import \
+    build_grpc_server
+from kubekarma.shared import tracing
+from kubekarma.shared.tracing import ISpanExporter, Span, SpanContext, \
+    StreamSpanExporter, Tracer
+from kubekarma.worker.abs.ikubekarmatestsuite import IKubekarmaTest, \
+    IKubekarmaTestSuite
+from kubekarma.worker.sender import ControllerCommunication
+from kubekarma.worker import testsuiteexecutor
+
+
+class RecordingExporter(ISpanExporter):
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span):
+        self.spans.append(span)
+
+    def by_name(self, name: str) -> Span:
+        """Return the last span ended with the name."""
+        return [span for span in self.spans if span.name == name][-1]
+
+
+class TracerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.exporter = RecordingExporter()
+        self.tracer = Tracer(self.exporter)
+
+    def test_traceparent(self):
+        context = SpanContext(trace_id="a" * 32, span_id="b" * 16)
+        self.assertEqual(
+            context, SpanContext.from_traceparent(context.to_traceparent())
+        )
+        self.assertIsNone(SpanContext.from_traceparent("00-abc-def-01"))
+        self.assertIsNone(
+            SpanContext.from_traceparent(f"00-{'x' * 32}-{'b' * 16}-01")
+        )
+
+    def test_children_of_the_current_span(self):
+        with self.tracer.start_span("parent") as parent:
+            with self.tracer.start_span("child") as child:
+                metadata = self.tracer.inject((("key", "value"),))
+        self.assertIsNone(self.tracer.current_span())
+        self.assertEqual(parent.context.trace_id, child.context.trace_id)
+        self.assertEqual(parent.context.span_id, child.parent_id)
+        self.assertIsNone(parent.parent_id)
+        self.assertEqual(child.context, Tracer.extract(metadata))
+        # the children end first
+        self.assertEqual(["child", "parent"], [s.name for s in self.exporter.spans])
+
+    def test_errors_are_recorded(self):
+        with self.assertRaises(ValueError):
+            with self.tracer.start_span("failing"):
+                raise ValueError("boom")
+        self.assertEqual("ValueError: boom", self.exporter.spans[0].error)
+        self.assertIsNotNone(self.exporter.spans[0].end_time)
+
+    def test_stream_exporter(self):
+        stream = io.StringIO()
+        self.tracer.set_exporter(StreamSpanExporter(stream))
+        with self.tracer.start_span("span", attributes={"key": "value"}):
+            pass
+        span = json.loads(stream.getvalue())
+        self.assertEqual("span", span["name"])
+        self.assertEqual({"key": "value"}, span["attributes"])
+
+    def test_get_exporter(self):
+        self.assertIsInstance(
+            tracing.get_exporter("none"), tracing.NoopSpanExporter
+        )
+        self.assertIsInstance(
+            tracing.get_exporter("stdout"), StreamSpanExporter
+        )
+        self.assertIsInstance(
+            tracing.get_exporter(f"{__name__}:RecordingExporter"),
+            RecordingExporter
+        )
+        with self.assertRaises(ValueError):
+            tracing.get_exporter("unknown")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "spans.jsonl")
+            exporter = tracing.get_exporter(f"file:{path}")
+            exporter.export(Span("span", SpanContext("a" * 32, "b" * 16)))
+            exporter.shutdown()
+            with open(path) as f:
+                self.assertEqual("span", json.loads(f.readline())["name"])
+
+
+class FakeTest(IKubekarmaTest):
+
+    @property
+    def name(self) -> str:
+        return "test"
+
+
+class FakeTestSuite(IKubekarmaTestSuite):
+    kind = "FakeTestSuite"
+
+    @property
+    def name(self) -> str:
+        return "suite"
+
+    @property
+    def test_cases(self):
+        return [FakeTest()]
+
+    def execute_test(self, test_case):
+        pass
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class EndToEndTracingTest(unittest.TestCase):
+    """From the execution in the worker to the patch of the status."""
+
+    def setUp(self):
+        self.exporter = RecordingExporter()
+        previous = tracing.tracer.exporter
+        tracing.tracer.set_exporter(self.exporter)
+        self.addCleanup(setattr, tracing.tracer, "exporter", previous)
+
+        self.engine = ControllerEngine()
+        self.engine.start()
+        self.addCleanup(self.engine.stop)
+        crd_manager = CRDInstanceManager(
+            api_client=Mock(),
+            crd_ctx=CRD(
+                namespace="default",
+                metadata_name="suite",
+                cron_job_name="suite-123456",
+                worker_task_id="token",
+                plural="networktestsuites"
+            ),
+            body={
+                "apiVersion": "kubekarma.io/v1",
+                "kind": "NetworkTestSuite",
+                "metadata": {
+                    "name": "suite", "namespace": "default", "uid": "uid"
+                },
+            },
+            contextvars_copy=Mock()
+        )
+        crd_manager.custom_objects_api = Mock()
+        self.engine.get_results_publisher().add_results_listener(
+            "token",
+            ResultsReportSubscriber(
+                schedule="* * * * *",
+                crd_manager=crd_manager,
+                kind="NetworkTestSuite"
+            )
+        )
+        address = f"127.0.0.1:{free_port()}"
+        self.server = build_grpc_server(address, self.engine)
+        self.server.start()
+        self.addCleanup(self.server.stop, None)
+        self.communication = ControllerCommunication(address)
+
+    def assert_trace(self, names: List[str]):
+        # each span is the parent of the next one
+        spans = [self.exporter.by_name(name) for name in names]
+        self.assertIsNone(spans[0].parent_id)
+        for parent, child in zip(spans, spans[1:]):
+            self.assertEqual(parent.context.trace_id, child.context.trace_id)
+            self.assertEqual(
+                parent.context.span_id, child.parent_id, child.name
+            )
+
+    def test_streamed_results(self):
+        executor = testsuiteexecutor.TestSuiteExecutor(FakeTestSuite(), token="token")
+        streams = []
+
+        def send_chunk(chunk):
+            if not streams:
+                streams.append(self.communication.open_results_stream())
+            streams[0].send(chunk)
+
+        results = executor.execute(on_chunk=send_chunk)
+        self.communication.close_results_stream(
+            streams[0], results, trace_context=executor.trace_context
+        )
+        # wait for the ingest queue
+        self.engine.get_results_ingest_queue().stop()
+
+        self.assert_trace([
+            "TestSuiteExecutor.execute",
+            "ControllerServiceServicer.StreamResults",
+            "ResultsIngestQueue.process",
+            "ResultsReportPublisher.notify_new_results",
+            "ResultsReportSubscriber.update",
+            "CRDInstanceManager.patch_crd",
+        ])
+
+    def test_sent_results(self):
+        executor = testsuiteexecutor.TestSuiteExecutor(FakeTestSuite(), token="token")
+        results = executor.execute()
+        self.communication.send_results(
+            results, trace_context=executor.trace_context
+        )
+        self.engine.get_results_ingest_queue().stop()
+
+        self.assert_trace([
+            "TestSuiteExecutor.execute",
+            "ControllerCommunication.send_results",
+            "ControllerServiceServicer.ReportResults",
+            "ResultsIngestQueue.process",
+            "ResultsReportPublisher.notify_new_results",
+            "ResultsReportSubscriber.update",
+            "CRDInstanceManager.patch_crd",
+        ])
+        self.assertEqual(
+            1, self.exporter.by_name(
+                "ControllerCommunication.send_results"
+            ).attributes["attempts"]
+        )
@@ -43,3 +43,25 @@ class DnsResolutionAssertionTest(unittest.TestCase):
         assertion = DNSResolutionAssertion.from_dict(config)
         with self.assertRaises(AssertionFailure):
             assertion.test()
+
+
+class DnsResolutionAssertionAsyncTest(unittest.IsolatedAsyncioTestCase):
+
+    async def test_with_expected_failure(self):
+        config = {
+            "nameservers": ["0.0.1.0"],
+            "host": "google.com",
+            "expectSuccess": False
+        }
+        assertion = DNSResolutionAssertion.from_dict(config)
+        await assertion.test_async()
+
+    async def test_with_unexpected_failure(self):
+        config = {
+            "nameservers": ["0.0.1.0"],
+            "host": "google.com",
+            "expectSuccess": True
+        }
+        assertion = DNSResolutionAssertion.from_dict(config)
+        with self.assertRaises(AssertionFailure):
+            await assertion.test_async()
@@ -1,4 +1,7 @@
+import asyncio
 import contextlib
+import errno
+import socket
 import unittest
 from unittest.mock import patch
 
@@ -56,3 +59,73 @@ class ExactDestinationAssertionTest(unittest.TestCase):
         with self._patched_connect(True):
             with self.assertRaises(AssertionFailure):
                 assertion.test()
+
+
+class ExactDestinationAssertionAsyncTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = await asyncio.start_server(
+            lambda reader, writer: writer.close(), "127.0.0.1", 0
+        )
+        self.open_port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    @staticmethod
+    def _closed_port() -> int:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(("127.0.0.1", 0))
+            return s.getsockname()[1]
+
+    @staticmethod
+    def _assertion(port: int, expect_success: bool) -> ExactDestinationAssertion:
+        return ExactDestinationAssertion.from_dict({
+            "port": port,
+            "destinationIP": "127.0.0.1",
+            "expectSuccess": expect_success,
+        })
+
+    async def test_expected_success_when_port_is_open(self):
+        await self._assertion(self.open_port, True).test_async()
+
+    async def test_expected_failure_when_port_is_open(self):
+        with self.assertRaises(AssertionFailure):
+            await self._assertion(self.open_port, False).test_async()
+
+    async def test_the_tcp_connection_is_closed_after_the_probe(self):
+        with patch.object(
+            asyncio.StreamWriter, "wait_closed", autospec=True
+        ) as wait_closed:
+            connected = await ExactDestinationAssertion._connect_async(
+                "127.0.0.1", self.open_port, "tcp"
+            )
+        self.assertTrue(connected)
+        wait_closed.assert_awaited_once()
+
+    async def test_a_reset_while_closing_the_connection_is_ignored(self):
+        with patch.object(
+            asyncio.StreamWriter,
+            "wait_closed",
+            autospec=True,
+            side_effect=ConnectionResetError
+        ):
+            connected = await ExactDestinationAssertion._connect_async(
+                "127.0.0.1", self.open_port, "tcp"
+            )
+        self.assertTrue(connected)
+
+    async def test_running_out_of_file_descriptors_is_not_unreachable(self):
+        with patch(
+            "asyncio.open_connection",
+            side_effect=OSError(errno.EMFILE, "Too many open files")
+        ), self.assertRaises(OSError):
+            await self._assertion(self.open_port, False).test_async()
+
+    async def test_expected_failure_when_port_is_closed(self):
+        await self._assertion(self._closed_port(), False).test_async()
+
+    async def test_expected_success_when_port_is_closed(self):
+        with self.assertRaises(AssertionFailure):
+            await self._assertion(self._closed_port(), True).test_async()
@@ -0,0 +1,140 @@
+import itertools
+import socket
+import unittest
+
+from kubekarma.worker.abs.exception import AssertionFailure, \
+    InvalidDefinition
+from kubekarma.worker.networksuite.ipblockassertion import \
+    IpBlockAddresses, IpBlockAssertion
+from kubekarma.worker.networksuite.runcontext import NetworkSuiteRunContext
+from kubekarma.worker.networksuite.testsuite import NetworkKubekarmaTestSuite
+
+
+def closed_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class IpBlockAddressesTest(unittest.TestCase):
+
+    def test_host_addresses(self):
+        self.assertEqual(
+            ["10.0.0.1", "10.0.0.2"], list(IpBlockAddresses("10.0.0.0/30"))
+        )
+        self.assertEqual(["10.0.0.7"], list(IpBlockAddresses("10.0.0.7/32")))
+
+    def test_exclusions(self):
+        addresses = IpBlockAddresses(
+            "10.0.0.0/28", ["10.0.0.4/30", "10.0.0.6/31", "10.0.0.12/30"]
+        )
+        expected = ["10.0.0.1", "10.0.0.2", "10.0.0.3"] + [
+            f"10.0.0.{i}" for i in range(8, 12)
+        ]
+        self.assertEqual(expected, list(addresses))
+        self.assertEqual(len(expected), len(addresses))
+
+    def test_expansion_is_lazy(self):
+        addresses = IpBlockAddresses("10.0.0.0/8", ["10.0.0.0/16"])
+        self.assertEqual(2 ** 24 - 2 - 2 ** 16 + 1, len(addresses))
+        self.assertEqual(
+            ["10.1.0.0", "10.1.0.1"],
+            list(itertools.islice(addresses, 2))
+        )
+
+    def test_sample_is_deterministic_and_skips_exclusions(self):
+        addresses = IpBlockAddresses("10.0.0.0/16", ["10.0.128.0/17"])
+        sample = list(addresses.sample(100, seed=1))
+        self.assertEqual(sample, list(addresses.sample(100, seed=1)))
+        self.assertEqual(100, len(set(sample)))
+        self.assertEqual(sorted(sample, key=socket.inet_aton), sample)
+        self.assertTrue(all(int(a.split(".")[2]) < 128 for a in sample))
+
+    def test_invalid_blocks(self):
+        for cidr, exclusions in (
+            ("10.0.0.0/33", []),
+            ("fd00::/64", []),
+            ("10.0.0.0/24", ["10.0.1.0/24"]),
+        ):
+            with self.assertRaises(InvalidDefinition):
+                IpBlockAddresses(cidr, exclusions)
+
+
+class IpBlockAssertionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen(16)
+        self.port = self.listener.getsockname()[1]
+
+    def tearDown(self):
+        self.listener.close()
+
+    def test_expect_success_reports_unreachable_destinations(self):
+        # only 127.0.0.1 is listening, 127.0.0.2 refuses the connection
+        assertion = IpBlockAssertion.from_dict({
+            "ipBlock": "127.0.0.0/30",
+            "destinationPort": self.port,
+            "expectSuccess": True
+        })
+        with self.assertRaises(AssertionFailure) as ctx:
+            assertion.test()
+        self.assertIn("1 of 2 destinations", ctx.exception.message)
+        self.assertIn(f"127.0.0.2:{self.port}/tcp", ctx.exception.message)
+        self.assertEqual(1, assertion.summary.reachable)
+
+    def test_expect_failure(self):
+        context = NetworkSuiteRunContext()
+        assertion = IpBlockAssertion.from_dict({
+            "ipBlock": "127.0.0.0/29",
+            "except": ["127.0.0.1/32"],
+            "ports": [closed_port(), closed_port()],
+            "expectSuccess": False
+        }, context=context)
+        assertion.test()
+        self.assertEqual(10, assertion.summary.probed)
+        self.assertFalse(assertion.summary.sampled)
+        self.assertEqual(
+            {"ip_block_probes": 10, "ip_block_reachable": 0},
+            dict(context.statistics)
+        )
+
+    def test_large_blocks_are_sampled(self):
+        assertion = IpBlockAssertion.from_dict({
+            "ipBlock": "127.0.0.0/16",
+            "destinationPort": closed_port(),
+            "sampleSize": 20,
+            "expectSuccess": False
+        })
+        assertion.test()
+        self.assertTrue(assertion.summary.sampled)
+        self.assertEqual(20, assertion.summary.probed)
+        self.assertEqual(2 ** 16 - 2, assertion.summary.addresses)
+
+    def test_invalid_definition(self):
+        for spec in (
+            {"ipBlock": "10.0.0.0/24", "expectSuccess": True},
+            {"ipBlock": "10.0.0.0/24", "destinationPort": 80,
+             "sampleSize": 0, "expectSuccess": True},
+        ):
+            with self.assertRaises(InvalidDefinition):
+                IpBlockAssertion.from_dict(spec)
+
+    def test_is_executed_by_the_test_suite(self):
+        suite = NetworkKubekarmaTestSuite({
+            "name": "suite",
+            "networkValidations": [{
+                "name": "block",
+                "testIpBlock": {
+                    "ipBlock": "127.0.0.1/32",
+                    "destinationPort": self.port,
+                    "expectSuccess": True
+                }
+            }]
+        })
+        suite.execute_test(suite.test_cases[0])
+        self.assertEqual(
+            {"ip_block_probes": 1, "ip_block_reachable": 1},
+            suite.statistics()
+        )
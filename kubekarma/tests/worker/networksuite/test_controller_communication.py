@@ -1,7 +1,148 @@
+import socket
+import threading
+import time
 import unittest
+from concurrent import futures
+from unittest.mock import Mock, patch
+
+import grpc
+
+from kubekarma.grpcgen.collectors.v1alpha import controller_pb2, \
+    controller_pb2_grpc
+from kubekarma.worker.sender import ControllerCommunication, \
+    ControllerNotAvailable, RetryPolicy
+
+
+class FakeRpcError(grpc.RpcError):
+
+    def __init__(self, code: grpc.StatusCode):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+    def details(self):
+        return "fake error"
+
+
+class RecordingServicer(
+    controller_pb2_grpc.TestSuiteExecutionResultServiceServicer
+):
+
+    def __init__(self):
+        self.received = []
+
+    def ReportResults(self, request, context):
+        self.received.append(request)
+        return controller_pb2.ExecutionResultResponse(message="ok")
+
+
+def results_of(size: int) -> controller_pb2.ExecutionResultRequest:
+    return controller_pb2.ExecutionResultRequest(
+        name="suite",
+        token="token",
+        validation_results=[
+            controller_pb2.ValidationResult(name=f"test-{i}", error_message="e" * 100)
+            for i in range(size)
+        ]
+    )
 
 
 class ControllerCommunicationTestCase(unittest.TestCase):
 
+    def setUp(self):
+        self.policy = RetryPolicy(
+            deadline=1, attempt_timeout=0.2, initial_backoff=0.01,
+            max_backoff=0.05
+        )
+        self.communication = ControllerCommunication(
+            "127.0.0.1:1", retry_policy=self.policy
+        )
+        self.communication.controller = Mock()
+
     def test_send_results_with_exception(self):
-        ...
+        report = self.communication.controller.ReportResults
+        report.side_effect = [
+            FakeRpcError(grpc.StatusCode.UNAVAILABLE),
+            FakeRpcError(grpc.StatusCode.RESOURCE_EXHAUSTED),
+            controller_pb2.ExecutionResultResponse(message="ok"),
+        ]
+        self.communication.send_results(results_of(1))
+        self.assertEqual(3, report.call_count)
+        self.assertTrue(report.call_args[1]["wait_for_ready"])
+        self.assertLessEqual(report.call_args[1]["timeout"], 0.2)
+
+    def test_deadline_raises_controller_not_available(self):
+        report = self.communication.controller.ReportResults
+        report.side_effect = FakeRpcError(grpc.StatusCode.UNAVAILABLE)
+        start = time.monotonic()
+        with self.assertRaises(ControllerNotAvailable):
+            self.communication.send_results(results_of(1))
+        self.assertLess(time.monotonic() - start, 1.5)
+        self.assertGreater(report.call_count, 1)
+
+    def test_rejected_results_are_not_retried(self):
+        report = self.communication.controller.ReportResults
+        report.side_effect = FakeRpcError(grpc.StatusCode.INVALID_ARGUMENT)
+        with self.assertRaises(grpc.RpcError):
+            self.communication.send_results(results_of(1))
+        self.assertEqual(1, report.call_count)
+
+    def test_large_results_are_compressed(self):
+        report = self.communication.controller.ReportResults
+        self.communication.send_results(results_of(1))
+        self.assertEqual(
+            grpc.Compression.NoCompression,
+            report.call_args[1]["compression"]
+        )
+        self.communication.send_results(results_of(1000))
+        self.assertEqual(
+            grpc.Compression.Gzip, report.call_args[1]["compression"]
+        )
+
+    def test_backoffs_grow_up_to_the_max(self):
+        with patch("random.uniform", side_effect=lambda low, high: high):
+            backoffs = RetryPolicy(initial_backoff=1, max_backoff=5).backoffs()
+            self.assertEqual([1, 2, 4, 5, 5], [next(backoffs) for _ in range(5)])
+
+    def test_failed_stream_falls_back_to_send_results(self):
+        stream = Mock()
+        stream.close.side_effect = FakeRpcError(grpc.StatusCode.UNAVAILABLE)
+        results = results_of(1)
+        self.communication.close_results_stream(stream, results)
+        self.communication.controller.ReportResults.assert_called_once()
+        self.assertIs(
+            results,
+            self.communication.controller.ReportResults.call_args[0][0]
+        )
+
+
+class ControllerRestartTestCase(unittest.TestCase):
+
+    def test_results_are_delivered_when_the_controller_comes_back(self):
+        servicer = RecordingServicer()
+        # the controller is down while the worker sends the results
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        restarted = grpc.server(futures.ThreadPoolExecutor(max_workers=1))
+        controller_pb2_grpc.add_TestSuiteExecutionResultServiceServicer_to_server(
+            servicer, restarted
+        )
+        self.addCleanup(restarted.stop, None)
+
+        def restart():
+            time.sleep(0.5)
+            restarted.add_insecure_port(f"127.0.0.1:{port}")
+            restarted.start()
+
+        threading.Thread(target=restart).start()
+        communication = ControllerCommunication(
+            f"127.0.0.1:{port}",
+            retry_policy=RetryPolicy(
+                deadline=10, attempt_timeout=0.3, initial_backoff=0.05
+            )
+        )
+        communication.send_results(results_of(3))
+        self.assertEqual(1, len(servicer.received))
+        self.assertEqual(3, len(servicer.received[0].validation_results))
@@ -0,0 +1,87 @@
+import time
+import unittest
+from unittest.mock import Mock
+
+import dns.name
+import dns.rdataclass
+import dns.rdatatype
+from dns import asyncresolver
+
+from kubekarma.worker.networksuite.dnsresolutionassertion import \
+    DNSResolutionAssertion
+from kubekarma.worker.networksuite.dnsresolverpool import ResolverPool
+from kubekarma.worker.networksuite.runcontext import NetworkSuiteRunContext
+
+
+class ResolverPoolTest(unittest.TestCase):
+
+    def test_resolvers_are_reused_by_nameservers(self):
+        pool = ResolverPool()
+        res = pool.get_resolver(["1.1.1.1"])
+        self.assertIs(res, pool.get_resolver(["1.1.1.1"]))
+        self.assertIsNot(res, pool.get_resolver(["8.8.8.8"]))
+        self.assertEqual(["1.1.1.1"], [str(n) for n in res.nameservers])
+
+    def test_async_resolvers_are_pooled_separately(self):
+        pool = ResolverPool()
+        res = pool.get_async_resolver(["1.1.1.1"])
+        self.assertIsInstance(res, asyncresolver.Resolver)
+        self.assertIs(res, pool.get_async_resolver(["1.1.1.1"]))
+        self.assertIsNot(res, pool.get_resolver(["1.1.1.1"]))
+
+    def test_cache_is_disabled_by_default(self):
+        pool = ResolverPool()
+        self.assertIsNone(pool.get_resolver(["1.1.1.1"]).cache)
+        self.assertEqual({}, pool.statistics())
+
+    def test_cache_is_shared_and_can_be_bypassed(self):
+        pool = ResolverPool(answer_cache_enabled=True)
+        cached = pool.get_resolver(["1.1.1.1"])
+        self.assertIs(pool.cache, cached.cache)
+        self.assertIs(pool.cache, pool.get_async_resolver(["8.8.8.8"]).cache)
+        self.assertIsNone(pool.get_resolver(["1.1.1.1"], use_cache=False).cache)
+
+    def test_statistics_report_hits_and_misses(self):
+        pool = ResolverPool(answer_cache_enabled=True)
+        key = (
+            dns.name.from_text("example.com"),
+            dns.rdatatype.A,
+            dns.rdataclass.IN
+        )
+        pool.cache.get(key)
+        pool.cache.put(key, Mock(expiration=time.time() + 60))
+        pool.cache.get(key)
+        pool.cache.get(key)
+        self.assertEqual(
+            {"dns_cache_hits": 2, "dns_cache_misses": 1},
+            pool.statistics()
+        )
+
+    def test_expired_answers_are_not_served(self):
+        pool = ResolverPool(answer_cache_enabled=True)
+        key = (
+            dns.name.from_text("example.com"),
+            dns.rdatatype.A,
+            dns.rdataclass.IN
+        )
+        pool.cache.put(key, Mock(expiration=time.time() - 1))
+        self.assertIsNone(pool.cache.get(key))
+
+    def test_assertion_uses_the_pool_of_the_run(self):
+        context = NetworkSuiteRunContext(
+            resolver_pool=Mock(spec=ResolverPool)
+        )
+        context.resolver_pool.get_resolver.return_value.resolve.return_value = []
+        assertion = DNSResolutionAssertion.from_dict(
+            {
+                "host": "example.com",
+                "expectSuccess": True,
+                "nameservers": ["1.1.1.1"],
+                "bypassCache": True
+            },
+            context=context
+        )
+        assertion.test()
+        context.resolver_pool.get_resolver.assert_called_once_with(
+            ["1.1.1.1"], use_cache=False
+        )
@@ -0,0 +1,126 @@
+import socket
+import time
+import unittest
+
+from kubekarma.worker.networksuite.probeengine import ProbeEngine, \
+    ProbeTarget
+from kubekarma.worker.networksuite.testsuite import NetworkKubekarmaTestSuite
+
+
+def listening_socket(backlog: int = 16) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(backlog)
+    return sock
+
+
+def closed_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ProbeEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.listeners = [listening_socket() for _ in range(3)]
+        self.open_targets = [
+            ProbeTarget("127.0.0.1", s.getsockname()[1])
+            for s in self.listeners
+        ]
+        self.closed_targets = [
+            ProbeTarget("127.0.0.1", closed_port()) for _ in range(3)
+        ]
+
+    def tearDown(self):
+        for listener in self.listeners:
+            listener.close()
+
+    def test_results_follow_the_targets_order(self):
+        targets = [
+            t for pair in zip(self.open_targets, self.closed_targets)
+            for t in pair
+        ]
+        results = ProbeEngine(timeout=1).probe(targets)
+        self.assertEqual([True, False] * 3, results)
+
+    def test_max_in_flight_does_not_change_the_results(self):
+        targets = self.open_targets + self.closed_targets
+        results = ProbeEngine(timeout=1, max_in_flight=1).probe(targets)
+        self.assertEqual([True] * 3 + [False] * 3, results)
+
+    def test_probe_iter_consumes_targets_lazily(self):
+        consumed = []
+
+        def targets():
+            for target in self.open_targets:
+                consumed.append(target)
+                yield target
+
+        results = ProbeEngine(timeout=1, max_in_flight=1).probe_iter(targets())
+        first_target, reachable = next(results)
+        self.assertTrue(reachable)
+        self.assertLess(len(consumed), len(self.open_targets))
+        self.assertEqual(
+            set(self.open_targets),
+            {first_target} | {t for t, _ in results}
+        )
+
+    def test_udp_targets(self):
+        results = ProbeEngine(timeout=1).probe(
+            [ProbeTarget("127.0.0.1", closed_port(), "udp")]
+        )
+        # As socket.connect_ex(), connecting an UDP socket always succeeds.
+        self.assertEqual([True], results)
+
+    def test_unanswered_connections_time_out_together(self):
+        # A listener with a full accept queue drops the new handshakes.
+        full = listening_socket(backlog=0)
+        self.addCleanup(full.close)
+        filler = socket.create_connection(full.getsockname(), timeout=1)
+        self.addCleanup(filler.close)
+        target = ProbeTarget("127.0.0.1", full.getsockname()[1])
+
+        start = time.monotonic()
+        results = ProbeEngine(timeout=0.5).probe([target] * 20)
+        elapsed = time.monotonic() - start
+
+        self.assertFalse(any(results[1:]))
+        self.assertLess(elapsed, 2)
+
+
+class NetworkTestSuiteBatchProbesTest(unittest.TestCase):
+
+    def test_prepare_probes_the_exact_destinations(self):
+        listener = listening_socket()
+        self.addCleanup(listener.close)
+        open_port = listener.getsockname()[1]
+        suite = NetworkKubekarmaTestSuite({
+            "name": "suite",
+            "batchProbes": True,
+            "networkValidations": [
+                {
+                    "name": "open",
+                    "testExactDestination": {
+                        "destinationIP": "127.0.0.1",
+                        "port": open_port,
+                        "expectSuccess": True
+                    }
+                },
+                {
+                    "name": "closed",
+                    "testExactDestination": {
+                        "destinationIP": "127.0.0.1",
+                        "port": closed_port(),
+                        "expectSuccess": False
+                    }
+                },
+            ]
+        })
+        suite.prepare()
+        self.assertEqual(2, len(suite.run_context.probe_results))
+        self.assertTrue(
+            suite.run_context.probe_results[ProbeTarget("127.0.0.1", open_port)]
+        )
+        for test_case in suite.test_cases:
+            suite.execute_test(test_case)
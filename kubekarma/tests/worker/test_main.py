@@ -0,0 +1,88 @@
+import os
+import unittest
+from unittest.mock import patch
+
+import grpc
+
+from kubekarma.grpcgen.collectors.v1alpha import controller_pb2
+from kubekarma.worker import main
+from kubekarma.worker.sender import ControllerNotAvailable
+
+ENVS = {
+    "WORKER_TASK_ID": "1234",
+    "WORKER_TASK_EXECUTION_CONFIG": "name: suite",
+    "WORKER_CONTROLLER_OPERATOR_URL": "localhost:8080",
+    "WORKER_TEST_SUITE_KIND": "NetworkTestSuite",
+}
+
+
+class WorkerMainTest(unittest.TestCase):
+
+    def setUp(self):
+        self.results = controller_pb2.ExecutionResultRequest(token="1234")
+        patcher = patch(
+            "kubekarma.worker.main.get_kubekarma_test_suite_from_kind"
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch("kubekarma.worker.sender.ControllerCommunication")
+        self.controller = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        patcher = patch(
+            "kubekarma.worker.testsuiteexecutor.TestSuiteExecutor"
+        )
+        self.executor = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.executor.execute.side_effect = self.execute
+
+    def execute(self, on_chunk=None):
+        if on_chunk is not None:
+            on_chunk(self.results)
+        return self.results
+
+    def run_main(self, **envs):
+        with patch.dict(os.environ, dict(ENVS, **envs)):
+            main.main()
+
+    def test_the_results_are_sent_at_once_by_default(self):
+        self.run_main()
+        self.assertIsNone(self.executor.execute.call_args.kwargs["on_chunk"])
+        self.controller.open_results_stream.assert_not_called()
+        self.controller.send_results.assert_called_once()
+        self.assertIs(
+            self.results, self.controller.send_results.call_args.args[0]
+        )
+
+    def test_the_results_are_streamed_when_enabled(self):
+        self.run_main(WORKER_STREAM_RESULTS="true")
+        self.controller.open_results_stream.assert_called_once()
+        self.controller.open_results_stream.return_value.send.assert_called_once_with(
+            self.results
+        )
+        self.controller.close_results_stream.assert_called_once()
+        self.controller.send_results.assert_not_called()
+
+    def test_the_undelivered_results_exit_with_a_code(self):
+        self.controller.send_results.side_effect = ControllerNotAvailable(
+            "UNAVAILABLE"
+        )
+        with self.assertRaises(SystemExit) as e:
+            self.run_main()
+        self.assertEqual(main.EXIT_CODE_CONTROLLER_NOT_AVAILABLE, e.exception.code)
+
+    def test_the_rejected_results_exit_with_a_code(self):
+        self.controller.send_results.side_effect = RejectedError()
+        with self.assertLogs(main.logger, "ERROR") as logs, \
+                self.assertRaises(SystemExit) as e:
+            self.run_main()
+        self.assertEqual(main.EXIT_CODE_RESULTS_REJECTED, e.exception.code)
+        self.assertIn("INVALID_ARGUMENT token is required", logs.output[0])
+
+
+class RejectedError(grpc.RpcError):
+
+    def code(self):
+        return grpc.StatusCode.INVALID_ARGUMENT
+
+    def details(self):
+        return "token is required"
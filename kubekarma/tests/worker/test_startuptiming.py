@@ -0,0 +1,65 @@
+import subprocess
+import sys
+import textwrap
+import unittest
+
+from kubekarma.worker.startuptiming import ImportTimer, StartupTimer
+
+
+class StartupTimerTest(unittest.TestCase):
+
+    def test_marks_keep_the_first_time(self):
+        timer = StartupTimer()
+        timer.mark("first probe")
+        first = timer.marks["first probe"]
+        timer.mark("first probe")
+        self.assertEqual(first, timer.marks["first probe"])
+        self.assertLessEqual(timer.marks["interpreter ready"], first)
+        self.assertIn("first probe", timer.report())
+
+    def test_import_timer_records_new_modules(self):
+        sys.modules.pop("colorsys", None)
+        import_timer = ImportTimer()
+        import_timer.install()
+        try:
+            import colorsys
+        finally:
+            import_timer.uninstall()
+        self.assertIn("colorsys", import_timer.timings)
+        cumulative, own = import_timer.timings["colorsys"]
+        self.assertLessEqual(own, cumulative)
+        # the module still works as usual
+        self.assertEqual((0.0, 1.0, 0.0), colorsys.rgb_to_hls(1, 1, 1))
+
+
+class LazyAssertionImportsTest(unittest.TestCase):
+
+    def test_only_the_used_assertions_are_imported(self):
+        # run in a new interpreter, this one already imported everything
+        code = textwrap.dedent("""
+            import sys
+            from kubekarma.worker.networksuite.testsuite import \\
+                NetworkKubekarmaTestSuite
+            suite = NetworkKubekarmaTestSuite({
+                "name": "suite",
+                "networkValidations": [{
+                    "name": "exact",
+                    "testExactDestination": {
+                        "destinationIP": "127.0.0.1",
+                        "port": 1,
+                        "expectSuccess": False
+                    }
+                }]
+            })
+            suite.prepare()
+            print("dns" in sys.modules)
+            print(
+                "kubekarma.worker.networksuite.exactdestionationassertion"
+                in sys.modules
+            )
+        """)
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        self.assertEqual(["False", "True"], output)
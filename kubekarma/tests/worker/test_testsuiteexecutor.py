@@ -0,0 +1,156 @@
+import threading
+import time
+import unittest
+
+from kubekarma.grpcgen.collectors.v1alpha.controller_pb2 import \
+    ExecutionResultRequest, ValidationResult
+from kubekarma.worker.abs.exception import AssertionFailure, \
+    InvalidDefinition
+from kubekarma.worker.abs.ikubekarmatestsuite import IKubekarmaTest, \
+    IKubekarmaTestSuite
+from kubekarma.worker.networksuite.testsuite import NetworkKubekarmaTestSuite
+from kubekarma.worker.testsuiteexecutor import TestSuiteExecutor
+
+
+class FakeTest(IKubekarmaTest):
+
+    def __init__(self, name: str, delay: float, outcome=None):
+        self._name = name
+        self.delay = delay
+        self.outcome = outcome
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+
+class FakeTestSuite(IKubekarmaTestSuite):
+    kind = "FakeTestSuite"
+
+    def __init__(self, test_cases, concurrency: int = 1):
+        self._test_cases = test_cases
+        self._concurrency = concurrency
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+
+    @property
+    def name(self) -> str:
+        return "fake-suite"
+
+    @property
+    def test_cases(self):
+        return self._test_cases
+
+    @property
+    def concurrency(self) -> int:
+        return self._concurrency
+
+    def execute_test(self, test_case: FakeTest):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            time.sleep(test_case.delay)
+            if test_case.outcome is not None:
+                raise test_case.outcome
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+class TestSuiteExecutorTest(unittest.TestCase):
+
+    def test_sequential_execution_by_default(self):
+        suite = FakeTestSuite([FakeTest(f"t{i}", 0.01) for i in range(3)])
+        results = TestSuiteExecutor(suite, token="token").execute()
+        self.assertEqual(1, suite.max_running)
+        self.assertEqual(
+            ["t0", "t1", "t2"],
+            [r.name for r in results.validation_results]
+        )
+
+    def test_concurrent_execution_keeps_results_order(self):
+        # the first test cases are the slowest ones, so they finish last
+        test_cases = [
+            FakeTest(f"t{i}", 0.05 * (4 - i)) for i in range(4)
+        ]
+        test_cases[1].outcome = AssertionFailure("FakeAssertion", "failed")
+        test_cases[2].outcome = NotImplementedError()
+        test_cases[3].outcome = ValueError("boom")
+        suite = FakeTestSuite(test_cases, concurrency=4)
+
+        results = TestSuiteExecutor(suite, token="token").execute()
+
+        self.assertEqual(4, suite.max_running)
+        self.assertEqual("token", results.token)
+        self.assertEqual(
+            ["t0", "t1", "t2", "t3"],
+            [r.name for r in results.validation_results]
+        )
+        self.assertEqual(
+            [
+                ValidationResult.Status.SUCCEEDED,
+                ValidationResult.Status.FAILED,
+                ValidationResult.Status.NOT_IMPLEMENTED,
+                ValidationResult.Status.ERROR,
+            ],
+            [r.status for r in results.validation_results]
+        )
+        self.assertIn("boom", results.validation_results[3].error_message)
+        # each test case keeps its own duration
+        durations = [
+            r.duration.ToTimedelta().total_seconds()
+            for r in results.validation_results
+        ]
+        self.assertGreaterEqual(durations[0], 0.2)
+        self.assertLess(durations[3], 0.2)
+
+    def test_concurrency_limit_is_respected(self):
+        suite = FakeTestSuite(
+            [FakeTest(f"t{i}", 0.02) for i in range(10)],
+            concurrency=3
+        )
+        TestSuiteExecutor(suite, token="token").execute()
+        self.assertEqual(3, suite.max_running)
+
+    def test_chunks_are_sent_while_running(self):
+        test_cases = [FakeTest(f"t{i}", 0.05 * (3 - i)) for i in range(3)]
+        suite = FakeTestSuite(test_cases, concurrency=3)
+        chunks = []
+
+        results = TestSuiteExecutor(suite, token="token").execute(
+            on_chunk=chunks.append
+        )
+
+        self.assertEqual("token", chunks[0].token)
+        self.assertEqual(0, len(chunks[0].validation_results))
+        self.assertEqual(
+            ["t0", "t1", "t2"],
+            [c.validation_results[0].name for c in chunks[1:]]
+        )
+        merged = ExecutionResultRequest()
+        for chunk in chunks:
+            merged.MergeFrom(chunk)
+        self.assertEqual(results, merged)
+
+
+class NetworkTestSuiteConcurrencyTest(unittest.TestCase):
+
+    @staticmethod
+    def _spec(**kwargs) -> dict:
+        spec = {"name": "suite", "networkValidations": []}
+        spec.update(kwargs)
+        return spec
+
+    def test_default_concurrency(self):
+        self.assertEqual(1, NetworkKubekarmaTestSuite(self._spec()).concurrency)
+
+    def test_concurrency_from_spec(self):
+        suite = NetworkKubekarmaTestSuite(self._spec(concurrency=8))
+        self.assertEqual(8, suite.concurrency)
+
+    def test_invalid_concurrency(self):
+        for value in (0, -1, "2", True):
+            with self.assertRaises(InvalidDefinition):
+                NetworkKubekarmaTestSuite(self._spec(concurrency=value))
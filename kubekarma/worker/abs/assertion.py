@@ -1,4 +1,5 @@
 import abc
+import asyncio
 
 from kubekarma.worker.abs.exception import AssertionFailure
 
@@ -19,3 +20,40 @@ class IAssertion(abc.ABC):
             self.__class__.__name__,
             message
         )
+
+
+class IAsyncAssertion(IAssertion):
+    """An assertion that can run natively inside an event loop.
+
+    Implementations must not block the event loop, this allows a single
+    worker to keep many probes in flight without one thread per probe.
+    """
+
+    @abc.abstractmethod
+    async def test_async(self):
+        """Run the assertion without blocking the event loop.
+
+        Raises:
+            AssertionFailure: If the assertion fails.
+        """
+
+
+class SyncAssertionAdapter:
+    """Adapt a blocking IAssertion to be awaited inside an event loop.
+
+    The blocking .test() call is executed by the default executor of the
+    running loop, so it does not block the other assertions.
+    """
+
+    def __init__(self, assertion: IAssertion):
+        self.assertion = assertion
+
+    async def test_async(self):
+        await asyncio.to_thread(self.assertion.test)
+
+
+def as_async_assertion(assertion: IAssertion):
+    """Return an object exposing an awaitable .test_async() method."""
+    if isinstance(assertion, IAsyncAssertion):
+        return assertion
+    return SyncAssertionAdapter(assertion)
@@ -1,5 +1,6 @@
 import abc
-from typing import List
+import asyncio
+from typing import Dict, List
 
 
 class IKubekarmaTest(abc.ABC):
@@ -29,6 +30,23 @@ class IKubekarmaTestSuite(abc.ABC):
         def test_cases(self) -> List[IKubekarmaTest]:
             pass
 
+        @property
+        def concurrency(self) -> int:
+            """The maximum number of test cases executed at the same time."""
+            return 1
+
+        def statistics(self) -> Dict[str, int]:
+            """Return counters collected while running the test cases."""
+            return {}
+
+        def prepare(self):
+            """Prepare the resources required by the test cases.
+
+            Called once by the executor before running the test cases, it
+            allows a test suite to do work in bulk (e.g. probe many
+            destinations at once) instead of once per test case.
+            """
+
         @abc.abstractmethod
         def execute_test(self, test_case: IKubekarmaTest):
             """Execute a test case.
@@ -38,3 +56,15 @@ class IKubekarmaTestSuite(abc.ABC):
                 NotImplementedError: If the test case is not implemented.
                 Exception: If an unexpected error occurs.
             """
+
+        async def execute_test_async(self, test_case: IKubekarmaTest):
+            """Execute a test case inside the running event loop.
+
+            By default the blocking .execute_test() runs in a thread of the
+            default executor, test suites with native async assertions
+            should override this method.
+
+            Raises:
+                The same exceptions as .execute_test().
+            """
+            await asyncio.to_thread(self.execute_test, test_case)
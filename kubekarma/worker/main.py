@@ -1,17 +1,15 @@
 import dataclasses
-import datetime
 import os
+import sys
+from typing import TYPE_CHECKING
 
-import yaml
-
-
-from kubekarma.worker.abs.ikubekarmatestsuite import IKubekarmaTestSuite
-from kubekarma.worker.networksuite.testsuite import NetworkKubekarmaTestSuite
-from kubekarma.worker.sender import ControllerCommunication
+from kubekarma.worker.startuptiming import startup_timer
 
 import logging
 
-from kubekarma.worker.testsuiteexecutor import TestSuiteExecutor
+# The rest of the modules are imported where they are needed, the
+# worker is started on each execution and only the test suite kind used
+# must be loaded. See startuptiming.py.
 
 # logger to stdout
 logging.basicConfig(
@@ -24,6 +22,16 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Exit code of the worker when the results could not be delivered to the
+# controller before the delivery deadline.
+EXIT_CODE_CONTROLLER_NOT_AVAILABLE = 3
+# Exit code of the worker when the controller rejected the results with a
+# non retryable error (e.g. INVALID_ARGUMENT or PERMISSION_DENIED).
+EXIT_CODE_RESULTS_REJECTED = 4
+
+if TYPE_CHECKING:
+    from kubekarma.worker.abs.ikubekarmatestsuite import IKubekarmaTestSuite
+
 
 @dataclasses.dataclass
 class ExecutionTaskConfig:
@@ -31,6 +39,13 @@ class ExecutionTaskConfig:
     controller_grpc_address: str
     test_suite_spec: dict
     test_suite_kind: str
+    # seconds to deliver the results to the controller, retrying on errors
+    results_delivery_deadline: float = 120
+    # where the spans of the execution are exported, see shared.tracing
+    tracing_exporter: str = ""
+    # stream the results while running, only set by the controller when
+    # its gRPC server doesn't hold a thread per stream
+    stream_results: bool = False
 
     @classmethod
     def from_envs(cls) -> 'ExecutionTaskConfig':
@@ -41,7 +56,14 @@ class ExecutionTaskConfig:
                 os.getenv("WORKER_TASK_EXECUTION_CONFIG")
             ),
             test_suite_kind=os.getenv("WORKER_TEST_SUITE_KIND"),
-            controller_grpc_address=os.getenv("WORKER_CONTROLLER_OPERATOR_URL")
+            controller_grpc_address=os.getenv("WORKER_CONTROLLER_OPERATOR_URL"),
+            results_delivery_deadline=float(
+                os.getenv("WORKER_RESULTS_DELIVERY_DEADLINE", "120")
+            ),
+            tracing_exporter=os.getenv("WORKER_TRACING_EXPORTER", ""),
+            stream_results=(
+                os.getenv("WORKER_STREAM_RESULTS", "false").lower() == "true"
+            )
         )
 
     @classmethod
@@ -61,8 +83,10 @@ class ExecutionTaskConfig:
 def get_kubekarma_test_suite_from_kind(
     kind: str,
     spec: dict
-) -> IKubekarmaTestSuite:
-    if kind == NetworkKubekarmaTestSuite.kind:
+) -> "IKubekarmaTestSuite":
+    if kind == "NetworkTestSuite":
+        from kubekarma.worker.networksuite.testsuite import \
+            NetworkKubekarmaTestSuite
         return NetworkKubekarmaTestSuite(spec)
     else:
         raise Exception(
@@ -71,14 +95,27 @@ def get_kubekarma_test_suite_from_kind(
 
 
 def read_yaml(stream: str) -> dict:
+    import yaml
     return yaml.safe_load(stream)
 
 
-if __name__ == "__main__":
-    logger.info("Starting worker...")
-    started_at_time = datetime.datetime.now().isoformat()
+def main():
+    import grpc
+    from kubekarma.worker.sender import ControllerCommunication, \
+        ControllerNotAvailable, RetryPolicy
+    from kubekarma.worker.testsuiteexecutor import TestSuiteExecutor
+    from kubekarma.shared import tracing
+
     task_config = ExecutionTaskConfig.from_envs()
-    controller = ControllerCommunication(task_config.controller_grpc_address)
+    tracing.tracer.set_exporter(
+        tracing.get_exporter(task_config.tracing_exporter)
+    )
+    controller = ControllerCommunication(
+        task_config.controller_grpc_address,
+        retry_policy=RetryPolicy(
+            deadline=task_config.results_delivery_deadline
+        )
+    )
     test_executor = TestSuiteExecutor(
         get_kubekarma_test_suite_from_kind(
             task_config.test_suite_kind,
@@ -86,6 +123,53 @@ if __name__ == "__main__":
         ),
         token=task_config.identifier
     )
-    controller.send_results(
-        test_executor.execute()
+    startup_timer.mark("test suite loaded")
+    results_stream = None
+
+    def send_chunk(chunk):
+        nonlocal results_stream
+        if results_stream is None:
+            # opened with the first chunk, in the trace of the execution
+            results_stream = controller.open_results_stream()
+        results_stream.send(chunk)
+        if chunk.validation_results:
+            startup_timer.mark("first result sent")
+
+    results = test_executor.execute(
+        on_chunk=send_chunk if task_config.stream_results else None
     )
+    try:
+        if results_stream is None:
+            controller.send_results(
+                results, trace_context=test_executor.trace_context
+            )
+        else:
+            controller.close_results_stream(
+                results_stream,
+                results,
+                trace_context=test_executor.trace_context
+            )
+    except ControllerNotAvailable as e:
+        logger.error("The results were not delivered to the controller: %s", e)
+        sys.exit(EXIT_CODE_CONTROLLER_NOT_AVAILABLE)
+    except grpc.RpcError as e:
+        logger.error(
+            "The controller rejected the results: %s %s",
+            e.code().name,
+            e.details()
+        )
+        sys.exit(EXIT_CODE_RESULTS_REJECTED)
+    finally:
+        tracing.tracer.exporter.shutdown()
+    startup_timer.mark("results delivered")
+
+
+if __name__ == "__main__":
+    if startup_timer.is_enabled():
+        startup_timer.measure_imports()
+    logger.info("Starting worker...")
+    try:
+        main()
+    finally:
+        if startup_timer.is_enabled():
+            logger.info(startup_timer.report())
@@ -5,53 +5,93 @@ from typing import Optional
 import dns.exception
 from dns import resolver
 
-from kubekarma.worker.abs.assertion import IAssertion
+from kubekarma.worker.abs.assertion import IAsyncAssertion
 from kubekarma.worker.abs.exception import AssertionFailure
+from kubekarma.worker.networksuite.runcontext import NetworkSuiteRunContext
 
 logger = logging.getLogger(__name__)
 
 
-class DNSResolutionAssertion(IAssertion):
+class DNSResolutionAssertion(IAsyncAssertion):
 
     @dataclasses.dataclass
     class Config:
         host: str
         expect_success: bool
         nameservers: Optional[list] = None
+        # skip the answer cache of the run for this assertion
+        bypass_cache: bool = False
 
         @classmethod
         def from_dict(cls, d: dict):
             return cls(
                 host=d['host'],
                 expect_success=d['expectSuccess'],
-                nameservers=d.get('nameservers', None)
+                nameservers=d.get('nameservers', None),
+                bypass_cache=d.get('bypassCache', False)
             )
 
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        context: Optional[NetworkSuiteRunContext] = None
+    ):
         self.config = config
+        self.context = context or NetworkSuiteRunContext()
 
     @classmethod
-    def from_dict(cls, d: dict):
+    def from_dict(
+        cls,
+        d: dict,
+        context: Optional[NetworkSuiteRunContext] = None
+    ):
         return cls(
-            DNSResolutionAssertion.Config.from_dict(d)
+            DNSResolutionAssertion.Config.from_dict(d),
+            context=context
         )
 
     def test(self):
-        clazz_name = self.__class__.__name__
         try:
-            res = resolver.Resolver()
-            if self.config.nameservers:
-                res.nameservers = self.config.nameservers
+            res = self.context.resolver_pool.get_resolver(
+                self.config.nameservers,
+                use_cache=not self.config.bypass_cache
+            )
             answers = res.resolve(self.config.host, lifetime=1)
-            logger.info(f"DNS resolved host: {self.config.host} to {[a.address for a in answers]}")
-            if not self.config.expect_success:
-                raise AssertionFailure(
-                    clazz_name,
-                    f"DNS resolved host: {self.config.host} when it was not expected to"
-                )
         except dns.exception.DNSException:
+            self._check_resolution(answers=None)
+            return
+        self._check_resolution(answers=answers)
+
+    async def test_async(self):
+        try:
+            res = self.context.resolver_pool.get_async_resolver(
+                self.config.nameservers,
+                use_cache=not self.config.bypass_cache
+            )
+            answers = await res.resolve(self.config.host, lifetime=1)
+        except dns.exception.DNSException:
+            self._check_resolution(answers=None)
+            return
+        self._check_resolution(answers=answers)
+
+    def _check_resolution(self, answers: Optional[resolver.Answer]):
+        """Compare the resolution result against the expected one.
+
+        Args:
+            answers: The answers of the resolution, None if the host
+                could not be resolved.
+        """
+        clazz_name = self.__class__.__name__
+        if answers is None:
             if self.config.expect_success:
                 raise AssertionFailure(
                     clazz_name,
                     f"DNS failed to resolve host: {self.config.host}"
                 )
+            return
+        logger.info(f"DNS resolved host: {self.config.host} to {[a.address for a in answers]}")
+        if not self.config.expect_success:
+            raise AssertionFailure(
+                clazz_name,
+                f"DNS resolved host: {self.config.host} when it was not expected to"
+            )
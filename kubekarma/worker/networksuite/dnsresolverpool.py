@@ -0,0 +1,102 @@
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple, Type, \
+    TypeVar
+
+import logging
+
+if TYPE_CHECKING:
+    from dns import asyncresolver, resolver
+
+logger = logging.getLogger(__name__)
+
+ResolverType = TypeVar("ResolverType", bound="resolver.BaseResolver")
+
+
+class ResolverPool:
+    """A pool of DNS resolvers shared by the assertions of a test suite run.
+
+    Creating a resolver reads the system configuration (/etc/resolv.conf),
+    so the resolvers are created once and reused, keyed by the nameservers
+    list they query.
+
+    When the answer cache is enabled all the pooled resolvers share a
+    single dnspython cache, which respects the TTL of the answers, so
+    repeated lookups during the same run are not sent again. A test can
+    still bypass the cache, in that case a resolver without cache is used.
+
+    dnspython is only imported when the first resolver is requested, so
+    the suites without DNS assertions don't pay for it on startup.
+    """
+
+    def __init__(self, answer_cache_enabled: bool = False):
+        self.answer_cache_enabled = answer_cache_enabled
+        self._cache: Optional["resolver.Cache"] = None
+        self._lock = threading.Lock()
+        self._resolvers: Dict[
+            Tuple[type, Tuple[str, ...], bool], "resolver.BaseResolver"
+        ] = {}
+
+    @property
+    def cache(self) -> "resolver.Cache":
+        """The answer cache shared by the pooled resolvers."""
+        with self._lock:
+            if self._cache is None:
+                from dns import resolver
+                self._cache = resolver.Cache()
+            return self._cache
+
+    def get_resolver(
+        self,
+        nameservers: Optional[Sequence[str]] = None,
+        use_cache: bool = True,
+    ) -> "resolver.Resolver":
+        """Return a blocking resolver for the given nameservers."""
+        from dns import resolver
+        return self._get(resolver.Resolver, nameservers, use_cache)
+
+    def get_async_resolver(
+        self,
+        nameservers: Optional[Sequence[str]] = None,
+        use_cache: bool = True,
+    ) -> "asyncresolver.Resolver":
+        """Return an asyncio resolver for the given nameservers."""
+        from dns import asyncresolver
+        return self._get(asyncresolver.Resolver, nameservers, use_cache)
+
+    def _get(
+        self,
+        resolver_class: Type[ResolverType],
+        nameservers: Optional[Sequence[str]],
+        use_cache: bool
+    ) -> ResolverType:
+        use_cache = use_cache and self.answer_cache_enabled
+        key = (resolver_class, tuple(nameservers or ()), use_cache)
+        cache = self.cache if use_cache else None
+        with self._lock:
+            res = self._resolvers.get(key)
+            if res is None:
+                logger.debug(
+                    "Creating %s for nameservers %s (cache: %s)",
+                    resolver_class.__name__,
+                    key[1] or "<system>",
+                    use_cache
+                )
+                res = resolver_class()
+                if nameservers:
+                    res.nameservers = list(nameservers)
+                if cache is not None:
+                    res.cache = cache
+                self._resolvers[key] = res
+        return res  # type: ignore[return-value]
+
+    def statistics(self) -> Dict[str, int]:
+        """Return the hits and misses of the answer cache."""
+        if not self.answer_cache_enabled:
+            return {}
+        if self._cache is None:
+            return {"dns_cache_hits": 0, "dns_cache_misses": 0}
+        snapshot = self.cache.get_statistics_snapshot()
+        return {
+            "dns_cache_hits": snapshot.hits,
+            "dns_cache_misses": snapshot.misses,
+        }
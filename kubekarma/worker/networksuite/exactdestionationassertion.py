@@ -1,6 +1,10 @@
-from typing import TypedDict
+import asyncio
+import errno
+from typing import Optional, TypedDict
 
-from kubekarma.worker.abs.assertion import IAssertion
+from kubekarma.worker.abs.assertion import IAsyncAssertion
+from kubekarma.worker.networksuite.probeengine import ProbeTarget
+from kubekarma.worker.networksuite.runcontext import NetworkSuiteRunContext
 
 import socket
 
@@ -9,6 +13,20 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# The errors telling the destination is not reachable, any other (e.g.
+# EMFILE when the process ran out of file descriptors) says nothing about
+# the destination and it is raised to report the test case as an error.
+UNREACHABLE_ERRNOS = frozenset((
+    errno.ECONNREFUSED,
+    errno.ECONNRESET,
+    errno.ECONNABORTED,
+    errno.ETIMEDOUT,
+    errno.EHOSTUNREACH,
+    errno.EHOSTDOWN,
+    errno.ENETUNREACH,
+    errno.ENETDOWN,
+))
+
 
 class ExactDestinationAssertionSpecTypeDict(TypedDict):
     destinationIP: str
@@ -17,10 +35,17 @@ class ExactDestinationAssertionSpecTypeDict(TypedDict):
     protocol: str
 
 
-class ExactDestinationAssertion(IAssertion):
+class ExactDestinationAssertion(IAsyncAssertion):
+
+    CONNECTION_TIMEOUT = 2
 
-    def __init__(self, spec: ExactDestinationAssertionSpecTypeDict):
+    def __init__(
+        self,
+        spec: ExactDestinationAssertionSpecTypeDict,
+        context: Optional[NetworkSuiteRunContext] = None
+    ):
         self.spec = spec
+        self.context = context or NetworkSuiteRunContext()
 
     @classmethod
     def validate_spec(cls, d: dict):
@@ -37,13 +62,24 @@ class ExactDestinationAssertion(IAssertion):
             )
 
     @classmethod
-    def from_dict(cls, d: dict) -> 'ExactDestinationAssertion':
+    def from_dict(
+        cls,
+        d: dict,
+        context: Optional[NetworkSuiteRunContext] = None
+    ) -> 'ExactDestinationAssertion':
         if "protocol" not in d:
             d["protocol"] = "tcp"
         else:
             d["protocol"] = d["protocol"].lower()
         cls.validate_spec(d)
-        return cls(d)
+        return cls(d, context=context)
+
+    def get_probe_target(self) -> ProbeTarget:
+        return ProbeTarget(
+            ip=self.spec["destinationIP"],
+            port=self.spec["port"],
+            protocol=self.spec["protocol"]
+        )
 
     @staticmethod
     def _connect(host: str, port: int, protocol: str) -> bool:
@@ -53,13 +89,81 @@ class ExactDestinationAssertion(IAssertion):
             socket.AF_INET,
             socket.SOCK_STREAM if is_tcp else socket.SOCK_DGRAM
         )
-        s.settimeout(2)
+        s.settimeout(ExactDestinationAssertion.CONNECTION_TIMEOUT)
         results = s.connect_ex((host, port))
         s.close()
         return results == 0
 
+    @staticmethod
+    async def _connect_async(host: str, port: int, protocol: str) -> bool:
+        """Return True if the connection was successful, False otherwise.
+
+        The non-blocking counterpart of ._connect().
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            if protocol == "tcp":
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection(host, port),
+                    timeout=ExactDestinationAssertion.CONNECTION_TIMEOUT
+                )
+                writer.close()
+                try:
+                    # release the socket now, not when the transport is
+                    # collected, many probes run at the same time
+                    await writer.wait_closed()
+                except (OSError, ConnectionError):
+                    # the connection was established, a reset by the peer
+                    # while closing it does not change the result
+                    pass
+            else:
+                transport, _ = await asyncio.wait_for(
+                    loop.create_datagram_endpoint(
+                        asyncio.DatagramProtocol,
+                        remote_addr=(host, port),
+                        family=socket.AF_INET
+                    ),
+                    timeout=ExactDestinationAssertion.CONNECTION_TIMEOUT
+                )
+                transport.close()
+        except asyncio.TimeoutError:
+            return False
+        except OSError as e:
+            if e.errno not in UNREACHABLE_ERRNOS:
+                raise
+            return False
+        return True
+
     def test(self):
         # test connection to the specified destination
+        probed = self.context.probe_results.get(self.get_probe_target())
+        if probed is not None:
+            self._check_connection(probed)
+            return
+        try:
+            connected = self._connect(
+                self.spec["destinationIP"],
+                self.spec["port"],
+                self.spec["protocol"]
+            )
+        except socket.timeout:
+            connected = False
+        self._check_connection(connected)
+
+    async def test_async(self):
+        probed = self.context.probe_results.get(self.get_probe_target())
+        if probed is not None:
+            self._check_connection(probed)
+            return
+        connected = await self._connect_async(
+            self.spec["destinationIP"],
+            self.spec["port"],
+            self.spec["protocol"]
+        )
+        self._check_connection(connected)
+
+    def _check_connection(self, connected: bool):
+        """Compare the connection result against the expected one."""
         host = self.spec["destinationIP"]
         port = self.spec["port"]
         expect_success: bool = self.spec["expectSuccess"]
@@ -72,12 +176,7 @@ class ExactDestinationAssertion(IAssertion):
             f"TCP connection to host {host}:{port} was unsuccessful "
             f"when it was expected to succeed"
         )
-        try:
-            connected = self._connect(host, port, self.spec["protocol"])
-            if not expect_success and connected:
-                self.raise_assertion_failure(expected_failure_msg)
-            elif expect_success and not connected:
-                self.raise_assertion_failure(expected_success_msg)
-        except socket.timeout:
-            if expect_success:
-                self.raise_assertion_failure(expected_success_msg)
+        if not expect_success and connected:
+            self.raise_assertion_failure(expected_failure_msg)
+        elif expect_success and not connected:
+            self.raise_assertion_failure(expected_success_msg)
@@ -1,13 +1,21 @@
 import dataclasses
+import functools
+import logging
 
 import urllib3
 
-from kubekarma.worker.networksuite.testsuite import logger
 from kubekarma.worker.abs.assertion import IAssertion
 from kubekarma.worker.abs.exception import AssertionFailure
 
-timeout = urllib3.Timeout(connect=2.0, read=5.0)
-http = urllib3.PoolManager(timeout=timeout)
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def get_http_pool() -> urllib3.PoolManager:
+    """Return the HTTP pool, created on the first use."""
+    return urllib3.PoolManager(
+        timeout=urllib3.Timeout(connect=2.0, read=5.0)
+    )
 
 
 class DestinationHostAssertion(IAssertion):
@@ -24,7 +32,7 @@ class DestinationHostAssertion(IAssertion):
     def _check_host_connectivity(self) -> bool:
         can_connect = False
         try:
-            http.request(
+            get_http_pool().request(
                 "GET",
                 f"{self.config.host}:{self.config.port}"
             )
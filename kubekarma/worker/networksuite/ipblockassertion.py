@@ -0,0 +1,259 @@
+import dataclasses
+import hashlib
+import ipaddress
+import random
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from kubekarma.worker.abs.assertion import IAssertion
+from kubekarma.worker.abs.exception import InvalidDefinition
+from kubekarma.worker.networksuite.probeengine import ProbeEngine, \
+    ProbeTarget
+from kubekarma.worker.networksuite.runcontext import NetworkSuiteRunContext
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IpBlockAddresses:
+    """The host addresses of an IPv4 block minus some excluded blocks.
+
+    The addresses are never materialized: iterating yields them in order
+    jumping over the excluded ranges, and a sample maps random positions
+    of the block to their addresses.
+    """
+
+    def __init__(self, cidr: str, exclusions: Sequence[str] = ()):
+        self.network = self._parse(cidr)
+        first = int(self.network.network_address)
+        last = int(self.network.broadcast_address)
+        if self.network.prefixlen < 31:
+            # as network.hosts(), skip the network and broadcast addresses
+            first, last = first + 1, last - 1
+        self._first = first
+        self._excluded = self._excluded_ranges(exclusions, first, last)
+        self.size = (last - first + 1) - sum(
+            end - start + 1 for start, end in self._excluded
+        )
+
+    @staticmethod
+    def _parse(cidr: str) -> ipaddress.IPv4Network:
+        try:
+            network = ipaddress.ip_network(cidr, strict=False)
+        except ValueError as e:
+            raise InvalidDefinition(f"Invalid IP block <{cidr}>: {e}") from e
+        if not isinstance(network, ipaddress.IPv4Network):
+            raise InvalidDefinition(
+                f"Only IPv4 blocks are supported, got: <{cidr}>"
+            )
+        return network
+
+    def _excluded_ranges(
+        self,
+        exclusions: Sequence[str],
+        first: int,
+        last: int
+    ) -> List[Tuple[int, int]]:
+        """Return the sorted and merged ranges of excluded addresses."""
+        ranges = []
+        for cidr in exclusions:
+            excluded = self._parse(cidr)
+            if not excluded.subnet_of(self.network):
+                raise InvalidDefinition(
+                    f"The excluded block <{cidr}> is not part of "
+                    f"<{self.network}>"
+                )
+            start = max(int(excluded.network_address), first)
+            end = min(int(excluded.broadcast_address), last)
+            if start <= end:
+                ranges.append((start, end))
+        merged: List[Tuple[int, int]] = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+            else:
+                merged.append((start, end))
+        return merged
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[str]:
+        return self._at_positions(range(self.size))
+
+    def sample(self, size: int, seed: int) -> Iterator[str]:
+        """Yield `size` addresses chosen at random, in ascending order.
+
+        The same seed always gives the same addresses.
+        """
+        if size >= self.size:
+            return iter(self)
+        positions = random.Random(seed).sample(range(self.size), size)
+        return self._at_positions(sorted(positions))
+
+    def _at_positions(self, positions: Iterable[int]) -> Iterator[str]:
+        """Yield the addresses at the given ascending positions."""
+        excluded = iter(self._excluded)
+        next_excluded = next(excluded, None)
+        skipped = 0
+        for position in positions:
+            address = self._first + position + skipped
+            while next_excluded is not None and next_excluded[0] <= address:
+                excluded_size = next_excluded[1] - next_excluded[0] + 1
+                skipped += excluded_size
+                address += excluded_size
+                next_excluded = next(excluded, None)
+            yield str(ipaddress.IPv4Address(address))
+
+
+class IpBlockAssertion(IAssertion):
+    """Assert the connectivity to all the addresses of an IP block.
+
+    All the destinations (address, port) of the block are probed
+    concurrently. With expectSuccess all of them must be reachable,
+    otherwise none of them must be reachable. Blocks of /16 and larger are
+    not swept completely, a deterministic sample of `sampleSize` addresses
+    is probed instead.
+    """
+
+    CONNECTION_TIMEOUT = 2
+    # the number of addresses of a /16 block
+    SAMPLING_THRESHOLD = 2 ** 16
+    DEFAULT_SAMPLE_SIZE = 1024
+    # the max destinations reported on a failure
+    MAX_REPORTED_DESTINATIONS = 5
+
+    @dataclasses.dataclass
+    class Config:
+        ip_block: str
+        ports: List[int]
+        expect_success: bool
+        exclusions: List[str] = dataclasses.field(default_factory=list)
+        protocol: str = "tcp"
+        sample_size: int = 1024
+
+        @classmethod
+        def from_dict(cls, d: dict):
+            ports = list(d.get("ports", []))
+            if "destinationPort" in d:
+                ports.insert(0, d["destinationPort"])
+            if not ports:
+                raise InvalidDefinition(
+                    "testIpBlock requires a destinationPort or ports"
+                )
+            sample_size = d.get("sampleSize", IpBlockAssertion.DEFAULT_SAMPLE_SIZE)
+            if not isinstance(sample_size, int) or sample_size < 1:
+                raise InvalidDefinition(
+                    f"sampleSize must be a positive integer, got: <{sample_size}>"
+                )
+            return cls(
+                ip_block=d["ipBlock"],
+                ports=list(dict.fromkeys(ports)),
+                expect_success=d["expectSuccess"],
+                exclusions=d.get("except", []),
+                protocol=d.get("protocol", "tcp").lower(),
+                sample_size=sample_size
+            )
+
+    @dataclasses.dataclass
+    class Summary:
+        """The aggregated results of the sweep."""
+        # addresses of the block, without the excluded ones
+        addresses: int
+        sampled: bool
+        probed: int = 0
+        reachable: int = 0
+        # some destinations with an unexpected result
+        unexpected: List[ProbeTarget] = dataclasses.field(default_factory=list)
+
+    def __init__(
+        self,
+        config: Config,
+        context: Optional[NetworkSuiteRunContext] = None
+    ):
+        self.config = config
+        self.context = context or NetworkSuiteRunContext()
+        self.addresses = IpBlockAddresses(config.ip_block, config.exclusions)
+        self.summary: Optional[IpBlockAssertion.Summary] = None
+
+    @classmethod
+    def from_dict(
+        cls,
+        d: dict,
+        context: Optional[NetworkSuiteRunContext] = None
+    ):
+        return cls(IpBlockAssertion.Config.from_dict(d), context=context)
+
+    @property
+    def is_sampled(self) -> bool:
+        return (
+            self.addresses.network.num_addresses >= self.SAMPLING_THRESHOLD and
+            len(self.addresses) > self.config.sample_size
+        )
+
+    def _seed(self) -> int:
+        """Return a seed stable across runs, to always sample the same addresses."""
+        key = f"{self.config.ip_block}|{','.join(self.config.exclusions)}"
+        return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], "big")
+
+    def get_probe_targets(self) -> Iterator[ProbeTarget]:
+        """Yield the destinations to probe, lazily."""
+        if self.is_sampled:
+            addresses = self.addresses.sample(self.config.sample_size, self._seed())
+        else:
+            addresses = iter(self.addresses)
+        for address in addresses:
+            for port in self.config.ports:
+                yield ProbeTarget(address, port, self.config.protocol)
+
+    def sweep(self) -> Summary:
+        """Probe all the destinations and aggregate the results."""
+        summary = self.Summary(
+            addresses=len(self.addresses),
+            sampled=self.is_sampled
+        )
+        engine = ProbeEngine(timeout=self.CONNECTION_TIMEOUT)
+        for target, reachable in engine.probe_iter(self.get_probe_targets()):
+            summary.probed += 1
+            summary.reachable += reachable
+            if (
+                reachable != self.config.expect_success and
+                len(summary.unexpected) < self.MAX_REPORTED_DESTINATIONS
+            ):
+                summary.unexpected.append(target)
+        self.context.add_statistics(
+            ip_block_probes=summary.probed,
+            ip_block_reachable=summary.reachable
+        )
+        return summary
+
+    def test(self):
+        self.summary = summary = self.sweep()
+        logger.info(
+            "%s: %s of %s destinations reachable (%s addresses%s)",
+            self.config.ip_block,
+            summary.reachable,
+            summary.probed,
+            summary.addresses,
+            ", sampled" if summary.sampled else ""
+        )
+        if self.config.expect_success:
+            unexpected = summary.probed - summary.reachable
+            expectation = "unreachable when expected to be reachable"
+        else:
+            unexpected = summary.reachable
+            expectation = "reachable when expected to be unreachable"
+        if not unexpected:
+            return
+        examples = ", ".join(
+            f"{t.ip}:{t.port}/{t.protocol}" for t in summary.unexpected
+        )
+        sampled = (
+            f" (sample of {self.config.sample_size} addresses)"
+            if summary.sampled else ""
+        )
+        self.raise_assertion_failure(
+            f"{unexpected} of {summary.probed} destinations of "
+            f"{self.config.ip_block}{sampled} were {expectation}, "
+            f"e.g.: {examples}"
+        )
@@ -0,0 +1,153 @@
+import collections
+import dataclasses
+import errno
+import resource
+import selectors
+import socket
+import time
+from typing import Deque, Dict, Iterable, Iterator, List, Tuple
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(frozen=True)
+class ProbeTarget:
+    """A destination to probe."""
+    ip: str
+    port: int
+    protocol: str = "tcp"
+
+
+class ProbeEngine:
+    """Probe the connectivity of many destinations at once.
+
+    Instead of opening one blocking socket per destination and waiting for
+    its timeout, all the connections are started as non-blocking sockets and
+    multiplexed with a selector (epoll on Linux). A batch of destinations
+    completes in roughly one timeout window, no matter its size.
+
+    The number of sockets open at the same time is bounded by
+    `max_in_flight`, the remaining destinations are started as soon as
+    the previous ones complete.
+
+    The semantic of each probe is the same as socket.connect_ex(): a TCP
+    destination is reachable when the handshake completes, and an UDP
+    destination is reachable when the socket can be connected.
+    """
+
+    DEFAULT_MAX_IN_FLIGHT = 1024
+
+    def __init__(
+        self,
+        timeout: float = 2,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT
+    ):
+        self.timeout = timeout
+        self.max_in_flight = max(1, min(max_in_flight, self._fd_budget()))
+
+    @staticmethod
+    def _fd_budget() -> int:
+        """Return how many sockets can be opened without exhausting the fds."""
+        soft_limit, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft_limit == resource.RLIM_INFINITY:
+            return ProbeEngine.DEFAULT_MAX_IN_FLIGHT
+        # keep half of the file descriptors for the rest of the process
+        return soft_limit // 2
+
+    def probe(self, targets: Iterable[ProbeTarget]) -> List[bool]:
+        """Probe all the targets and return the results in the same order."""
+        targets = list(targets)
+        results: Dict[int, bool] = {}
+        for index, reachable in self._probe_indexed(enumerate(targets)):
+            results[index] = reachable
+        return [results[index] for index in range(len(targets))]
+
+    def probe_iter(
+        self,
+        targets: Iterable[ProbeTarget]
+    ) -> Iterator[Tuple[ProbeTarget, bool]]:
+        """Probe the targets, yielding each result as soon as it is known.
+
+        The targets are consumed lazily, so a huge generator of targets can
+        be probed without building the whole list. The results are yielded
+        in completion order.
+        """
+        yield from self._probe_indexed((t, t) for t in targets)
+
+    def _probe_indexed(self, items: Iterable[Tuple]) -> Iterator[Tuple]:
+        """Probe (key, target) items, yielding (key, reachable) tuples."""
+        items = iter(items)
+        selector = selectors.DefaultSelector()
+        # (deadline, socket) in insertion order, all probes share the same
+        # timeout so the deadlines are already sorted.
+        pending: Deque[Tuple[float, socket.socket]] = collections.deque()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(selector.get_map()) < self.max_in_flight:
+                    try:
+                        key, target = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    started = self._start(selector, key, target)
+                    if isinstance(started, bool):
+                        yield key, started
+                    else:
+                        pending.append((time.monotonic() + self.timeout, started))
+                if not selector.get_map():
+                    if exhausted:
+                        return
+                    continue
+
+                # discard the sockets already completed
+                while pending and pending[0][1].fileno() == -1:
+                    pending.popleft()
+                wait = max(0.0, pending[0][0] - time.monotonic()) if pending else 0
+                for selector_key, _ in selector.select(timeout=wait):
+                    sock = selector_key.fileobj
+                    err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    selector.unregister(sock)
+                    sock.close()
+                    yield selector_key.data, err == 0
+
+                now = time.monotonic()
+                while pending and pending[0][0] <= now:
+                    _, sock = pending.popleft()
+                    if sock.fileno() == -1:
+                        continue
+                    key = selector.get_key(sock).data
+                    selector.unregister(sock)
+                    sock.close()
+                    yield key, False
+        finally:
+            for selector_key in list(selector.get_map().values()):
+                selector_key.fileobj.close()
+            selector.close()
+
+    @staticmethod
+    def _start(selector: selectors.BaseSelector, key, target: ProbeTarget):
+        """Start the connection to the target.
+
+        Returns:
+            True or False when the result is known immediately, otherwise
+            the socket registered in the selector waiting for the result.
+        """
+        is_tcp = target.protocol == "tcp"
+        sock = socket.socket(
+            socket.AF_INET,
+            socket.SOCK_STREAM if is_tcp else socket.SOCK_DGRAM
+        )
+        sock.setblocking(False)
+        try:
+            result = sock.connect_ex((target.ip, target.port))
+        except OSError as e:
+            logger.debug("Unable to probe %s: %s", target, e)
+            result = -1
+        if result in (errno.EINPROGRESS, errno.EAGAIN):
+            selector.register(sock, selectors.EVENT_WRITE, data=key)
+            return sock
+        sock.close()
+        return result == 0
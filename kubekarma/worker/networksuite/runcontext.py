@@ -0,0 +1,31 @@
+import collections
+import dataclasses
+import threading
+from typing import Counter, Dict
+
+from kubekarma.worker.networksuite.dnsresolverpool import ResolverPool
+from kubekarma.worker.networksuite.probeengine import ProbeTarget
+
+
+@dataclasses.dataclass
+class NetworkSuiteRunContext:
+    """Resources shared by the assertions of a single test suite run."""
+    resolver_pool: ResolverPool = dataclasses.field(
+        default_factory=ResolverPool
+    )
+    # Connectivity results probed in bulk before running the test cases.
+    probe_results: Dict[ProbeTarget, bool] = dataclasses.field(
+        default_factory=dict
+    )
+    # Counters reported along with the results of the run.
+    statistics: Counter[str] = dataclasses.field(
+        default_factory=collections.Counter
+    )
+    _lock: threading.Lock = dataclasses.field(
+        default_factory=threading.Lock, repr=False
+    )
+
+    def add_statistics(self, **counts: int):
+        """Add counts to the statistics, the test cases can run in threads."""
+        with self._lock:
+            self.statistics.update(counts)
@@ -1,15 +1,18 @@
 
-from typing import List
+import functools
+import importlib
+from typing import Dict, List, Optional, Type
 
 import logging
 
 
+from kubekarma.worker.abs.assertion import IAssertion, as_async_assertion
 from kubekarma.worker.abs.exception import InvalidDefinition
 from kubekarma.worker.abs.ikubekarmatestsuite import IKubekarmaTest, \
     IKubekarmaTestSuite
-from kubekarma.worker.networksuite.dnsresolutionassertion import DNSResolutionAssertion
-from kubekarma.worker.networksuite.exactdestionationassertion import \
-    ExactDestinationAssertion
+from kubekarma.worker.networksuite.dnsresolverpool import ResolverPool
+from kubekarma.worker.networksuite.probeengine import ProbeEngine
+from kubekarma.worker.networksuite.runcontext import NetworkSuiteRunContext
 
 logger = logging.getLogger(__name__)
 
@@ -18,10 +21,21 @@ class NetworkKubekarmaTestSuite(IKubekarmaTestSuite):
 
     kind = "NetworkTestSuite"
 
-    DEFINED_ASSERTIONS = {
-        "testDNSResolution": DNSResolutionAssertion,
-        "testIpBlock": None,
-        "testExactDestination": ExactDestinationAssertion,
+    # The assertion modules (and their dependencies) are only imported when
+    # the test suite uses them, each run is a new process and the imports
+    # delay the first probe. Format: "<module>:<class name>".
+    DEFINED_ASSERTIONS: Dict[str, Optional[str]] = {
+        "testDNSResolution": (
+            "kubekarma.worker.networksuite.dnsresolutionassertion:"
+            "DNSResolutionAssertion"
+        ),
+        "testIpBlock": (
+            "kubekarma.worker.networksuite.ipblockassertion:IpBlockAssertion"
+        ),
+        "testExactDestination": (
+            "kubekarma.worker.networksuite.exactdestionationassertion:"
+            "ExactDestinationAssertion"
+        ),
     }
 
     class NetworkKubekarmaTest(IKubekarmaTest):
@@ -56,9 +70,19 @@ class NetworkKubekarmaTestSuite(IKubekarmaTestSuite):
         """
         self.config_spec = config_spec
         self._name = config_spec["name"]
+        self._concurrency = self._parse_concurrency(
+            config_spec.get("concurrency", 1)
+        )
+        # Resources shared by all the assertions during this run.
+        self.run_context = NetworkSuiteRunContext(
+            resolver_pool=ResolverPool(
+                answer_cache_enabled=config_spec.get("dnsAnswerCache", False)
+            )
+        )
         self._test_cases = list(
             map(self._parse_test_case, config_spec["networkValidations"])
         )
+        self.batch_probes = config_spec.get("batchProbes", False)
 
     @property
     def name(self) -> str:
@@ -68,17 +92,86 @@ class NetworkKubekarmaTestSuite(IKubekarmaTestSuite):
     def test_cases(self) -> List[IKubekarmaTest]:
         return self._test_cases
 
-    def execute_test(self, test_case: NetworkKubekarmaTest):
-        clazz = self.DEFINED_ASSERTIONS.get(
-            test_case.assertion_type
+    @property
+    def concurrency(self) -> int:
+        return self._concurrency
+
+    def statistics(self) -> Dict[str, int]:
+        statistics = self.run_context.resolver_pool.statistics()
+        statistics.update(self.run_context.statistics)
+        return statistics
+
+    @staticmethod
+    def _parse_concurrency(value) -> int:
+        """Validate the .spec.concurrency value of the test suite."""
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise InvalidDefinition(
+                f"spec.concurrency must be a positive integer, got: <{value}>"
+            )
+        return value
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def get_assertion_class(cls, assertion_type: str) -> Optional[Type[IAssertion]]:
+        """Import and return the assertion class of an assertion type.
+
+        Returns None when the assertion type is not implemented yet.
+        """
+        import_path = cls.DEFINED_ASSERTIONS[assertion_type]
+        if import_path is None:
+            return None
+        module_name, class_name = import_path.split(":")
+        return getattr(importlib.import_module(module_name), class_name)
+
+    def prepare(self):
+        """Import the assertions used by the test suite and probe all the
+        exact destinations at once when batchProbes is set.
+
+        The probe results are stored in the run context, so each assertion
+        only compares them against its expectation.
+        """
+        for assertion_type in {t.assertion_type for t in self._test_cases}:
+            self.get_assertion_class(assertion_type)
+        if not self.batch_probes:
+            return
+        targets = set()
+        for test_case in self._test_cases:
+            if test_case.assertion_type != "testExactDestination":
+                continue
+            try:
+                targets.add(self._build_assertion(test_case).get_probe_target())
+            except Exception:
+                # The error is reported when the test case is executed.
+                continue
+        if not targets:
+            return
+        logger.info(
+            "[%s] Probing %s destinations in batch", self.name, len(targets)
         )
+        from kubekarma.worker.networksuite.exactdestionationassertion import \
+            ExactDestinationAssertion
+        engine = ProbeEngine(timeout=ExactDestinationAssertion.CONNECTION_TIMEOUT)
+        self.run_context.probe_results.update(engine.probe_iter(targets))
+
+    def execute_test(self, test_case: NetworkKubekarmaTest):
+        assertion = self._build_assertion(test_case)
+        assertion.test()
+
+    async def execute_test_async(self, test_case: NetworkKubekarmaTest):
+        assertion = self._build_assertion(test_case)
+        await as_async_assertion(assertion).test_async()
+
+    def _build_assertion(self, test_case: NetworkKubekarmaTest) -> IAssertion:
+        clazz = self.get_assertion_class(test_case.assertion_type)
         if clazz is None:
             raise NotImplementedError(
                 f"Assertion type {test_case.assertion_type} "
                 "is not currently supported."
             )
-        assertion = clazz.from_dict(test_case.assertion_config)
-        assertion.test()
+        return clazz.from_dict(
+            test_case.assertion_config,
+            context=self.run_context
+        )
 
     def _parse_test_case(self, test_case_spec: dict) -> NetworkKubekarmaTest:
         """Parse the config spec to retrieve the TestCase information.
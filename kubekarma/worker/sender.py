@@ -1,33 +1,242 @@
+import dataclasses
 import logging
+import queue
+import random
+import time
+from typing import Iterator, Optional, Tuple
 
 import grpc
 
 from kubekarma.grpcgen.collectors.v1alpha import controller_pb2, \
     controller_pb2_grpc
+from kubekarma.shared.tracing import SpanContext, tracer
 
 
 class ControllerNotAvailable(Exception):
-    ...
+    """The results could not be delivered before the delivery deadline."""
 
 
 logger = logging.getLogger(__name__)
 
+# Errors that a new attempt can fix: the controller is restarting, it is
+# overloaded or the call timed out. A call can time out once the results
+# are enqueued by the controller, which then skips the results retried.
+RETRYABLE_STATUS_CODES = frozenset({
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.ABORTED,
+})
+
+# Detect dead connections while a long test suite streams its results.
+# The controller server allows pings at this rate.
+CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 30_000),
+    ("grpc.keepalive_timeout_ms", 10_000),
+]
+
+
+@dataclasses.dataclass
+class RetryPolicy:
+    """How the delivery of the results is retried.
+
+    The backoff grows exponentially and a random value between 0 and the
+    backoff is waited (full jitter), so the workers started at the same
+    time don't retry at the same time.
+    """
+    # overall time to deliver the results, in seconds
+    deadline: float = 120
+    # timeout of each attempt
+    attempt_timeout: float = 10
+    initial_backoff: float = 0.5
+    max_backoff: float = 10
+    multiplier: float = 2
+
+    def backoffs(self) -> Iterator[float]:
+        """Yield the time to wait before each new attempt."""
+        backoff = self.initial_backoff
+        while True:
+            yield random.uniform(0, backoff)
+            backoff = min(backoff * self.multiplier, self.max_backoff)
+
+
+class ResultsStream:
+    """A client-streaming call to send the results as they are available.
+
+    The chunks are queued and consumed by the gRPC runtime in the
+    background, so .send() never blocks the test execution.
+    """
+
+    _END = None
+
+    def __init__(
+        self,
+        controller: controller_pb2_grpc.TestSuiteExecutionResultServiceStub,
+        metadata: Tuple[Tuple[str, str], ...] = ()
+    ):
+        self._queue: queue.Queue = queue.Queue()
+        self._future = controller.StreamResults.future(
+            iter(self._queue.get, self._END),
+            # wait for the controller if it is being restarted
+            wait_for_ready=True,
+            metadata=metadata
+        )
+
+    def send(self, chunk: controller_pb2.ExecutionResultRequest):
+        """Queue a chunk of the results to be sent to the controller."""
+        self._queue.put(chunk)
+
+    def close(
+        self,
+        timeout: Optional[float] = None
+    ) -> controller_pb2.ExecutionResultResponse:
+        """Complete the stream and wait for the response of the controller.
+
+        Raises:
+            grpc.RpcError: If the call failed.
+            grpc.FutureTimeoutError: If the timeout expires, the call is
+                cancelled.
+        """
+        self._queue.put(self._END)
+        try:
+            return self._future.result(timeout=timeout)
+        except grpc.FutureTimeoutError:
+            self._future.cancel()
+            raise
+
 
 class ControllerCommunication:
 
-    def __init__(self, controller_address: str):
+    # results bigger than this (in bytes) are compressed with gzip
+    COMPRESSION_THRESHOLD = 64 * 1024
+
+    def __init__(
+        self,
+        controller_address: str,
+        retry_policy: Optional[RetryPolicy] = None
+    ):
         logger.info(
             "Connecting to controller at %s",
             controller_address
         )
-        self.channel = grpc.insecure_channel(controller_address)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.channel = grpc.insecure_channel(
+            controller_address,
+            options=CHANNEL_OPTIONS
+        )
         self.controller = controller_pb2_grpc.TestSuiteExecutionResultServiceStub(
             self.channel
         )
 
     def send_results(
         self,
-        results: controller_pb2.ExecutionResultRequest
+        results: controller_pb2.ExecutionResultRequest,
+        trace_context: Optional[SpanContext] = None
     ):
-        """Send the results of a task execution to the controller."""
-        self.controller.ReportResults(results)
+        """Send the results of a task execution to the controller.
+
+        The transient errors are retried until the delivery deadline of the
+        retry policy. The trace of the execution (by default the current
+        one) is continued by the controller.
+
+        Raises:
+            ControllerNotAvailable: If the results were not delivered
+                before the deadline.
+            grpc.RpcError: If the controller rejected the results.
+        """
+        with tracer.start_span(
+            "ControllerCommunication.send_results", parent=trace_context
+        ) as span:
+            attempts = self._send_results(results, tracer.inject())
+            span.set_attribute("attempts", attempts)
+
+    def _send_results(
+        self,
+        results: controller_pb2.ExecutionResultRequest,
+        metadata: Tuple[Tuple[str, str], ...]
+    ) -> int:
+        """Send the results retrying the errors, return the attempts."""
+        compression = grpc.Compression.NoCompression
+        if results.ByteSize() >= self.COMPRESSION_THRESHOLD:
+            compression = grpc.Compression.Gzip
+        deadline = time.monotonic() + self.retry_policy.deadline
+        backoffs = self.retry_policy.backoffs()
+        attempt = 0
+        while True:
+            attempt += 1
+            remaining = deadline - time.monotonic()
+            try:
+                self.controller.ReportResults(
+                    results,
+                    timeout=max(0.0, min(self.retry_policy.attempt_timeout, remaining)),
+                    wait_for_ready=True,
+                    compression=compression,
+                    metadata=metadata
+                )
+                return attempt
+            except grpc.RpcError as e:
+                if e.code() not in RETRYABLE_STATUS_CODES:
+                    raise
+                backoff = next(backoffs)
+                if time.monotonic() + backoff >= deadline:
+                    raise ControllerNotAvailable(
+                        f"Unable to deliver the results after {attempt} "
+                        f"attempts: {e.code().name} {e.details()}"
+                    ) from e
+                logger.warning(
+                    "Attempt %s to deliver the results failed (%s), "
+                    "retrying in %.2fs",
+                    attempt,
+                    e.code().name,
+                    backoff
+                )
+                time.sleep(backoff)
+
+    def open_results_stream(
+        self,
+        trace_context: Optional[SpanContext] = None
+    ) -> ResultsStream:
+        """Open a stream to send the results while the task is running.
+
+        The trace of the execution (by default the current one) is
+        continued by the controller.
+        """
+        return ResultsStream(
+            self.controller, metadata=tracer.inject(context=trace_context)
+        )
+
+    def close_results_stream(
+        self,
+        stream: ResultsStream,
+        results: controller_pb2.ExecutionResultRequest,
+        trace_context: Optional[SpanContext] = None
+    ):
+        """Complete the stream of results of a task execution.
+
+        If the stream fails, or the controller does not support streaming,
+        the whole results are sent with .send_results() instead.
+
+        Raises:
+            ControllerNotAvailable: If the results were not delivered
+                before the deadline.
+        """
+        try:
+            stream.close(timeout=self.retry_policy.attempt_timeout)
+            return
+        except grpc.FutureTimeoutError:
+            logger.warning(
+                "The stream of results timed out, sending them in a single call."
+            )
+        except grpc.RpcError as e:
+            if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                logger.warning(
+                    "The controller does not support streaming the results, "
+                    "sending them in a single call."
+                )
+            else:
+                logger.warning(
+                    "The stream of results failed (%s), "
+                    "sending them in a single call.",
+                    e.code().name
+                )
+        self.send_results(results, trace_context=trace_context)
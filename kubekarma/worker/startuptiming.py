@@ -0,0 +1,149 @@
+"""Measure the cold start of the worker.
+
+Each scheduled execution of a test suite starts a new worker process, so
+the time spent by the interpreter, the imports and the parsing of the test
+suite is paid on every single run. When the WORKER_STARTUP_TIMING env is
+set, the worker logs a report with the import time of each module and the
+time elapsed until the first probe and the first result.
+"""
+import importlib.abc
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+ENV_NAME = "WORKER_STARTUP_TIMING"
+
+
+def process_age() -> float:
+    """Return the seconds elapsed since the current process was started.
+
+    Only available on Linux, otherwise 0 is returned.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # the command name can contain spaces, skip it
+            fields = f.read().rsplit(")", 1)[1].split()
+        # starttime is the field 22, in clock ticks since the boot
+        started_at = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        return max(0.0, time.clock_gettime(time.CLOCK_BOOTTIME) - started_at)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wrap a loader to measure the execution time of a module."""
+
+    def __init__(self, loader, fullname: str, timer: "ImportTimer"):
+        self._loader = loader
+        self._fullname = fullname
+        self._timer = timer
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._timer.measure(self._fullname, self._loader, module)
+
+    def __getattr__(self, name):
+        # get_data(), get_resource_reader(), is_package()...
+        return getattr(self._loader, name)
+
+
+class ImportTimer(importlib.abc.MetaPathFinder):
+    """A meta path finder recording the import time of the new modules.
+
+    The cumulative time includes the imports done by the module, the self
+    time doesn't, as the output of `python -X importtime`.
+    """
+
+    def __init__(self):
+        # module name -> (cumulative seconds, self seconds)
+        self.timings: Dict[str, tuple] = {}
+        self._local = threading.local()
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, fullname, self)
+        return spec
+
+    def measure(self, fullname: str, loader, module):
+        # time spent by the nested imports of each module being executed
+        stack: List[float] = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.timings[fullname] = (elapsed, elapsed - nested)
+
+
+class StartupTimer:
+    """Keep the time of the startup milestones of the worker."""
+
+    def __init__(self):
+        self._origin = time.perf_counter() - process_age()
+        self.marks: Dict[str, float] = {"interpreter ready": self.elapsed()}
+        self.import_timer: Optional[ImportTimer] = None
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return bool(os.getenv(ENV_NAME))
+
+    def elapsed(self) -> float:
+        """Return the seconds elapsed since the process was started."""
+        return time.perf_counter() - self._origin
+
+    def mark(self, milestone: str):
+        """Record the first time a milestone is reached."""
+        if milestone not in self.marks:
+            self.marks[milestone] = self.elapsed()
+
+    def measure_imports(self):
+        """Start recording the import time of the modules."""
+        if self.import_timer is None:
+            self.import_timer = ImportTimer()
+            self.import_timer.install()
+
+    def report(self, top: int = 15) -> str:
+        """Return the startup timing report."""
+        lines = ["Worker startup timing (ms since the process started):"]
+        for milestone, at in self.marks.items():
+            lines.append(f"  {milestone:<30} {at * 1000:10.1f}")
+        if self.import_timer is not None:
+            timings = sorted(
+                self.import_timer.timings.items(),
+                key=lambda item: item[1][0],
+                reverse=True
+            )[:top]
+            lines.append("Slowest imports (cumulative ms, self ms):")
+            for name, (cumulative, own) in timings:
+                lines.append(
+                    f"  {name:<55} {cumulative * 1000:8.1f} {own * 1000:8.1f}"
+                )
+        return "\n".join(lines)
+
+
+# The timer of the current worker process.
+startup_timer = StartupTimer()
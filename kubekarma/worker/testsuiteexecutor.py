@@ -1,27 +1,40 @@
+import asyncio
 import time
-from typing import List
+from typing import Callable, List, Optional
 
+from kubekarma.shared.tracing import SpanContext, tracer
 from kubekarma.grpcgen.collectors.v1alpha.controller_pb2 import (
     ValidationResult,
     ExecutionResultRequest
 )
+from google.protobuf.duration_pb2 import Duration
 from google.protobuf.timestamp_pb2 import Timestamp
 
 from kubekarma.worker import utils
 from kubekarma.worker.abs.exception import AssertionFailure
 from kubekarma.worker.abs.ikubekarmatestsuite import IKubekarmaTest, \
     IKubekarmaTestSuite
+from kubekarma.worker.startuptiming import startup_timer
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 def gen_timestamp(a_time: float) -> Timestamp:
-    seconds, micros = divmod(a_time, 10 ** 6)
-    return Timestamp(
-        seconds=int(seconds),
-        nanos=int(micros * 10 ** 3)
-    )
+    """Return the Timestamp of a time expressed in seconds since the epoch."""
+    timestamp = Timestamp()
+    timestamp.FromNanoseconds(int(a_time * 10 ** 9))
+    return timestamp
+
+
+def gen_duration(elapsed_ns: int) -> Duration:
+    duration = Duration()
+    duration.FromNanoseconds(elapsed_ns)
+    return duration
+
+
+# Receive each chunk of the ExecutionResultRequest as soon as it is ready.
+ChunkListener = Callable[[ExecutionResultRequest], None]
 
 
 class TestSuiteExecutor:
@@ -29,26 +42,25 @@ class TestSuiteExecutor:
     def __init__(self, kubekarma_test_suite: IKubekarmaTestSuite, token: str):
         self.kubekarma_test_suite = kubekarma_test_suite
         self.token = token
+        # The trace of the last execution, continued by the controller
+        self.trace_context: Optional[SpanContext] = None
 
-    def run_test(self, test_case: IKubekarmaTest) -> ValidationResult:
-        start_time = time.perf_counter()
+    async def run_test(self, test_case: IKubekarmaTest) -> ValidationResult:
+        startup_timer.mark("first probe")
+        start_time = time.perf_counter_ns()
         status_type = ValidationResult.Status
-        seconds, micros = divmod(time.time(), 10 ** 6)
         partial_test_result = {
             "name": test_case.name,
             "status": ValidationResult.Status.FAILED,
-            "start_time": Timestamp(
-                seconds=int(seconds),
-                nanos=int(micros * 10 ** 3)
-            )
+            "start_time": gen_timestamp(time.time())
         }
         try:
-            self.kubekarma_test_suite.execute_test(test_case)
+            await self.kubekarma_test_suite.execute_test_async(test_case)
             partial_test_result["status"] = status_type.SUCCEEDED
         except AssertionFailure:
             logger.info("[%s] ... FAILED", test_case.name)
         except NotImplementedError:
-            partial_test_result["status"] = status_type.NOTIMPLEMENTED
+            partial_test_result["status"] = status_type.NOT_IMPLEMENTED
             logger.info("[%s] ... SKIPPED", test_case.name)
         except Exception as e:
             logger.exception(
@@ -57,25 +69,106 @@ class TestSuiteExecutor:
             partial_test_result["status"] = status_type.ERROR
             partial_test_result["error_message"] = utils.stringify_exception(e)
         finally:
-            partial_test_result["execution_time"] = gen_timestamp(
-                time.perf_counter() - start_time
+            partial_test_result["duration"] = gen_duration(
+                time.perf_counter_ns() - start_time
             )
             return ValidationResult(**partial_test_result)
 
-    def execute(self) -> ExecutionResultRequest:
+    async def run_test_cases(
+        self,
+        test_cases: List[IKubekarmaTest],
+        on_result: Optional[Callable[[ValidationResult], None]] = None
+    ) -> List[ValidationResult]:
+        """Run the test cases and return the results in the same order.
+
+        All test cases are driven by the running event loop, at most
+        `concurrency` of them (defined by the test suite) are in flight
+        at the same time.
+
+        Args:
+            test_cases: The test cases to run.
+            on_result: Called with each result following the order of the
+                test cases, as soon as it and all the previous ones are done.
+        """
+        semaphore = asyncio.Semaphore(self.kubekarma_test_suite.concurrency)
+
+        async def bounded_run_test(test_case: IKubekarmaTest):
+            async with semaphore:
+                return await self.run_test(test_case)
+
+        logger.info(
+            "[%s] Running %s test cases with concurrency %s",
+            self.kubekarma_test_suite.name,
+            len(test_cases),
+            self.kubekarma_test_suite.concurrency
+        )
+        tasks = [
+            asyncio.create_task(bounded_run_test(test_case))
+            for test_case in test_cases
+        ]
+        results: List[ValidationResult] = []
+        for task in tasks:
+            results.append(await task)
+            if on_result is not None:
+                on_result(results[-1])
+        return results
+
+    def execute(
+        self,
+        on_chunk: Optional[ChunkListener] = None
+    ) -> ExecutionResultRequest:
+        """Execute the whole test suite using a new event loop."""
+        return asyncio.run(self.execute_async(on_chunk))
+
+    async def execute_async(
+        self,
+        on_chunk: Optional[ChunkListener] = None
+    ) -> ExecutionResultRequest:
+        """Execute the whole test suite.
+
+        Args:
+            on_chunk: Called with the chunks of the ExecutionResultRequest
+                while the test suite is running: first the header of the
+                execution, then each result, and finally the statistics.
+                Merging all the chunks gives the returned request.
+        """
+        with tracer.start_span(
+            "TestSuiteExecutor.execute",
+            attributes={
+                "test_suite": self.kubekarma_test_suite.name,
+                "test_cases": len(self.kubekarma_test_suite.test_cases),
+            }
+        ) as span:
+            self.trace_context = span.context
+            return await self._execute(on_chunk)
+
+    async def _execute(
+        self,
+        on_chunk: Optional[ChunkListener] = None
+    ) -> ExecutionResultRequest:
         logger.info(
             "[%s] Running test suite",
             self.kubekarma_test_suite.name
         )
-        start_time = gen_timestamp(time.perf_counter())
-        results: List[ValidationResult] = []
-        for test_case in self.kubekarma_test_suite.test_cases:
-            results.append(
-                self.run_test(test_case)
-            )
-        return ExecutionResultRequest(
+        header = ExecutionResultRequest(
             name=self.kubekarma_test_suite.name,
-            validation_results=results,
-            start_time=start_time,
+            start_time=gen_timestamp(time.time()),
             token=self.token
         )
+        listener: ChunkListener = on_chunk or (lambda chunk: None)
+        listener(header)
+        await asyncio.to_thread(self.kubekarma_test_suite.prepare)
+        results = await self.run_test_cases(
+            self.kubekarma_test_suite.test_cases,
+            on_result=lambda result: listener(
+                ExecutionResultRequest(validation_results=[result])
+            )
+        )
+        statistics = self.kubekarma_test_suite.statistics()
+        if statistics:
+            listener(ExecutionResultRequest(statistics=statistics))
+        request = ExecutionResultRequest()
+        request.CopyFrom(header)
+        request.validation_results.extend(results)
+        request.statistics.update(statistics)
+        return request